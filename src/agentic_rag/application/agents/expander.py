@@ -4,6 +4,7 @@ import yaml
 import requests
 from pydantic import BaseModel, Field
 from agentic_rag.domain.utils import PathConfig
+from agentic_rag.infrastructure.llm.router import LLMRouter
 
 
 class QueryExpansionOutput(BaseModel):
@@ -45,25 +46,30 @@ class QueryExpansionAgent:
         
         class CustomLLM(BaseLLM):
             def __init__(self, model: str, api_key: str, endpoint: str, temperature: float = 0.7, 
-                        context_window: int = 8192, timeout: int = 120):
+                        context_window: int = 8192, timeout: int = 120, router: LLMRouter = None):
                 super().__init__(model=model, temperature=temperature)
                 self.api_key = api_key
                 self.endpoint = endpoint
                 self.context_window = context_window
                 self.timeout = timeout
+                self.router = router or LLMRouter([{"model": model, "api_key": api_key, "endpoint": endpoint}])
 
             def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
                 if isinstance(messages, str):
                     messages = [{"role": "user", "content": messages}]
-                payload = {"model": self.model, "messages": messages, "temperature": self.temperature}
-                response = requests.post(
-                    self.endpoint,
-                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                response_data = response.json()
+
+                def post(deployment: dict) -> dict:
+                    payload = {"model": deployment["model"], "messages": messages, "temperature": self.temperature}
+                    response = requests.post(
+                        deployment["endpoint"],
+                        headers={"Authorization": f"Bearer {deployment['api_key']}", "Content-Type": "application/json"},
+                        json=payload,
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                    return response.json()
+
+                response_data = self.router.call(post)
                 message = response_data["choices"][0]["message"]
                 return message.get("content", "")
 
@@ -79,7 +85,8 @@ class QueryExpansionAgent:
             endpoint=llm_settings['endpoint'],
             temperature=0.7,  # Higher temperature for diverse query expansions
             context_window=llm_settings['context_window_size'],
-            timeout=llm_settings['timeout']
+            timeout=llm_settings['timeout'],
+            router=LLMRouter.from_config(llm_settings, name="expander")
         )
     
     def expand_query(self, original_query: str) -> list:
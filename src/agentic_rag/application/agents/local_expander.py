@@ -0,0 +1,340 @@
+"""
+LLM-free query expansion using pseudo-relevance feedback and a corpus-mined synonym table.
+
+Build the synonym table from the indexed collection with:
+
+    python -m agentic_rag.application.agents.local_expander
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from agentic_rag.domain.utils import PathConfig
+
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9+#./-]*[A-Za-z0-9+#]|[A-Za-z]")
+ACRONYM_PATTERN = re.compile(r"\b((?:[A-Z][A-Za-z]+[\s-]+){1,5}[A-Z]?[A-Za-z]+)\s*\(([A-Z][A-Z0-9]{1,7})\)")
+
+QUESTION_WORDS = {"what", "how", "who", "whom", "whose", "when", "where", "why", "which"}
+
+STOPWORDS = QUESTION_WORDS | {
+    "a", "about", "after", "all", "also", "am", "an", "and", "any", "are", "as", "at", "be",
+    "been", "before", "being", "but", "by", "can", "could", "did", "do", "does", "doing", "done",
+    "for", "from", "get", "gets", "got", "had", "has", "have", "having", "he", "her", "here",
+    "him", "his", "i", "if", "in", "into", "is", "it", "its", "just", "me", "may", "might",
+    "more", "most", "must", "my", "need", "needs", "no", "not", "of", "on", "once", "only", "or",
+    "other", "our", "out", "over", "please", "shall", "she", "should", "so", "some", "such",
+    "than", "that", "the", "their", "them", "then", "there", "these", "they", "this", "those",
+    "through", "to", "too", "under", "until", "up", "us", "very", "was", "we", "were", "will",
+    "with", "would", "you", "your", "says", "say", "want", "wants", "there's", "i'm",
+}
+
+# Information-seeking suffix per question word, mirroring the LLM expander's prompt style
+INTENT_TERMS = {
+    "how": "process procedure steps",
+    "what": "definition details information",
+    "who": "responsibility contact handling",
+    "when": "timeline schedule requirements",
+    "where": "location system access",
+    "why": "reason policy guidelines",
+    "which": "options requirements guidelines",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens."""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+def content_terms(text: str) -> List[str]:
+    """Tokens without stopwords and question words, in order, without duplicates."""
+    seen = set()
+    terms = []
+    for token in tokenize(text):
+        if token not in STOPWORDS and len(token) > 1 and token not in seen:
+            seen.add(token)
+            terms.append(token)
+    return terms
+
+
+class SynonymTable:
+    """Acronyms, related terms and document frequencies mined from the indexed corpus."""
+
+    def __init__(
+        self,
+        acronyms: Dict[str, str] = None,
+        related: Dict[str, List[str]] = None,
+        doc_freq: Dict[str, int] = None,
+        num_docs: int = 0
+    ):
+        self.acronyms = acronyms or {}
+        self.related = related or {}
+        self.doc_freq = doc_freq or {}
+        self.num_docs = num_docs
+        # Long form -> acronym, so either spelling can be swapped for the other
+        self.expansions = {long_form: acronym for acronym, long_form in self.acronyms.items()}
+
+    def idf(self, term: str) -> float:
+        if not self.num_docs:
+            return 1.0
+        return math.log((self.num_docs + 1) / (self.doc_freq.get(term, 0) + 1)) + 1.0
+
+    def alternatives(self, term: str) -> List[str]:
+        """Alternative spellings/terms for a query term, best first."""
+        alternatives = []
+        if term in self.acronyms:
+            alternatives.append(self.acronyms[term])
+        if term in self.expansions:
+            alternatives.append(self.expansions[term])
+        alternatives.extend(self.related.get(term, []))
+        return alternatives
+
+    @classmethod
+    def load(cls, path: Path = None) -> "SynonymTable":
+        path = Path(path or PathConfig.SYNONYM_TABLE)
+        if not path.exists():
+            print(f"[WARN] Synonym table not found at {path}; local expansion uses feedback only")
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("acronyms"), data.get("related"), data.get("doc_freq"), data.get("num_docs", 0))
+
+    def save(self, path: Path = None):
+        path = Path(path or PathConfig.SYNONYM_TABLE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "acronyms": self.acronyms,
+                "related": self.related,
+                "doc_freq": self.doc_freq,
+                "num_docs": self.num_docs,
+            }, f)
+
+    @classmethod
+    def build(
+        cls,
+        texts: Iterable[str],
+        window: int = 5,
+        min_count: int = 3,
+        max_related: int = 3,
+        min_pmi: float = 2.0,
+        max_vocab: int = 20000
+    ) -> "SynonymTable":
+        """
+        Mine the table from corpus chunks.
+
+        Acronyms come from "Long Form (LF)" definitions; related terms are the
+        highest-PMI neighbours within a sliding window.
+
+        Args:
+            texts: Chunk texts of the corpus
+            window: Co-occurrence window size in content tokens
+            min_count: Minimum co-occurrence count for a related pair
+            max_related: Related terms kept per term
+            min_pmi: Minimum pointwise mutual information for a related pair
+            max_vocab: Only the most frequent terms are considered for relations
+        """
+        acronyms = {}
+        doc_freq = Counter()
+        term_freq = Counter()
+        pair_freq = Counter()
+        num_docs = 0
+
+        token_lists = []
+        for text in texts:
+            num_docs += 1
+            for long_form, acronym in ACRONYM_PATTERN.findall(text):
+                words = long_form.split()
+                # Keep the shortest suffix of the phrase whose initials spell the acronym
+                for start in range(len(words)):
+                    initials = "".join(word[0] for word in words[start:]).upper()
+                    if initials == acronym.upper():
+                        acronyms[acronym.lower()] = " ".join(words[start:]).lower()
+                        break
+            tokens = [t for t in tokenize(text) if t not in STOPWORDS and len(t) > 1]
+            doc_freq.update(set(tokens))
+            term_freq.update(tokens)
+            token_lists.append(tokens)
+
+        vocab = {term for term, _ in term_freq.most_common(max_vocab)}
+        for tokens in token_lists:
+            tokens = [t for t in tokens if t in vocab]
+            for i, term in enumerate(tokens):
+                for other in tokens[i + 1:i + 1 + window]:
+                    if other != term:
+                        pair_freq[tuple(sorted((term, other)))] += 1
+
+        total_terms = sum(term_freq.values()) or 1
+        total_pairs = sum(pair_freq.values()) or 1
+        scored = defaultdict(list)
+        for (a, b), count in pair_freq.items():
+            if count < min_count:
+                continue
+            pmi = math.log((count / total_pairs) / ((term_freq[a] / total_terms) * (term_freq[b] / total_terms)))
+            if pmi >= min_pmi:
+                scored[a].append((pmi, b))
+                scored[b].append((pmi, a))
+
+        related = {
+            term: [other for _, other in sorted(neighbours, reverse=True)[:max_related]]
+            for term, neighbours in scored.items()
+        }
+        return cls(acronyms, related, dict(doc_freq), num_docs)
+
+
+class LocalQueryExpander:
+    """
+    Drop-in replacement for QueryExpansionAgent.expand_query that needs no LLM.
+
+    Produces the original query plus three statement-style variants:
+    1. the query's content terms with an intent suffix ("how" -> "process procedure steps")
+    2. the same terms with corpus synonyms / acronym expansions substituted
+    3. an RM3 query: query terms interpolated with the strongest feedback terms
+       from the top retrieved chunks
+    """
+
+    def __init__(
+        self,
+        synonym_table: SynonymTable = None,
+        synonym_table_path: str = None,
+        feedback_terms: int = 5,
+        original_weight: float = 0.6
+    ):
+        """
+        Initialize the local expander.
+
+        Args:
+            synonym_table: Pre-loaded synonym table
+            synonym_table_path: Path to the mined table (defaults to PathConfig)
+            feedback_terms: Number of expansion terms taken from feedback documents
+            original_weight: RM3 interpolation weight of the original query model
+        """
+        self.synonyms = synonym_table or SynonymTable.load(synonym_table_path)
+        self.feedback_terms = feedback_terms
+        self.original_weight = original_weight
+
+    def relevance_model(
+        self,
+        feedback_docs: List[str],
+        feedback_scores: Optional[List[float]] = None
+    ) -> Dict[str, float]:
+        """
+        Estimate P(w|R) from feedback documents weighted by their retrieval scores.
+
+        Args:
+            feedback_docs: Top retrieved chunk texts
+            feedback_scores: Their relevance scores (uniform if not given)
+
+        Returns:
+            Normalised term weights
+        """
+        if not feedback_docs:
+            return {}
+        scores = feedback_scores or [1.0] * len(feedback_docs)
+        # Softmax keeps negative/raw reranker logits usable as document weights
+        top = max(scores)
+        doc_weights = [math.exp(score - top) for score in scores]
+        norm = sum(doc_weights)
+
+        model = Counter()
+        for doc, weight in zip(feedback_docs, doc_weights):
+            tokens = [t for t in tokenize(doc) if t not in STOPWORDS and len(t) > 1]
+            if not tokens:
+                continue
+            for term, count in Counter(tokens).items():
+                model[term] += (weight / norm) * (count / len(tokens)) * self.synonyms.idf(term)
+
+        total = sum(model.values()) or 1.0
+        return {term: weight / total for term, weight in model.items()}
+
+    def expand_query(
+        self,
+        original_query: str,
+        feedback_docs: Optional[List[str]] = None,
+        feedback_scores: Optional[List[float]] = None
+    ) -> list:
+        """
+        Expand a query without calling an LLM.
+
+        Args:
+            original_query: The original question
+            feedback_docs: Top chunks retrieved for the original query
+            feedback_scores: Their reranker scores
+
+        Returns:
+            List of queries: original + up to 3 transformed variations
+        """
+        terms = content_terms(original_query)
+        if not terms:
+            return [original_query]
+
+        question_word = next((t for t in tokenize(original_query) if t in QUESTION_WORDS), None)
+        intent = INTENT_TERMS.get(question_word, "process guidelines")
+        statement = " ".join(terms + [t for t in intent.split() if t not in terms])
+
+        # Swap acronyms and their long forms, then add the closest related corpus terms
+        substituted = []
+        for term in terms:
+            if term in self.synonyms.acronyms or term in self.synonyms.expansions:
+                substituted.extend(self.synonyms.alternatives(term)[0].split())
+            else:
+                substituted.append(term)
+        related = [r for term in terms for r in self.synonyms.related.get(term, [])[:1]]
+        synonym_variant = " ".join(dict.fromkeys(substituted + [r for r in related if r not in terms][:2]))
+
+        # RM3: interpolate the query model with the feedback relevance model
+        query_model = {term: 1.0 / len(terms) for term in terms}
+        feedback_model = self.relevance_model(feedback_docs or [], feedback_scores)
+        combined = Counter({t: self.original_weight * w for t, w in query_model.items()})
+        for term, weight in feedback_model.items():
+            combined[term] += (1 - self.original_weight) * weight
+        expansion = [t for t, _ in Counter(feedback_model).most_common() if t not in query_model]
+        expansion = expansion[:self.feedback_terms]
+        rm3_terms = [t for t, _ in combined.most_common() if t in query_model or t in expansion]
+        rm3_variant = " ".join(rm3_terms)
+
+        if synonym_variant == " ".join(terms) and expansion:
+            # No synonyms known: swap in the strongest feedback terms instead
+            synonym_variant = " ".join(terms[:2] + expansion[:3])
+
+        transformed = [original_query]
+        for variant in (statement, synonym_variant, rm3_variant):
+            if variant and variant not in transformed:
+                transformed.append(variant)
+
+        print(f"[Local Expansion] '{original_query}' -> '{transformed}'")
+        return transformed
+
+
+def build_synonym_table(db_path: str = None, collection_name: str = "my_files",
+                        output_path: str = None, page_size: int = 1000) -> SynonymTable:
+    """Mine the synonym table from every chunk of a Chroma collection and save it."""
+    import chromadb
+
+    db_path = db_path or str(PathConfig.get_db_path())
+    collection = chromadb.PersistentClient(path=db_path).get_or_create_collection(collection_name)
+
+    def iter_documents():
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=page_size, offset=offset)
+            documents = page.get("documents") or []
+            if not documents:
+                return
+            yield from documents
+            offset += len(documents)
+
+    table = SynonymTable.build(iter_documents())
+    table.save(output_path)
+    print(f"[INFO] Synonym table: {len(table.acronyms)} acronyms, {len(table.related)} related terms "
+          f"from {table.num_docs} chunks -> {output_path or PathConfig.SYNONYM_TABLE}")
+    return table
+
+
+if __name__ == "__main__":
+    build_synonym_table(collection_name=os.getenv("CHROMA_COLLECTION", "my_files"))
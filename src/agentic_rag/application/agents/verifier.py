@@ -1,9 +1,11 @@
 from crewai import Agent, Task, Crew
 from crewai.llm import LLM as BaseLLM
+import time
 import yaml
 import requests
 from pydantic import BaseModel, Field
 from agentic_rag.domain.utils import PathConfig
+from agentic_rag.infrastructure.llm.router import LLMRouter
 
 
 class VerificationOutput(BaseModel):
@@ -14,6 +16,13 @@ class VerificationOutput(BaseModel):
     answer: str = Field(..., description="Answer to the question")
 
 
+class RelevanceOutput(BaseModel):
+    """Output schema for a relevance-only verdict"""
+    
+    is_relevant_context: bool = Field(..., description="Context relevance to the question")
+    reasoning: str = Field(..., description="Short explanation of the verdict")
+
+
 class AnswerVerificationAgent:
     """
     CrewAI agent that intelligently verifies if retrieved context is relevant to a question
@@ -44,25 +53,40 @@ class AnswerVerificationAgent:
         
         class CustomLLM(BaseLLM):
             def __init__(self, model: str, api_key: str, endpoint: str, temperature: float = 0.7, 
-                        context_window: int = 8192, timeout: int = 120):
+                        context_window: int = 8192, timeout: int = 120, router: LLMRouter = None,
+                        deadline: float = None):
                 super().__init__(model=model, temperature=temperature)
                 self.api_key = api_key
                 self.endpoint = endpoint
                 self.context_window = context_window
                 self.timeout = timeout
+                self.router = router or LLMRouter([{"model": model, "api_key": api_key, "endpoint": endpoint}])
+                # time.monotonic() after which calls raise TimeoutError (None = no limit)
+                self.deadline = deadline
 
             def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
                 if isinstance(messages, str):
                     messages = [{"role": "user", "content": messages}]
-                payload = {"model": self.model, "messages": messages, "temperature": self.temperature}
-                response = requests.post(
-                    self.endpoint,
-                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                response_data = response.json()
+
+                remaining, request_timeout = None, self.timeout
+                if self.deadline is not None:
+                    remaining = self.deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("verifier: out of time")
+                    request_timeout = min(self.timeout, remaining)
+
+                def post(deployment: dict) -> dict:
+                    payload = {"model": deployment["model"], "messages": messages, "temperature": self.temperature}
+                    response = requests.post(
+                        deployment["endpoint"],
+                        headers={"Authorization": f"Bearer {deployment['api_key']}", "Content-Type": "application/json"},
+                        json=payload,
+                        timeout=request_timeout
+                    )
+                    response.raise_for_status()
+                    return response.json()
+
+                response_data = self.router.call(post, timeout=remaining)
                 message = response_data["choices"][0]["message"]
                 return message.get("content", "")
 
@@ -78,10 +102,87 @@ class AnswerVerificationAgent:
             endpoint=llm_settings['endpoint'],
             temperature=0.3,  # Lower temperature for consistent, objective evaluation
             context_window=llm_settings['context_window_size'],
-            timeout=llm_settings['timeout']
+            timeout=llm_settings['timeout'],
+            router=LLMRouter.from_config(llm_settings, name="verifier")
+        )
+    
+    def _llm_within(self, timeout: float = None) -> BaseLLM:
+        """The LLM, or a copy sharing its router whose calls raise TimeoutError after timeout seconds."""
+        if timeout is None:
+            return self.llm
+        llm = self.llm
+        return type(llm)(
+            model=llm.model,
+            api_key=llm.api_key,
+            endpoint=llm.endpoint,
+            temperature=llm.temperature,
+            context_window=llm.context_window,
+            timeout=llm.timeout,
+            router=llm.router,
+            deadline=time.monotonic() + timeout
+        )
+    
+    def verify_context(self, question: str, context: str, timeout: float = None) -> dict:
+        """
+        Decide only whether the context is relevant to the question, without answering it.
+        
+        Much shorter than verify_context_and_answer, so it can run alongside
+        the generator, whose answer is used once the verdict accepts the context.
+        
+        Args:
+            question: The question asked by the user
+            context: The retrieved context to verify
+            timeout: Seconds the LLM calls may take in total (None = no limit)
+            
+        Returns:
+            Dictionary with is_relevant_context (bool) and reasoning (str)
+        """
+        agent = Agent(
+            role="Context Relevance Analyst",
+            goal="Decide whether retrieved context is relevant to a question",
+            backstory="""You are an expert context analyst. You judge whether retrieved
+            context has any meaningful connection to a question: matching topics, concepts
+            or entities, and information that could help answer it, even partially. Context
+            about a different topic or domain, with no useful information for the question,
+            is not relevant. You do not answer the question yourself.
+            """,
+            verbose=False,
+            llm=self._llm_within(timeout),
+            allow_delegation=False,
         )
+        
+        task = Task(
+            description=f"""
+            Decide whether the provided context is relevant to the question.
+            
+            QUESTION:
+            {question}
+            
+            RETRIEVED CONTEXT:
+            {context}
+            
+            Mark it as RELEVANT if the context discusses the topic asked about or contains
+            information useful for answering, even partially. Mark it as NOT RELEVANT if it
+            is about a completely different topic and provides no useful information.
+            Do not answer the question.
+            """,
+            expected_output="""Structured output with:
+            1. is_relevant_context: true/false
+            2. reasoning: short explanation""",
+            agent=agent,
+            output_pydantic=RelevanceOutput
+        )
+        
+        result = Crew(agents=[agent], tasks=[task], verbose=False).kickoff()
+        
+        verdict = {
+            "is_relevant_context": result.pydantic.is_relevant_context,
+            "reasoning": result.pydantic.reasoning
+        }
+        print(f"[INFO] Context relevant: {verdict['is_relevant_context']} ({verdict['reasoning']})")
+        return verdict
     
-    def verify_context_and_answer(self, question: str, context: str) -> dict:
+    def verify_context_and_answer(self, question: str, context: str, timeout: float = None) -> dict:
         """
         Intelligently verify if the provided context is relevant to the question.
         If relevant, generate a smart answer from the context.
@@ -89,6 +190,7 @@ class AnswerVerificationAgent:
         Args:
             question: The question asked by the user
             context: The retrieved context to verify and use for answering
+            timeout: Seconds the LLM calls may take in total (None = no limit)
             
         Returns:
             Dictionary containing verification results with the following keys:
@@ -151,7 +253,7 @@ class AnswerVerificationAgent:
             irrelevant, you clearly mark it as such without attempting to force an answer.
             """,
             verbose=False,
-            llm=self.llm,
+            llm=self._llm_within(timeout),
             allow_delegation=False,
         )
         
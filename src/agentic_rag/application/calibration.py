@@ -0,0 +1,210 @@
+"""Online calibration of the verification threshold from observed reranker scores"""
+
+import bisect
+import json
+import os
+import random
+import threading
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from agentic_rag.domain.utils import PathConfig
+
+
+def isotonic_fit(samples: List[Tuple[float, bool]]) -> List[Tuple[float, float]]:
+    """
+    Fit a non-decreasing step function P(relevant | score) with pool-adjacent-violators.
+
+    Args:
+        samples: (score, is_relevant) pairs
+
+    Returns:
+        List of (upper_score, probability) blocks sorted by score
+    """
+    blocks = []  # [upper_score, total, count]
+    for score, label in sorted(samples):
+        blocks.append([score, float(label), 1])
+        # Merge backwards while the sequence is decreasing
+        while len(blocks) > 1 and blocks[-2][1] / blocks[-2][2] > blocks[-1][1] / blocks[-1][2]:
+            upper, total, count = blocks.pop()
+            blocks[-1][0] = upper
+            blocks[-1][1] += total
+            blocks[-1][2] += count
+    return [(upper, total / count) for upper, total, count in blocks]
+
+
+class ThresholdCalibrator:
+    """
+    Learns the verification threshold from reranker scores and verifier outcomes.
+
+    Every query's best score is recorded, and every verifier run records
+    whether the context was accepted. From these an isotonic fit maps raw
+    scores to a calibrated relevance probability, and the threshold is chosen
+    so that either a target share of queries is sent to the verifier, or the
+    queries answered without verification reach a target precision (the
+    stricter of the two wins when both are set).
+
+    Outcomes are only observed below the threshold, so a small share of
+    queries above it is verified as well (``exploration_rate``) to keep the
+    fit unbiased. State is persisted as JSON and reloaded on restart.
+    """
+
+    def __init__(
+        self,
+        storage_file: Path = None,
+        initial_threshold: float = 0.25,
+        target_invocation_rate: Optional[float] = 0.3,
+        target_precision: Optional[float] = None,
+        exploration_rate: float = 0.02,
+        min_samples: int = 50,
+        min_outcomes: int = 30,
+        refit_every: int = 25,
+        max_history: int = 5000,
+        min_threshold: float = 0.0,
+        max_threshold: float = 1.0
+    ):
+        """
+        Initialize the calibrator.
+
+        Args:
+            storage_file: JSON file for persisted state (defaults to PathConfig)
+            initial_threshold: Threshold used until enough data is observed
+            target_invocation_rate: Desired share of queries sent to the verifier
+            target_precision: Desired relevance rate of unverified answers
+            exploration_rate: Share of above-threshold queries verified for labels
+            min_samples: Scores needed before fitting by invocation rate
+            min_outcomes: Verifier outcomes needed before fitting by precision
+            refit_every: Refit and persist after this many new observations
+            max_history: Number of most recent scores/outcomes kept
+            min_threshold: Lower bound for the chosen threshold
+            max_threshold: Upper bound for the chosen threshold
+        """
+        self.storage_file = Path(storage_file or PathConfig.CALIBRATION_FILE)
+        self.initial_threshold = initial_threshold
+        self.target_invocation_rate = target_invocation_rate
+        self.target_precision = target_precision
+        self.exploration_rate = exploration_rate
+        self.min_samples = min_samples
+        self.min_outcomes = min_outcomes
+        self.refit_every = refit_every
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+
+        self.scores = deque(maxlen=max_history)
+        self.outcomes = deque(maxlen=max_history)
+        self.calibration: List[Tuple[float, float]] = []
+        self.threshold = initial_threshold
+        self._since_fit = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def record_score(self, score: float):
+        """Record the best reranker score of a query."""
+        with self._lock:
+            self.scores.append(float(score))
+            self._observed()
+
+    def record_outcome(self, score: float, is_relevant: bool):
+        """Record a verifier decision for a query with the given best score."""
+        with self._lock:
+            self.outcomes.append((float(score), bool(is_relevant)))
+            self._observed()
+
+    def should_explore(self) -> bool:
+        """Whether to verify an above-threshold query to collect an unbiased label."""
+        return random.random() < self.exploration_rate
+
+    def probability(self, score: float) -> Optional[float]:
+        """Calibrated probability that context with this score is relevant."""
+        calibration = self.calibration
+        if not calibration:
+            return None
+        uppers = [upper for upper, _ in calibration]
+        index = min(bisect.bisect_left(uppers, score), len(calibration) - 1)
+        return calibration[index][1]
+
+    def fit(self):
+        """Refit the calibration and choose a new threshold."""
+        with self._lock:
+            self._fit()
+            self._save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            scores = list(self.scores)
+            outcomes = list(self.outcomes)
+        below = sum(1 for s in scores if s < self.threshold)
+        return {
+            "threshold": self.threshold,
+            "samples": len(scores),
+            "outcomes": len(outcomes),
+            "invocation_rate": below / len(scores) if scores else None,
+            "relevant_rate": sum(1 for _, r in outcomes if r) / len(outcomes) if outcomes else None,
+        }
+
+    def _observed(self):
+        self._since_fit += 1
+        if self._since_fit >= self.refit_every:
+            self._fit()
+            self._save()
+
+    def _fit(self):
+        self._since_fit = 0
+        scores = sorted(self.scores)
+        candidates = []
+
+        if self.target_invocation_rate is not None and len(scores) >= self.min_samples:
+            index = min(len(scores) - 1, int(self.target_invocation_rate * len(scores)))
+            candidates.append(scores[index])
+
+        if len(self.outcomes) >= self.min_outcomes:
+            self.calibration = isotonic_fit(list(self.outcomes))
+            if self.target_precision is not None and scores:
+                candidates.append(self._precision_threshold(scores))
+
+        if candidates:
+            threshold = min(self.max_threshold, max(self.min_threshold, max(candidates)))
+            if threshold != self.threshold:
+                print(f"[INFO] Verification threshold calibrated: {self.threshold:.4f} -> {threshold:.4f}")
+            self.threshold = threshold
+
+    def _precision_threshold(self, scores: List[float]) -> float:
+        """Lowest threshold whose unverified queries reach the target precision."""
+        probabilities = [self.probability(s) for s in scores]
+        # Walk from the top score down, tracking the mean probability of the tail
+        total = 0.0
+        threshold = self.max_threshold
+        for count, (score, probability) in enumerate(zip(reversed(scores), reversed(probabilities)), 1):
+            total += probability
+            if total / count >= self.target_precision:
+                threshold = score
+        return threshold
+
+    def _load(self):
+        if not self.storage_file.exists():
+            return
+        try:
+            with open(self.storage_file, "r") as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[WARN] Could not load calibration from {self.storage_file}: {e}")
+            return
+        self.scores.extend(state.get("scores", []))
+        self.outcomes.extend((s, bool(r)) for s, r in state.get("outcomes", []))
+        self.calibration = [tuple(block) for block in state.get("calibration", [])]
+        self.threshold = state.get("threshold", self.initial_threshold)
+        print(f"[INFO] Loaded verification calibration (threshold={self.threshold:.4f})")
+
+    def _save(self):
+        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "threshold": self.threshold,
+            "calibration": self.calibration,
+            "scores": list(self.scores),
+            "outcomes": list(self.outcomes),
+        }
+        tmp_file = self.storage_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.storage_file)
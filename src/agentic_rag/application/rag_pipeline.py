@@ -1,10 +1,16 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import List, Tuple, Optional
 from sentence_transformers import SentenceTransformer, CrossEncoder
 import chromadb
 from agentic_rag.infrastructure.llm.generator import LanguageModel
+from agentic_rag.infrastructure.persistence.parents import ParentStore
 from agentic_rag.application.agents.expander import QueryExpansionAgent
 from agentic_rag.application.agents.verifier import AnswerVerificationAgent
+from agentic_rag.application.agents.local_expander import LocalQueryExpander
+from agentic_rag.application.calibration import ThresholdCalibrator
+from agentic_rag.domain.budget import LatencyBudget
 from agentic_rag.domain.utils import PathConfig
 
 
@@ -64,7 +70,18 @@ class RAGWithReranker:
         score_threshold: float = 0.0,
         verification_threshold: float = 0.25,
         use_query_expansion: bool = True,
-        llm_config_path: str = None
+        llm_config_path: str = None,
+        time_budget: Optional[float] = None,
+        stage_reserves: Optional[dict] = None,
+        min_max_tokens: int = 128,
+        speculative_band: float = 0.0,
+        calibrator: Optional[ThresholdCalibrator] = None,
+        local_expander: Optional[LocalQueryExpander] = None,
+        expansion_mode: Optional[str] = None,
+        expansion_timeout: Optional[float] = None,
+        parent_store: Optional[ParentStore] = None,
+        expansion_workers: int = 4,
+        generation_workers: int = 4
     ):
         """
         Initialize RAG system with re-ranker and query expansion.
@@ -80,6 +97,24 @@ class RAGWithReranker:
             verification_threshold: Score threshold below which verification agent is invoked
             use_query_expansion: Enable query expansion (generates 3 queries)
             llm_config_path: Path to LLM config for query expansion agent (defaults to PathConfig)
+            time_budget: Default per-request time budget in seconds (None = unlimited)
+            stage_reserves: Per-stage time reserves overriding DEFAULT_STAGE_RESERVES
+            min_max_tokens: Lowest max_tokens used when generation is degraded
+            speculative_band: When the best score is below verification_threshold by at most
+                this distance, run the generator alongside a relevance-only verdict instead of
+                the answering verifier (0 = disabled)
+            calibrator: Learns the verification threshold from observed scores and
+                verifier outcomes; verification_threshold is then only the starting point
+            local_expander: LLM-free expander used for "local" mode and as LLM fallback
+            expansion_mode: Default expansion mode: "llm", "local" or "none"
+                (defaults to "llm" if use_query_expansion else "none")
+            expansion_timeout: Seconds to wait for LLM expansion before falling back
+            parent_store: Parent sections of child chunks; reranked children are
+                replaced by their (deduplicated) parents in the context
+            expansion_workers: Threads for LLM expansions, shared by all requests; when every one
+                is busy (e.g. with expansions abandoned after expansion_timeout) requests fall back
+                instead of queueing
+            generation_workers: Threads for speculative generations and background verifications
         """
         # Use PathConfig defaults if not provided
         config_path = config_path or str(PathConfig.get_config_path())
@@ -114,16 +149,73 @@ class RAGWithReranker:
         self.rerank_top_k = rerank_top_k
         self.score_threshold = score_threshold
         self.verification_threshold = verification_threshold
+        self.time_budget = time_budget
+        self.stage_reserves = stage_reserves
+        self.min_max_tokens = min_max_tokens
+        self.speculative_band = speculative_band
+        self.calibrator = calibrator
+        self.local_expander = local_expander
+        self.expansion_mode = expansion_mode or ("llm" if use_query_expansion else "none")
+        self.expansion_timeout = expansion_timeout
+        self.parent_store = parent_store
+        # Expansion and generation get separate pools so slow expansions cannot delay generations
+        self._expansion_executor = ThreadPoolExecutor(max_workers=expansion_workers, thread_name_prefix="rag-expand")
+        self._expansion_slots = threading.BoundedSemaphore(expansion_workers)
+        self._generation_executor = ThreadPoolExecutor(max_workers=generation_workers,
+                                                       thread_name_prefix="rag-generate")
+        # At most one exploration verification runs in the background at a time
+        self._exploring = threading.Semaphore(1)
         
         print(f"[INFO] RAG with Re-ranker initialized successfully")
         print(f"[INFO] Config: initial_k={initial_k}, rerank_top_k={rerank_top_k}, threshold={score_threshold}")
         if use_query_expansion:
             print(f"[INFO] Query Expansion: ENABLED - generates 3 expanded queries")
     
+    def metrics(self) -> dict:
+        """Hedge/fallback metrics of every LLM client used by the pipeline."""
+        llm_metrics = {
+            "generator": self.llm.router.metrics(),
+            "verifier": self.verifier.llm.router.metrics(),
+        }
+        if self.query_expander:
+            llm_metrics["expander"] = self.query_expander.llm.router.metrics()
+        result = {"llm": llm_metrics}
+        if self.calibrator:
+            result["verification_calibration"] = self.calibrator.stats()
+        return result
+
+    def _explore(self, query: str, context: str, best_score: float):
+        """
+        Verify a confident query in the background and record the outcome.
+
+        The verdict only feeds the calibrator; the user gets the generated
+        answer whatever the verifier decides.
+        """
+        if not self._exploring.acquire(blocking=False):
+            return  # the previous exploration is still running
+
+        def verify():
+            try:
+                result = self.verifier.verify_context_and_answer(question=query, context=context)
+                self.calibrator.record_outcome(best_score, result['is_relevant_context'])
+            except Exception as e:
+                print(f"[WARNING] Exploration verification failed: {e}")
+            finally:
+                self._exploring.release()
+
+        self._generation_executor.submit(verify)
+
+    def current_verification_threshold(self) -> float:
+        """Calibrated threshold if a calibrator is configured, else the fixed one."""
+        if self.calibrator:
+            return self.calibrator.threshold
+        return self.verification_threshold
+
     def retrieve_and_rerank(
         self, 
         query: str,
-        verbose: bool = True
+        verbose: bool = True,
+        initial_k: Optional[int] = None
     ) -> Tuple[List[str], List[dict], List[float]]:
         """
         Retrieve documents from Chroma and re-rank them.
@@ -131,18 +223,21 @@ class RAGWithReranker:
         Args:
             query: Search query
             verbose: Whether to print debug information
+            initial_k: Override for the number of documents to retrieve
             
         Returns:
             Tuple of (selected_documents, metadatas, scores)
         """
+        initial_k = initial_k or self.initial_k
+
         # Step 1: Initial retrieval from ChromaDB
         if verbose:
-            print(f"\n[STEP 1] Retrieving top {self.initial_k} documents from ChromaDB...")
+            print(f"\n[STEP 1] Retrieving top {initial_k} documents from ChromaDB...")
         
         query_embedding = self.embedder.encode([query]).tolist()
         results = self.collection.query(
             query_embeddings=query_embedding,
-            n_results=self.initial_k
+            n_results=initial_k
         )
         
         initial_docs = results["documents"][0]
@@ -169,17 +264,36 @@ class RAGWithReranker:
         if verbose:
             print(f"\n[STEP 3] Selecting top {self.rerank_top_k} documents (threshold={self.score_threshold})...")
             print("\nRe-ranking Results:")
-        
-        for rank, (orig_idx, score) in enumerate(ranked_indices_scores[:self.rerank_top_k], 1):
-            if score >= self.score_threshold:
-                selected_docs.append(initial_docs[orig_idx])
-                selected_metas.append(initial_metas[orig_idx])
-                selected_scores.append(score)
-                
-                if verbose:
-                    file_name = initial_metas[orig_idx].get('file', 'unknown')
-                    chunk_num = initial_metas[orig_idx].get('chunk', '?')
-                    print(f"  #{rank} [Score: {score:.4f}] {os.path.basename(file_name)} (chunk {chunk_num})")
+
+        # Child chunks are expanded to their parent sections; a parent is used
+        # once, at the rank (and score) of its best child
+        parent_texts = {}
+        if self.parent_store:
+            parent_texts = self.parent_store.get_many(
+                meta["parent"] for meta in initial_metas if meta and meta.get("parent")
+            )
+        used_parents = set()
+
+        for rank, (orig_idx, score) in enumerate(ranked_indices_scores, 1):
+            if len(selected_docs) >= self.rerank_top_k or score < self.score_threshold:
+                break
+            doc, meta = initial_docs[orig_idx], initial_metas[orig_idx]
+            parent_id = (meta or {}).get("parent")
+            if parent_id in parent_texts:
+                if parent_id in used_parents:
+                    continue
+                used_parents.add(parent_id)
+                doc = parent_texts[parent_id]
+
+            selected_docs.append(doc)
+            selected_metas.append(meta)
+            selected_scores.append(score)
+
+            if verbose:
+                file_name = meta.get('file', 'unknown')
+                chunk_num = meta.get('chunk', '?')
+                section = " -> parent section" if parent_id in parent_texts else ""
+                print(f"  #{rank} [Score: {score:.4f}] {os.path.basename(file_name)} (chunk {chunk_num}){section}")
         
         if verbose:
             print(f"\n[INFO] Selected {len(selected_docs)} documents for context")
@@ -215,7 +329,13 @@ class RAGWithReranker:
         
         return "\n\n" + "="*80 + "\n\n".join(context_parts)
     
-    def query(self, query: str, verbose: bool = True) -> dict:
+    def query(
+        self,
+        query: str,
+        verbose: bool = True,
+        time_budget: Optional[float] = None,
+        expansion_mode: Optional[str] = None
+    ) -> dict:
         """
         Complete RAG pipeline with query expansion.
         
@@ -224,30 +344,106 @@ class RAGWithReranker:
         2. Retrieve and rerank for all 3 queries
         3. Use the query with the best score
         
+        Expansion uses the CrewAI agent ("llm") or the LLM-free
+        LocalQueryExpander ("local"), which feeds back the original query's
+        top chunks. The local expander also stands in when the LLM expansion
+        exceeds expansion_timeout or does not fit the time budget.
+        
+        When a time budget is set, every stage checks the remaining time first
+        and falls back to a cheaper path when it runs short: expansion is
+        skipped, fewer expanded queries are tried, initial_k is shrunk, the
+        verifier is skipped or max_tokens is lowered. The generator and
+        verifier calls get the remaining budget as their timeout; when it
+        fires, the request answers without them ("generation_timed_out" or
+        "verification_timed_out"). The applied fallbacks are listed under
+        "degradations" in the result.
+        
         Args:
             query: User query
             verbose: Whether to print debug information
+            time_budget: Total time budget in seconds (defaults to self.time_budget)
+            expansion_mode: "llm", "local" or "none" (defaults to self.expansion_mode)
             
         Returns:
             Dictionary with answer, context, and metadata
         """
+        budget = LatencyBudget(
+            time_budget if time_budget is not None else self.time_budget,
+            self.stage_reserves
+        )
+
         if verbose:
             print("="*80)
             print(f"🔍 Original Query: {query}")
             print("="*80)
         
-        if self.use_query_expansion or self.query_expander:
+        expansion_mode = expansion_mode or self.expansion_mode
+        if expansion_mode == "llm" and not self.query_expander:
+            expansion_mode = "local" if self.local_expander else "none"
+        if expansion_mode == "local" and not self.local_expander:
+            expansion_mode = "none"
+
+        if expansion_mode == "llm" and not budget.allows("expansion", "retrieval", "rerank", "generation"):
+            if verbose:
+                print(f"[BUDGET] {budget.remaining():.2f}s left, skipping LLM query expansion")
+            if self.local_expander:
+                budget.degrade("local_expansion")
+                expansion_mode = "local"
+            else:
+                budget.degrade("skipped_expansion")
+                expansion_mode = "none"
+
+        # Retrieval results already computed while expanding, keyed by query
+        retrieved = {}
+        expanded_queries = [query]
+
+        if expansion_mode == "llm" and not self._expansion_slots.acquire(blocking=False):
+            # Every expansion worker is still busy with a slow LLM call: do not queue behind them
+            if verbose:
+                print("[WARNING] All LLM expansion workers are busy")
+            if self.local_expander:
+                budget.degrade("local_expansion")
+                expansion_mode = "local"
+            else:
+                budget.degrade("skipped_expansion")
+                expansion_mode = "none"
+
+        if expansion_mode == "llm":
             if verbose:
                 print("[INFO] Query expansion is enabled")
                 print(f"[INFO] Generating 3 expanded queries...")
-            expanded_queries = self.query_expander.expand_query(query)
-            
-            if verbose:
-                print(f"[INFO] Generated {len(expanded_queries)} queries:")
-                for i, eq in enumerate(expanded_queries, 1):
-                    print(f"  {i}. {eq}")
-        else:
-            expanded_queries = [query]
+            # Never wait longer than the budget can spare for the remaining stages
+            timeout = self.expansion_timeout
+            if budget.is_limited:
+                spare = budget.remaining() - budget.reserve("retrieval", "rerank", "generation")
+                timeout = spare if timeout is None else min(timeout, spare)
+            pending_expansion = self._expansion_executor.submit(self.query_expander.expand_query, query)
+            pending_expansion.add_done_callback(lambda _: self._expansion_slots.release())
+            try:
+                expanded_queries = pending_expansion.result(timeout=timeout)
+            except FuturesTimeoutError:
+                # The LLM is slow: continue without it and discard its late result
+                pending_expansion.cancel()
+                if verbose:
+                    print(f"[WARNING] LLM expansion exceeded {timeout:.2f}s")
+                if self.local_expander:
+                    budget.degrade("local_expansion")
+                    expansion_mode = "local"
+                else:
+                    budget.degrade("skipped_expansion")
+
+        if expansion_mode == "local":
+            # Pseudo-relevance feedback needs the original query's top chunks first
+            retrieved[query] = self.retrieve_and_rerank(query, verbose=verbose)
+            feedback_docs, _, feedback_scores = retrieved[query]
+            expanded_queries = self.local_expander.expand_query(
+                query, feedback_docs=feedback_docs, feedback_scores=feedback_scores
+            )
+
+        if verbose and expansion_mode != "none":
+            print(f"[INFO] Generated {len(expanded_queries)} queries:")
+            for i, eq in enumerate(expanded_queries, 1):
+                print(f"  {i}. {eq}")
         
         # Track best result across all 3 queries
         best_result = None
@@ -255,6 +451,18 @@ class RAGWithReranker:
         
         # Try each expanded query
         for i, expanded_query in enumerate(expanded_queries, 1):
+            # The first query always runs; further ones only while time allows
+            if i > 1 and not budget.allows("retrieval", "rerank", "generation"):
+                budget.degrade("truncated_expanded_queries")
+                if verbose:
+                    print(f"[BUDGET] {budget.remaining():.2f}s left, skipping remaining expanded queries")
+                break
+
+            initial_k = self.initial_k
+            if not budget.allows("retrieval", "rerank", "generation"):
+                initial_k = max(self.rerank_top_k, self.initial_k // 2)
+                budget.degrade("reduced_initial_k")
+
             if verbose:
                 print(f"\n{'-'*80}")
                 print(f"🔍 Query {i}/{len(expanded_queries)}")
@@ -262,10 +470,14 @@ class RAGWithReranker:
                 print(f"{'-'*80}")
             
             # Retrieve and re-rank
-            documents, metadatas, scores = self.retrieve_and_rerank(
-                expanded_query, 
-                verbose=verbose
-            )
+            if expanded_query in retrieved:
+                documents, metadatas, scores = retrieved[expanded_query]
+            else:
+                documents, metadatas, scores = self.retrieve_and_rerank(
+                    expanded_query, 
+                    verbose=verbose,
+                    initial_k=initial_k
+                )
             
             # Check results
             if not documents or not scores:
@@ -293,6 +505,8 @@ class RAGWithReranker:
         
         # Check if we found anything
         if best_result is None or best_score <= 0:
+            if self.calibrator:
+                self.calibrator.record_score(best_score)
             if verbose:
                 print(f"\n{'='*80}")
                 print("❌ [NO RESULTS] No relevant documents found")
@@ -304,7 +518,8 @@ class RAGWithReranker:
                 "context": "",
                 "sources": [],
                 "scores": [],
-                "best_score": best_score
+                "best_score": best_score,
+                "degradations": budget.degradations
             }
         
         # Use best result
@@ -328,33 +543,117 @@ class RAGWithReranker:
         if verbose:
             print(f"\n[STEP 4] Generating answer with LLM...")
         
-        if best_score < self.verification_threshold:
-            print(f"[INFO] Answer score is less than {self.verification_threshold}. Verifying answer...")
-            verification_result = self.verifier.verify_context_and_answer(question=query, context=context)
+        verification_threshold = self.current_verification_threshold()
+        needs_verification = best_score < verification_threshold
+        # Only queries that are verified anyway speculate; confident ones are answered directly
+        speculate = (
+            needs_verification
+            and self.speculative_band > 0
+            and best_score >= verification_threshold - self.speculative_band
+        )
+
+        if needs_verification and not budget.allows("verification"):
+            # Out of time for the verifier: answer directly from the context
+            budget.degrade("skipped_verification")
+            if verbose:
+                print(f"[BUDGET] {budget.remaining():.2f}s left, skipping verification")
+            needs_verification = speculate = False
+        elif self.calibrator and not needs_verification and self.calibrator.should_explore():
+            # Occasionally verify confident queries too, so outcomes above the threshold are observed
+            self._explore(query, context, best_score)
+
+        if self.calibrator:
+            self.calibrator.record_score(best_score)
+
+        max_tokens = None
+        if not budget.allows("generation"):
+            max_tokens = max(self.min_max_tokens, int(self.llm.max_tokens * budget.fraction_of("generation")))
+            budget.degrade("reduced_max_tokens")
+            if verbose:
+                print(f"[BUDGET] {budget.remaining():.2f}s left, limiting answer to {max_tokens} tokens")
+
+        # LLM calls get the rest of the budget as their deadline, since a single
+        # slow call would otherwise overrun it however few tokens it may generate
+        stage = "verification" if needs_verification else "generation"
+        try:
+            if speculate:
+                # Borderline scores: the generator runs alongside a relevance-only verdict,
+                # so the answer is ready as soon as the verdict accepts the context
+                if verbose:
+                    print(f"[INFO] Score within {self.speculative_band} of {verification_threshold}. "
+                          f"Generating and verifying in parallel...")
+                generation = self._generation_executor.submit(
+                    self.llm.generate_answer, query, context, max_tokens, budget.timeout()
+                )
+                verdict = self.verifier.verify_context(question=query, context=context, timeout=budget.timeout())
+                if self.calibrator:
+                    self.calibrator.record_outcome(best_score, verdict['is_relevant_context'])
+
+                if not verdict['is_relevant_context']:
+                    # A rejected generation cannot be stopped once it runs; it finishes
+                    # in the background and its answer is discarded
+                    print(f"[INFO] Context is not relevant. Returning no information available.")
+                    return {
+                        "query": query,
+                        "query_used": query_used,
+                        "answer": "No information available. I couldn't find relevant resolution for this query.",
+                        "context": "",
+                        "sources": [],
+                        "scores": [],
+                        "best_score": best_score,
+                        "degradations": budget.degradations
+                    }
+                stage = "generation"
+                answer = generation.result()
+            elif needs_verification:
+                print(f"[INFO] Answer score is less than {verification_threshold}. Verifying answer...")
+                verification_result = self.verifier.verify_context_and_answer(
+                    question=query, context=context, timeout=budget.timeout()
+                )
+                if self.calibrator:
+                    self.calibrator.record_outcome(best_score, verification_result['is_relevant_context'])
+
+                if not verification_result['is_relevant_context']:
+                    print(f"[INFO] Answer is not valid. Returning no information available.")
+                    return {
+                        "query": query,
+                        "query_used": query_used,
+                        "answer": "No information available. I couldn't find relevant resolution for this query.",
+                        "context": "",
+                        "sources": [],
+                        "scores": [],
+                        "best_score": best_score,
+                        "degradations": budget.degradations
+                    }
 
-            if not verification_result['is_relevant_context']:
-                print(f"[INFO] Answer is not valid. Returning no information available.")
                 return {
                     "query": query,
                     "query_used": query_used,
-                    "answer": "No information available. I couldn't find relevant resolution for this query.",
-                    "context": "",
+                    "answer": verification_result['answer'],
+                    "context": context,
                     "sources": [],
                     "scores": [],
-                    "best_score": best_score
+                    "best_score": best_score,
+                    "degradations": budget.degradations
                 }
+            else:
+                answer = self.llm.generate_answer(query, context, max_tokens=max_tokens, timeout=budget.timeout())
+        except Exception as e:
+            if not budget.is_limited or not (isinstance(e, TimeoutError) or budget.remaining() <= 0):
+                raise
+            budget.degrade(f"{stage}_timed_out")
+            print(f"[BUDGET] {stage.capitalize()} did not finish within the time budget")
             return {
                 "query": query,
                 "query_used": query_used,
-                "answer": verification_result['answer'],
+                "answer": "No answer could be generated within the time budget.",
                 "context": context,
                 "sources": [],
                 "scores": [],
-                "best_score": best_score
+                "best_score": best_score,
+                "degradations": budget.degradations
             }
         
-        answer = self.llm.generate_answer(query, context)
-        
         if verbose:
             print(f"\n{'='*80}")
             print(f"📝 Answer:\n{answer}")
@@ -374,6 +673,7 @@ class RAGWithReranker:
                 for meta, score in zip(metadatas, scores)
             ],
             "scores": scores,
-            "best_score": best_score
+            "best_score": best_score,
+            "degradations": budget.degradations
         }
 
@@ -0,0 +1,87 @@
+"""Per-request latency budget for the RAG pipeline"""
+
+import time
+from typing import Dict, List, Optional
+
+
+# Default time (seconds) each stage is expected to need. A stage is only run
+# on its normal path when the remaining budget covers its own reserve plus
+# the reserves of the stages that still have to follow it.
+DEFAULT_STAGE_RESERVES: Dict[str, float] = {
+    "expansion": 4.0,
+    "retrieval": 0.5,
+    "rerank": 1.0,
+    "verification": 8.0,
+    "generation": 3.0,
+}
+
+
+class LatencyBudget:
+    """
+    Tracks the time left for a single request and the degradations applied
+    to stay within it.
+
+    A budget created with ``total_seconds=None`` is unlimited: every check
+    passes and no degradations are ever recorded.
+    """
+
+    def __init__(
+        self,
+        total_seconds: Optional[float] = None,
+        stage_reserves: Optional[Dict[str, float]] = None
+    ):
+        self.total_seconds = total_seconds
+        self.stage_reserves = dict(DEFAULT_STAGE_RESERVES)
+        if stage_reserves:
+            self.stage_reserves.update(stage_reserves)
+        self.started_at = time.monotonic()
+        self.degradations: List[str] = []
+
+    @property
+    def is_limited(self) -> bool:
+        return self.total_seconds is not None
+
+    def elapsed(self) -> float:
+        """Seconds spent since the budget was created."""
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (infinite when unlimited)."""
+        if self.total_seconds is None:
+            return float("inf")
+        return max(0.0, self.total_seconds - self.elapsed())
+
+    def timeout(self) -> Optional[float]:
+        """Remaining seconds as the timeout of a call that must end with the budget (None when unlimited)."""
+        if self.total_seconds is None:
+            return None
+        return self.remaining()
+
+    def reserve(self, *stages: str) -> float:
+        """Sum of the configured reserves for the given stages."""
+        return sum(self.stage_reserves.get(stage, 0.0) for stage in stages)
+
+    def allows(self, stage: str, *following: str) -> bool:
+        """
+        Check whether ``stage`` fits in the remaining budget.
+
+        Args:
+            stage: Stage about to run
+            following: Stages that must still run after it
+
+        Returns:
+            True if the remaining time covers the stage and what follows it
+        """
+        return self.remaining() >= self.reserve(stage, *following)
+
+    def fraction_of(self, stage: str) -> float:
+        """Remaining time as a fraction of a stage's reserve, capped at 1.0."""
+        reserve = self.reserve(stage)
+        if reserve <= 0:
+            return 1.0
+        return min(1.0, self.remaining() / reserve)
+
+    def degrade(self, degradation: str):
+        """Record a degradation once, in the order it happened."""
+        if degradation not in self.degradations:
+            self.degradations.append(degradation)
@@ -17,6 +17,7 @@ class PathConfig:
     SERVICE_ACCOUNT = CONFIG_DIR / "service_account.json"
     SP_CONFIG = CONFIG_DIR / "sp-config.json"
     BLOB_CONFIG = CONFIG_DIR / "blob-config.json"
+    CONNECTORS_CONFIG = CONFIG_DIR / "connectors.json"
     # Data directories
     DATA_DIR = PROJECT_ROOT / "data"
     DOWNLOADED_FILES = DATA_DIR / "downloaded_files"
@@ -31,12 +32,29 @@ class PathConfig:
     BLOB_DOWNLOADED_FILES = BLOB_DATA_DIR / "blob_downloaded_files"
     BLOB_SEEN_FILES = BLOB_DATA_DIR / "blob_seen_files.json"
     
+    # Local folder source (dropped files are ingested by the connector runtime)
+    LOCAL_DATA_DIR = DATA_DIR / "local-data"
+    LOCAL_INBOX = LOCAL_DATA_DIR / "inbox"
+    LOCAL_SEEN_FILES = LOCAL_DATA_DIR / "local_seen_files.sqlite3"
+
+    # Durable ingestion job queue and dead letters of all connector sources
+    INGESTION_QUEUE = DATA_DIR / "ingestion_queue.sqlite3"
+
     # Database paths
     CHROMA_STORE = PROJECT_ROOT / "chroma_store"
 
     # Upload data directories
     UPLOAD_DATA_DIR = DATA_DIR / "upload_data"
     UPLOAD_SEEN_FILES = UPLOAD_DATA_DIR / "upload_seen_files.json"
+
+    # Verification threshold calibration state
+    CALIBRATION_FILE = DATA_DIR / "calibration" / "verification_calibration.json"
+
+    # Corpus-mined synonym table for local query expansion
+    SYNONYM_TABLE = DATA_DIR / "expansion" / "synonym_table.json"
+
+    # Persistent chunk embedding cache (one subdirectory per embedder model)
+    EMBEDDING_CACHE_DIR = DATA_DIR / "embedding_cache"
     
     # Environment variable overrides (optional)
     @classmethod
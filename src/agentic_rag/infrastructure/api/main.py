@@ -1,9 +1,19 @@
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, status
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Literal, Optional
+from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from agentic_rag.infrastructure.connectors.upload.main import UploadConnector
 import uvicorn
-import threading
 from agentic_rag.application.rag_pipeline import RAGWithReranker
+from agentic_rag.application.calibration import ThresholdCalibrator
+from agentic_rag.application.agents.local_expander import LocalQueryExpander
+from agentic_rag.infrastructure.persistence.parents import ParentStore
+from agentic_rag.infrastructure.persistence.pipeline import IngestionJob
 from agentic_rag.domain.utils import PathConfig
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -52,6 +62,8 @@ config_file = str(PathConfig.get_config_path())
 
 class QueryRequest(BaseModel):
     question: str
+    time_budget: Optional[float] = None
+    expansion_mode: Optional[Literal["llm", "local", "none"]] = None
 
 
 # Global RAG system instance
@@ -69,20 +81,99 @@ def get_rag_system():
             score_threshold=0.0,
             verification_threshold=0.25,
             use_query_expansion=True,
+            calibrator=ThresholdCalibrator(initial_threshold=0.25, target_invocation_rate=0.3),
+            local_expander=LocalQueryExpander(),
+            expansion_timeout=8.0,
+            parent_store=ParentStore(PathConfig.get_db_path() / "parents.sqlite3"),
         )
     return rag_system
 
 
+# Connector sources polled in this process (see connectors/runtime.py)
+connector_runtime = None
+
+
 @app.on_event("startup")
 def startup_event():
-    """Start SharePoint watcher on startup (if exists)."""
+    """Start the connector runtime on startup (SharePoint unless connectors.json names the sources)."""
+    global connector_runtime
     try:
-        from agentic_rag.infrastructure.connectors.sharepoint.main import watcher
+        from agentic_rag.infrastructure.connectors.runtime import ConnectorRuntime
 
-        thread = threading.Thread(target=watcher.run, daemon=True)
-        thread.start()
+        runtime = ConnectorRuntime.from_config(default_sources=["sharepoint"])
+        if not runtime.sources:
+            # Nothing to poll: release its Chroma client, embedder and SQLite files now
+            runtime.stop()
+            return
+        connector_runtime = runtime
+        connector_runtime.start_in_thread()
     except ImportError:
-        print("[WARNING] SharePoint watcher not available")
+        print("[WARNING] Connector runtime not available")
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if connector_runtime is not None:
+        connector_runtime.stop()
+    if upload_processor is not None:
+        upload_processor.close()
+    if job_queue is not None:
+        job_queue.close()
+
+
+# ====== Upload Ingestion ======
+upload_connector = None
+upload_processor = None
+job_queue = None
+_upload_lock = threading.Lock()
+
+# Recent ingestion jobs by id, for /jobs/{id}
+ingestion_jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+MAX_TRACKED_JOBS = 1000
+
+
+def get_upload_connector():
+    """Blob client shared by all uploads (created, and the container ensured, once)."""
+    global upload_connector
+    with _upload_lock:
+        if upload_connector is None:
+            upload_connector = UploadConnector()
+    return upload_connector
+
+
+def get_upload_processor():
+    """Ingestion for uploads: the processor of the running connector sources, or a pipeline of its own."""
+    global upload_processor
+    if connector_runtime is not None and connector_runtime.sources:
+        return connector_runtime.processor
+    with _upload_lock:
+        if upload_processor is None:
+            from agentic_rag.infrastructure.connectors.processor import Processor
+
+            # Same ingestion options as the connector runtime, so uploads are chunked and embedded alike
+            processor_config = {}
+            if PathConfig.CONNECTORS_CONFIG.exists():
+                with open(PathConfig.CONNECTORS_CONFIG, "r", encoding="utf-8") as f:
+                    processor_config = json.load(f).get("processor", {})
+            upload_processor = Processor.from_config({"use_pipeline": True, **processor_config})
+    return upload_processor
+
+
+def get_job_queue():
+    """Connector job queue, opened once for inspection and requeueing (the watchers run the jobs)."""
+    global job_queue
+    with _upload_lock:
+        if job_queue is None:
+            from agentic_rag.infrastructure.connectors.job_queue import IngestionQueue
+
+            job_queue = IngestionQueue()
+    return job_queue
+
+
+def track_job(job: IngestionJob):
+    ingestion_jobs[job.id] = job
+    while len(ingestion_jobs) > MAX_TRACKED_JOBS:
+        ingestion_jobs.popitem(last=False)
 
 
 # ===============================
@@ -91,12 +182,69 @@ def startup_event():
 
 @app.post("/upload")
 async def upload_file(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    files: Optional[List[UploadFile]] = File(None),
+    authenticated: bool = Depends(authenticate)
+):
+    """Store uploaded files and queue them for ingestion; poll /jobs/{id} for their status."""
+    uploads = ([file] if file else []) + (files or [])
+    if not uploads:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file uploaded")
+
+    connector = get_upload_connector()
+    processor = get_upload_processor()
+    jobs = []
+    for upload in uploads:
+        local_path = await run_in_threadpool(connector.stage_file, upload.filename, upload.file)
+        # Blocks only while the ingestion queue is full
+        job = await run_in_threadpool(processor.submit_file, str(local_path))
+        track_job(job)
+        jobs.append(job.to_dict())
+    message = f"File '{uploads[0].filename}'" if len(uploads) == 1 else f"{len(uploads)} files"
+    return {"message": f"{message} queued for ingestion", "jobs": jobs}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
     authenticated: bool = Depends(authenticate)
 ):
-    client = UploadConnector()
-    client.upload_file(file.filename, file.file)
-    return {"message": f"File '{file.filename}' added to RAG successfully"}
+    """Status of an upload: queued, parsing, chunking, embedding, upserting, indexed, skipped or failed."""
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    return job.to_dict()
+
+
+@app.get("/ingestion/queue")
+def get_ingestion_queue(
+    source: Optional[str] = None,
+    limit: int = 100,
+    authenticated: bool = Depends(authenticate)
+):
+    """Connector jobs per state and the most recent dead letters (files that failed every retry)."""
+    queue = get_job_queue()
+    return {"stats": queue.stats(source), "dead_letters": queue.dead_letters(source, limit)}
+
+
+@app.post("/ingestion/dead-letters/{dead_letter_id}/requeue")
+def requeue_dead_letter(
+    dead_letter_id: int,
+    authenticated: bool = Depends(authenticate)
+):
+    """Give a dead letter fresh attempts; its watcher picks it up on its next poll."""
+    if not get_job_queue().requeue(dead_letter_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown dead letter")
+    return {"requeued": dead_letter_id}
+
+
+@app.post("/ingestion/dead-letters/requeue")
+def requeue_dead_letters(
+    source: Optional[str] = None,
+    authenticated: bool = Depends(authenticate)
+):
+    """Give every dead letter (of one source or all) fresh attempts."""
+    return {"requeued": get_job_queue().requeue_all(source)}
 
 
 @app.post("/ask")
@@ -105,8 +253,97 @@ def ask_question(
     authenticated: bool = Depends(authenticate)
 ):
     rag = get_rag_system()
-    result = rag.query(req.question, verbose=False)
-    return {"question": req.question, "answer": result["answer"]}
+    result = rag.query(
+        req.question,
+        verbose=False,
+        time_budget=req.time_budget,
+        expansion_mode=req.expansion_mode,
+    )
+    return {
+        "question": req.question,
+        "answer": result["answer"],
+        "degradations": result.get("degradations", []),
+    }
+
+
+# ===============================
+# Change Notification Webhooks
+# ===============================
+
+# Shared secret of webhook subscriptions: Event Grid endpoint URLs carry it as
+# ?key=..., SharePoint/Graph subscriptions as their clientState. Without it,
+# only the subscription validation handshakes are answered.
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+
+
+def _check_webhook_secret(value: Optional[str], handshake: bool = False):
+    """Reject a webhook call without the shared secret; notifications are refused while none is set."""
+    if not WEBHOOK_SECRET:
+        if handshake:
+            return
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Webhook notifications are disabled until WEBHOOK_SECRET is set")
+    if not secrets.compare_digest(value or "", WEBHOOK_SECRET):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook secret")
+
+
+def _notify(source: str, event: dict = None):
+    """Hand a notification to the connector runtime, or answer 503 so the sender delivers it again."""
+    if connector_runtime is None or not connector_runtime.notify(source, event):
+        # A 2xx would count as delivered and the change would wait for the next poll
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"The {source} source is not running in this API")
+
+
+@app.options("/webhooks/eventgrid")
+def eventgrid_handshake(request: Request):
+    """CloudEvents abuse-protection handshake of Event Grid."""
+    return Response(headers={
+        "WebHook-Allowed-Origin": request.headers.get("WebHook-Request-Origin", "*"),
+        "WebHook-Allowed-Rate": "*",
+    })
+
+
+@app.post("/webhooks/eventgrid")
+async def eventgrid_webhook(request: Request, key: Optional[str] = None):
+    """Blob Storage events from Event Grid (Event Grid or CloudEvents schema)."""
+    body = await request.json()
+    events = body if isinstance(body, list) else [body]
+    for event in events:
+        if (event.get("eventType") or event.get("type")) == "Microsoft.EventGrid.SubscriptionValidationEvent":
+            _check_webhook_secret(key, handshake=True)
+            return {"validationResponse": (event.get("data") or {}).get("validationCode")}
+
+    _check_webhook_secret(key)
+    queued = 0
+    for event in events:
+        event_type = event.get("eventType") or event.get("type")
+        data = event.get("data") or {}
+        if event_type == "Microsoft.Storage.BlobCreated":
+            _notify("blob", {"url": data.get("url"), "etag": data.get("eTag")})
+            queued += 1
+    return {"queued": queued}
+
+
+@app.post("/webhooks/sharepoint")
+async def sharepoint_webhook(request: Request):
+    """
+    SharePoint and Microsoft Graph change notifications.
+
+    They only say that the library changed, so each one triggers an immediate
+    change-token poll of the SharePoint source, which fetches just the changed items.
+    """
+    validation_token = request.query_params.get("validationtoken") or request.query_params.get("validationToken")
+    if validation_token is not None:
+        return PlainTextResponse(validation_token)
+
+    body = await request.json()
+    notifications = body.get("value", [])
+    for notification in notifications:
+        _check_webhook_secret(notification.get("clientState"))
+    if notifications:
+        _notify("sharepoint")
+    return {"queued": int(bool(notifications))}
 
 
 # ===============================
@@ -115,7 +352,18 @@ def ask_question(
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    health = {"status": "healthy"}
+    if connector_runtime is not None:
+        health["connectors"] = connector_runtime.health()
+    return health
+
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics (LLM hedge/fallback rates, endpoint health)."""
+    if rag_system is None:
+        return {}
+    return rag_system.metrics()
 
 
 # ===============================
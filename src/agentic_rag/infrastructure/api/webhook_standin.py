@@ -0,0 +1,90 @@
+"""
+Local stand-in for Event Grid and SharePoint: posts sample change notifications
+to the API's webhook endpoints, including the subscription validation handshakes.
+
+Usage:
+    python -m agentic_rag.infrastructure.api.webhook_standin \
+        --blob-url https://<account>.blob.core.windows.net/<container>/<blob> --etag 0x8D...
+"""
+import argparse
+import uuid
+from datetime import datetime, timezone
+
+import requests
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def eventgrid_validation_event(code: str) -> list:
+    return [{
+        "id": str(uuid.uuid4()),
+        "topic": "/subscriptions/local/resourceGroups/local/providers/Microsoft.Storage/storageAccounts/local",
+        "subject": "",
+        "eventType": "Microsoft.EventGrid.SubscriptionValidationEvent",
+        "eventTime": _now(),
+        "data": {"validationCode": code},
+        "dataVersion": "1",
+    }]
+
+
+def blob_created_event(blob_url: str, etag: str) -> list:
+    container, _, blob_name = blob_url.split(".blob.core.windows.net/", 1)[-1].partition("/")
+    return [{
+        "id": str(uuid.uuid4()),
+        "topic": "/subscriptions/local/resourceGroups/local/providers/Microsoft.Storage/storageAccounts/local",
+        "subject": f"/blobServices/default/containers/{container}/blobs/{blob_name}",
+        "eventType": "Microsoft.Storage.BlobCreated",
+        "eventTime": _now(),
+        "data": {"api": "PutBlob", "eTag": etag, "url": blob_url, "blobType": "BlockBlob"},
+        "dataVersion": "",
+    }]
+
+
+def sharepoint_notification(client_state: str = None) -> dict:
+    return {"value": [{
+        "subscriptionId": str(uuid.uuid4()),
+        "clientState": client_state,
+        "expirationDateTime": _now(),
+        "resource": str(uuid.uuid4()),
+        "tenantId": str(uuid.uuid4()),
+        "siteUrl": "/sites/local",
+        "webId": str(uuid.uuid4()),
+    }]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post sample change notifications to the webhook endpoints.")
+    parser.add_argument("--api", default="http://localhost:8100", help="API base URL")
+    parser.add_argument("--secret", help="WEBHOOK_SECRET the API runs with")
+    parser.add_argument("--blob-url", help="Blob to announce as created")
+    parser.add_argument("--etag", default="0x8D000000000000", help="Etag of that blob")
+    args = parser.parse_args()
+
+    eventgrid_url = f"{args.api}/webhooks/eventgrid"
+    params = {"key": args.secret} if args.secret else {}
+
+    code = str(uuid.uuid4())
+    response = requests.post(eventgrid_url, params=params, json=eventgrid_validation_event(code))
+    ok = response.ok and response.json().get("validationResponse") == code
+    print(f"[Stand-in] Event Grid validation: {response.status_code} {'ok' if ok else response.text}")
+
+    response = requests.options(eventgrid_url, headers={"WebHook-Request-Origin": "eventgrid.azure.net"})
+    print(f"[Stand-in] CloudEvents handshake: {response.status_code} "
+          f"allowed origin {response.headers.get('WebHook-Allowed-Origin')}")
+
+    token = str(uuid.uuid4())
+    response = requests.post(f"{args.api}/webhooks/sharepoint", params={"validationtoken": token})
+    print(f"[Stand-in] SharePoint validation: {response.status_code} {'ok' if response.text == token else response.text}")
+
+    if args.blob_url:
+        response = requests.post(eventgrid_url, params=params, json=blob_created_event(args.blob_url, args.etag))
+        print(f"[Stand-in] BlobCreated: {response.status_code} {response.text}")
+
+    response = requests.post(f"{args.api}/webhooks/sharepoint", json=sharepoint_notification(args.secret))
+    print(f"[Stand-in] SharePoint notification: {response.status_code} {response.text}")
+
+
+if __name__ == "__main__":
+    main()
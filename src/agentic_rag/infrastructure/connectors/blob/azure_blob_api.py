@@ -1,24 +1,105 @@
+import os
+import time
+from azure.core import MatchConditions
 from azure.storage.blob import BlobServiceClient
 from pathlib import Path
+from datetime import datetime
+
+# Suffix of a file that UploadConnector.stage_file is writing and archiving;
+# the download of the same path waits for it to be done
+STAGING_SUFFIX = ".upload"
 
 class AzureBlobAPI:
-    def __init__(self, storage_account_name: str, storage_access_key: str, container_name: str):
-        """Initialize Blob API with account credentials."""
+    def __init__(self, storage_account_name: str, storage_access_key: str, container_name: str,
+                 max_concurrency: int = 4, chunk_mb: int = 4, staging_timeout: float = 600.0):
+        """
+        Initialize Blob API with account credentials.
+
+        Args:
+            storage_account_name: Storage account
+            storage_access_key: Account key
+            container_name: Container to watch
+            max_concurrency: Parallel range requests per download
+            chunk_mb: Size of each range request; a download holds at most
+                max_concurrency chunks in memory, whatever the blob size
+            staging_timeout: Longest wait in seconds for an upload being staged
+                at a download's path (a staging file left by a crash is ignored after it)
+        """
         blob_url = f"https://{storage_account_name}.blob.core.windows.net"
+        chunk_size = chunk_mb * 1024 * 1024
         self.blob_service_client = BlobServiceClient(
             account_url=blob_url,
-            credential=storage_access_key
+            credential=storage_access_key,
+            max_single_get_size=chunk_size,
+            max_chunk_get_size=chunk_size
         )
+        self.max_concurrency = max_concurrency
+        self.staging_timeout = staging_timeout
         self.container_client = self.blob_service_client.get_container_client(container_name)
 
-    def list_files(self, prefix: str = ""):
-        """List all blobs in the container (optionally filtered by prefix)."""
-        return list(self.container_client.list_blobs(name_starts_with=prefix))
+    def list_files(self, prefix: str = "", modified_since: datetime = None):
+        """
+        List blobs in the container (optionally filtered by prefix).
+
+        Args:
+            prefix: Only blobs whose names start with this prefix
+            modified_since: Only blobs last modified at or after this time. The
+                listing API has no server-side time filter, so this is applied
+                while paging and only saves the per-blob work of the caller.
+        """
+        blobs = self.container_client.list_blobs(name_starts_with=prefix)
+        if modified_since is None:
+            return list(blobs)
+        return [blob for blob in blobs if blob.last_modified >= modified_since]
+
+    def download_file(self, blob_name: str, local_path: Path, etag: str = None):
+        """
+        Stream a blob to a local path, preserving folder structure.
 
-    def download_file(self, blob_name: str, local_path: Path):
-        """Download a blob to a local path, preserving folder structure."""
+        The blob is fetched in concurrent range requests and written straight
+        to a ``.part`` file, which replaces local_path once complete, so the
+        parser never sees a partial file. The parser is fed from that file
+        rather than from a spooled temporary file: ingestion is keyed by the
+        local path (chunk manifest, Chroma metadata, upload staging), and the
+        loaders, parsing workers and OCR all open files by path.
+
+        Args:
+            blob_name: Blob to download
+            local_path: Destination
+            etag: Version listed by the caller. Nothing is downloaded if the local
+                copy came from this version, and a blob overwritten meanwhile
+                fails instead of mixing versions.
+
+        While an upload is being staged at local_path, the download waits for it:
+        the upload writes the etag of the blob it archived before it is done, so
+        the blob it created is not downloaded over the file being ingested.
+        """
+        local_path = Path(local_path)
         local_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(local_path, "wb") as f:
-            stream = self.container_client.download_blob(blob_name)
-            f.write(stream.readall())
+        etag_file = local_path.with_name(local_path.name + ".etag")
+        staging_file = local_path.with_name(local_path.name + STAGING_SUFFIX)
+        deadline = time.monotonic() + self.staging_timeout
+        while True:
+            if etag and local_path.exists() and etag_file.exists() and etag_file.read_text() == etag:
+                return local_path
+            if not staging_file.exists() or time.monotonic() >= deadline:
+                break
+            time.sleep(0.5)
+
+        conditions = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+        part_file = local_path.with_name(local_path.name + ".part")
+        try:
+            downloader = self.container_client.download_blob(
+                blob_name, max_concurrency=self.max_concurrency, **conditions
+            )
+            with open(part_file, "wb") as f:
+                downloader.readinto(f)
+            os.replace(part_file, local_path)
+        finally:
+            part_file.unlink(missing_ok=True)
+
+        if etag:
+            etag_file.write_text(etag)
+        else:
+            etag_file.unlink(missing_ok=True)
         return local_path
@@ -1,8 +1,19 @@
 import time
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import List, Optional
+from urllib.parse import unquote, urlparse
+
+from agentic_rag.infrastructure.connectors.dispatcher import WorkerDispatcher
+from agentic_rag.infrastructure.connectors.job_queue import IngestionQueue
 
 class AzureBlobWatcher:
-    def __init__(self, api, tracker, processor, prefix: str, download_dir: Path, poll_interval: int = 5):
+    # Blobs committed just before the last poll may show up late; they are
+    # listed again and deduplicated by etag
+    WATERMARK_OVERLAP = timedelta(minutes=1)
+
+    def __init__(self, api, tracker, processor, prefix: str, download_dir: Path, poll_interval: int = 5,
+                 workers: int = 4, max_attempts: int = 5, retry_backoff: float = 30.0):
         self.api = api
         self.tracker = tracker
         self.processor = processor
@@ -10,28 +21,75 @@ class AzureBlobWatcher:
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
         self.poll_interval = poll_interval
+        self.cursor_name = f"blob_watermark:{prefix}"
+        # New blobs download and ingest in parallel, each blob name one job at a time
+        self.dispatcher = WorkerDispatcher(workers, name="blob-worker")
+        # New blobs are queued durably and retried until they are ingested or dead-lettered
+        container = api.container_client.container_name
+        self.jobs = IngestionQueue(source=f"blob:{container}/{prefix}", max_attempts=max_attempts,
+                                   backoff=retry_backoff)
 
     def run(self):
         print("[Watcher] Monitoring Azure Blob Storage...")
         while True:
             try:
-                blobs = self.api.list_files(self.prefix)
-                for blob in blobs:
-                    blob_name = blob.name
-                    blob_id = blob.etag  # unique ID for blob version
-                    local_path = self.download_dir / blob_name  # preserve folder structure
-
-                    if not self.tracker.has_seen(blob_id):
-                        try:
-                            self.api.download_file(blob_name, local_path)
-                            self.processor.process_file(local_path)
-                            self.tracker.mark_seen(blob_id)
-                            print(f"[Watcher] Downloaded + processed {blob_name}")
-                        except Exception as e:
-                            print(f"[Watcher] Failed {blob_name}: {e}")
-                            self.tracker.mark_seen(blob_id)
-
+                self.poll_once()
                 time.sleep(self.poll_interval)
             except Exception as e:
                 print(f"[Watcher] Fatal loop error: {e}")
                 time.sleep(self.poll_interval)
+
+    def poll_once(self):
+        """Queue blobs modified since the last poll's watermark (everything on the first one) and dispatch due jobs."""
+        self.dispatcher.drain()
+        watermark = self.tracker.get_cursor(self.cursor_name)
+        since = datetime.fromisoformat(watermark) - self.WATERMARK_OVERLAP if watermark else None
+        blobs = self.api.list_files(self.prefix, modified_since=since)
+        for blob in blobs:
+            blob_name = blob.name
+            blob_id = blob.etag  # unique ID for blob version
+            self._enqueue(blob_name, blob_id)
+
+        if blobs:
+            # Everything listed is in the queue, so the watermark can move on right away
+            newest = max(blob.last_modified for blob in blobs)
+            self.tracker.set_cursor(self.cursor_name, newest.isoformat())
+        else:
+            self.tracker.flush()
+        self.jobs.dispatch(self.dispatcher, self._run_job)
+
+    def handle_events(self, events: List[dict]):
+        """
+        Ingest blobs named by change notifications without listing the container.
+
+        Args:
+            events: {"url": blob URL, "etag": blob etag}, e.g. from Event Grid BlobCreated events
+        """
+        self.dispatcher.drain()
+        for event in events:
+            blob_name = self._blob_name(event.get("url") or "")
+            if blob_name is None or not blob_name.startswith(self.prefix) or not event.get("etag"):
+                continue
+            # Listings quote etags, Event Grid does not
+            blob_id = '"' + event["etag"].strip('"') + '"'
+            self._enqueue(blob_name, blob_id)
+        self.tracker.flush()
+        self.jobs.dispatch(self.dispatcher, self._run_job)
+
+    def _enqueue(self, blob_name: str, blob_id: str):
+        if not self.tracker.has_seen(blob_id):
+            self.jobs.enqueue(blob_name, {"blob_name": blob_name, "etag": blob_id}, blob_name, version=blob_id)
+            self.tracker.mark_seen(blob_id)
+
+    def _blob_name(self, url: str) -> Optional[str]:
+        """Name of the blob at url, or None if it is not in the watched container."""
+        container, _, blob_name = unquote(urlparse(url).path).lstrip("/").partition("/")
+        if container != self.api.container_client.container_name or not blob_name:
+            return None
+        return blob_name
+
+    def _run_job(self, payload: dict):
+        local_path = self.download_dir / payload["blob_name"]  # preserve folder structure
+        self.api.download_file(payload["blob_name"], local_path, etag=payload["etag"])
+        self.processor.process_file(local_path)
+        print(f"[Watcher] Downloaded + processed {payload['blob_name']}")
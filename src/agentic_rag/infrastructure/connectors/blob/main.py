@@ -4,33 +4,42 @@ from pathlib import Path
 from agentic_rag.domain.utils import PathConfig
 from .azure_blob_api import AzureBlobAPI
 from .azure_blob_watcher import AzureBlobWatcher
-from .file_tracker import FileTracker
-from .processor import Processor
+from agentic_rag.infrastructure.connectors.file_tracker import FileTracker
+from agentic_rag.infrastructure.connectors.processor import Processor
 
 # Use PathConfig to get project root
 BASE_DIR = PathConfig.PROJECT_ROOT
 CONFIG_PATH = PathConfig.BLOB_CONFIG
 
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    config = json.load(f)
 
-api = AzureBlobAPI(
-    storage_account_name=config["storage_account_name"],
-    storage_access_key=config["storage_access_key"],
-    container_name=config["container_name"]
-)
+def build_watcher(processor: Processor = None) -> AzureBlobWatcher:
+    """Watcher for the configured container; pass a shared processor to run it next to other sources."""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
 
-tracker = FileTracker(BASE_DIR / config["seen_files_path"])
-processor = Processor()
+    api = AzureBlobAPI(
+        storage_account_name=config["storage_account_name"],
+        storage_access_key=config["storage_access_key"],
+        container_name=config["container_name"],
+        max_concurrency=config.get("download_concurrency", 4),
+        chunk_mb=config.get("download_chunk_mb", 4)
+    )
+
+    tracker = FileTracker(BASE_DIR / config["seen_files_path"])
+    processor = processor or Processor.from_config(config)
+
+    return AzureBlobWatcher(
+        api,
+        tracker,
+        processor,
+        prefix=config.get("prefix", ""),
+        download_dir=BASE_DIR / config["download_dir"],
+        poll_interval=config.get("poll_interval", 5),
+        workers=config.get("download_workers", 4),
+        max_attempts=config.get("max_attempts", 5),
+        retry_backoff=config.get("retry_backoff", 30.0)
+    )
 
-watcher = AzureBlobWatcher(
-    api,
-    tracker,
-    processor,
-    prefix=config.get("prefix", ""),
-    download_dir=BASE_DIR / config["download_dir"],
-    poll_interval=config.get("poll_interval", 5)
-)
 
 if __name__ == "__main__":
-    watcher.run()
+    build_watcher().run()
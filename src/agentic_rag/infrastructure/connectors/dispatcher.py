@@ -0,0 +1,145 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Hashable, Optional
+
+
+class _Entry:
+    """One submitted job (or cursor marker) in submission order."""
+
+    __slots__ = ("key", "version", "job", "on_done", "future")
+
+    def __init__(self, key, version, job, on_done):
+        self.key = key
+        self.version = version
+        self.job = job
+        self.on_done = on_done
+        self.future = Future()
+        if job is None:
+            self.future.set_result(None)
+
+
+class WorkerDispatcher:
+    """
+    Runs a watcher's download-and-process jobs on a bounded thread pool.
+
+    At most one job per key (file id) runs at a time: a new version of a file
+    that is still being processed waits for the running job, and resubmitting
+    a version that is already queued is a no-op. Completion callbacks run in
+    submission order on the thread calling drain(), so the tracker records
+    files, and a listing cursor submitted with add_marker() is only persisted
+    once every file listed before it is done.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = None, name: str = "watcher"):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            workers: Jobs of this source running at once
+            max_pending: Jobs queued or running before submit() blocks (default 16 per worker)
+            name: Thread name prefix
+        """
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 16
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._order: Deque[_Entry] = deque()
+        self._running: Dict[Hashable, _Entry] = {}
+        self._waiting: Dict[Hashable, Deque[_Entry]] = {}
+        # Version last submitted per key, until all of the key's jobs are reported
+        self._latest: Dict[Hashable, object] = {}
+        self._unreported: Dict[Hashable, int] = {}
+        self._pending = 0
+
+    def submit(self, key: Hashable, job: Callable[[], None],
+               on_done: Callable[[Optional[BaseException]], None], version=None) -> bool:
+        """
+        Queue job for key.
+
+        Args:
+            key: Identity of the file; jobs of one key never overlap
+            job: Downloads and processes the file
+            on_done: Called by drain() with the job's exception (None on success)
+            version: Version of the file (etag, modified time); a key already
+                queued with the same version is not queued again
+
+        Returns:
+            False if the same version of the file was already queued
+        """
+        with self._lock:
+            if key in self._latest and self._latest[key] == version:
+                return False
+        while len(self._order) >= self.max_pending:
+            self._order[0].future.exception()  # wait for the oldest job, not the fastest
+            self.drain()
+
+        entry = _Entry(key, version, job, on_done)
+        with self._lock:
+            self._order.append(entry)
+            self._latest[key] = version
+            self._unreported[key] = self._unreported.get(key, 0) + 1
+            self._pending += 1
+            if key in self._running:
+                self._waiting.setdefault(key, deque()).append(entry)
+            else:
+                self._start(entry)
+        return True
+
+    def add_marker(self, on_done: Callable[[], None]):
+        """Call on_done once every job submitted so far has been reported."""
+        self._order.append(_Entry(None, None, None, lambda error: on_done()))
+        self.drain()
+
+    def drain(self) -> int:
+        """Report finished jobs in submission order, up to the first one still running."""
+        reported = 0
+        while self._order and self._order[0].future.done():
+            entry = self._order.popleft()
+            if entry.job is not None:
+                with self._lock:
+                    self._pending -= 1
+                    self._unreported[entry.key] -= 1
+                    if not self._unreported[entry.key]:
+                        del self._unreported[entry.key]
+                        del self._latest[entry.key]
+            entry.on_done(entry.future.exception())
+            reported += 1
+        return reported
+
+    def pending(self) -> int:
+        """Jobs submitted but not yet reported (safe to call from any thread)."""
+        return self._pending
+
+    def wait(self):
+        """Block until every submitted job has run and been reported."""
+        while self._order:
+            self._order[0].future.exception()
+            self.drain()
+
+    def close(self):
+        self.wait()
+        self._executor.shutdown(wait=True)
+
+    def _start(self, entry: _Entry):
+        self._running[entry.key] = entry
+        self._executor.submit(self._run, entry)
+
+    def _run(self, entry: _Entry):
+        try:
+            entry.job()
+            error = None
+        except BaseException as e:
+            error = e
+        with self._lock:
+            waiting = self._waiting.get(entry.key)
+            if waiting:
+                self._start(waiting.popleft())
+                if not waiting:
+                    del self._waiting[entry.key]
+            else:
+                del self._running[entry.key]
+        if error is None:
+            entry.future.set_result(None)
+        else:
+            entry.future.set_exception(error)
@@ -0,0 +1,153 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+class FileTracker:
+    """Tracks which source files have been ingested, in SQLite (WAL mode).
+
+    Shared by the SharePoint, Blob and Google Drive connectors. Marks are
+    committed in batches (every ``commit_every`` marks or ``commit_interval``
+    seconds, after each poll via flush(), and on close), so tracking stays
+    cheap with many files and a crash can never corrupt what was already
+    committed; at worst the last uncommitted files are ingested again.
+
+    It also persists the change cursors of incremental listing (Drive page
+    tokens, SharePoint change tokens, Blob watermarks). A cursor is committed
+    together with the marks of the files it covers.
+    """
+
+    def __init__(self, storage_file: Path, commit_every: int = 50, commit_interval: float = 2.0):
+        """
+        Args:
+            storage_file: Tracker database; a configured ``*.json`` path is kept
+                for compatibility and stored as ``*.sqlite3`` next to it (the JSON
+                contents are migrated once)
+            commit_every: Marks collected before a commit
+            commit_interval: Seconds after the last commit at which the next mark commits
+        """
+        storage_file = Path(storage_file)
+        legacy_file = storage_file if storage_file.suffix == ".json" else None
+        self.storage_file = storage_file.with_suffix(".sqlite3") if legacy_file else storage_file
+        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.storage_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " file_id TEXT PRIMARY KEY, file_name TEXT, modified_time TEXT, seen_at TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+        if legacy_file and legacy_file.exists():
+            self._migrate(legacy_file)
+        atexit.register(self.close)
+
+    def mark_seen(self, file_id: str, file_name: str = None, modified_time: str = None):
+        """Mark file as seen with optional name and last modified time."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seen (file_id, file_name, modified_time, seen_at) VALUES (?, ?, ?, ?)",
+                (file_id, file_name, modified_time, datetime.now().isoformat())
+            )
+            self._uncommitted += 1
+            self._maybe_commit()
+
+    def has_seen(self, file_id: str, modified_time: str = None) -> bool:
+        """Return True if file_id is seen and modified time hasn't changed (if provided)."""
+        info = self.get(file_id)
+        if info is None:
+            return False
+        if modified_time is not None:
+            return info.get("modified_time") == modified_time
+        return True
+
+    def get(self, file_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_name, modified_time, seen_at FROM seen WHERE file_id = ?", (file_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"file_name": row[0], "modified_time": row[1], "seen_at": row[2]}
+
+    def forget(self, file_id: str):
+        """Drop a file so it is ingested again on the next poll."""
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE file_id = ?", (file_id,))
+            self._uncommitted += 1
+            self._maybe_commit()
+
+    def get_cursor(self, name: str) -> Optional[str]:
+        """Last persisted change cursor of a listing, or None before the first full listing."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cursors WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, name: str, value: str):
+        """Persist a change cursor along with all marks made so far."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cursors (name, value) VALUES (?, ?)", (name, value))
+            self._commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def flush(self):
+        """Commit pending marks now."""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._commit()
+            self._conn.close()
+            self._conn = None
+
+    def _maybe_commit(self):
+        if (self._uncommitted >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def _migrate(self, legacy_file: Path):
+        """Import a JSON tracker file written by the previous implementation."""
+        try:
+            with open(legacy_file, "r") as f:
+                seen_files = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            # Keep the file for inspection instead of silently starting from scratch
+            print(f"[WARN] Could not migrate {legacy_file}: {e}")
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (file_id, file_name, modified_time, seen_at) VALUES (?, ?, ?, ?)",
+                [
+                    (file_id, info.get("file_name"), info.get("modified_time"),
+                     info.get("seen_at") or datetime.now().isoformat())
+                    for file_id, info in seen_files.items()
+                ]
+            )
+            self._commit()
+        legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+        print(f"[INFO] Migrated {len(seen_files)} tracked files from {legacy_file} to {self.storage_file}")
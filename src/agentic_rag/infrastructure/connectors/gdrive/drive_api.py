@@ -1,29 +1,153 @@
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from google.oauth2.service_account import Credentials
+from collections import deque
 from pathlib import Path
+from agentic_rag.infrastructure.connectors.paths import safe_name
 import io
+import threading
+import time
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+FILE_FIELDS = "id, name, mimeType, modifiedTime, parents"
+
+
+class QuotaLimiter:
+    """Spaces out requests to stay under a requests-per-second quota (shared by all threads)."""
+
+    def __init__(self, max_per_second: float):
+        self.interval = 1.0 / max_per_second if max_per_second else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
 
 class DriveAPI:
-    def __init__(self, service_account_file: str, scopes: list):
+    def __init__(self, service_account_file: str, scopes: list, max_qps: float = 10.0, num_retries: int = 5):
+        """
+        Args:
+            service_account_file: Service account key file
+            scopes: OAuth scopes
+            max_qps: Requests per second this client sends at most (the Drive quota is per project and user)
+            num_retries: Retries of a request rejected with a rate limit or server error (exponential backoff)
+        """
         credentials = Credentials.from_service_account_file(
             service_account_file, scopes=scopes
         )
         self.service = build('drive', 'v3', credentials=credentials)
+        self.limiter = QuotaLimiter(max_qps)
+        self.num_retries = num_retries
+
+    def _execute(self, request):
+        self.limiter.wait()
+        return request.execute(num_retries=self.num_retries)
 
     def list_files(self, folder_id: str, page_size: int = 1000):
-        response = self.service.files().list(
-            q=f"'{folder_id}' in parents and trashed=false",
-            fields="files(id, name, mimeType, modifiedTime)",
-            pageSize=page_size
-        ).execute()
-        return response.get('files', [])
+        """List every file and subfolder directly in a folder, across all result pages."""
+        return self._list(f"'{folder_id}' in parents and trashed=false", page_size)
+
+    def list_tree(self, folder_id: str, page_size: int = 1000, parents_per_query: int = 20):
+        """
+        List every file below a folder, breadth-first through its subfolders.
+
+        Sibling folders are listed together, up to parents_per_query per query,
+        so a tree of many small folders costs a fraction of one query per folder.
+
+        Args:
+            folder_id: Root folder
+            page_size: Files per result page
+            parents_per_query: Folders listed by a single query
+
+        Returns:
+            Tuple of (files with an added 'path' relative to the root, {folder id: relative path})
+        """
+        folders = {folder_id: ""}
+        pending = deque([folder_id])
+        files = []
+        while pending:
+            batch = [pending.popleft() for _ in range(min(parents_per_query, len(pending)))]
+            in_parents = " or ".join(f"'{parent_id}' in parents" for parent_id in batch)
+            for file in self._list(f"({in_parents}) and trashed=false", page_size):
+                parent_id = next(p for p in file.get('parents', []) if p in folders)
+                file['path'] = f"{folders[parent_id]}/{safe_name(file['name'])}".lstrip("/")
+                if file.get('mimeType') == FOLDER_MIME_TYPE:
+                    if file['id'] not in folders:  # shortcuts and multi-parent folders can form cycles
+                        folders[file['id']] = file['path']
+                        pending.append(file['id'])
+                else:
+                    files.append(file)
+        return files, folders
+
+    def _list(self, query: str, page_size: int):
+        files = []
+        page_token = None
+        while True:
+            response = self._execute(self.service.files().list(
+                q=query,
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+                pageSize=page_size,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ))
+            files.extend(response.get('files', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return files
+
+    def get_start_page_token(self) -> str:
+        """Token of the current state of the drive; list_changes returns what changes after it."""
+        return self._execute(self.service.changes().getStartPageToken(supportsAllDrives=True))['startPageToken']
+
+    def list_changes(self, page_token: str, folder_ids=None, page_size: int = 1000, include_removed: bool = False):
+        """
+        List files added or modified since page_token.
+
+        Args:
+            page_token: Token from get_start_page_token or a previous call
+            folder_ids: Only files directly in one of these folders are returned (None = all)
+            page_size: Changes fetched per request
+            include_removed: Also return removed and trashed files, as {'id': ..., 'removed': True}
+
+        Returns:
+            Tuple of (files shaped like list_files, token to pass on the next call)
+        """
+        folder_ids = {folder_ids} if isinstance(folder_ids, str) else folder_ids
+        files = {}
+        while True:
+            response = self._execute(self.service.changes().list(
+                pageToken=page_token,
+                spaces='drive',
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}, trashed))",
+                pageSize=page_size,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ))
+            for change in response.get('changes', []):
+                file = change.get('file')
+                if change.get('removed') or not file or file.get('trashed'):
+                    files.pop(change.get('fileId'), None)
+                    if include_removed:
+                        files[change.get('fileId')] = {'id': change.get('fileId'), 'removed': True}
+                elif folder_ids is None or folder_ids.intersection(file.get('parents', [])):
+                    files[file['id']] = file  # later changes of the same file win
+            if 'newStartPageToken' in response:
+                return list(files.values()), response['newStartPageToken']
+            page_token = response['nextPageToken']
 
     def download_file(self, file_id: str, file_path: Path):
-        request = self.service.files().get_media(fileId=file_id)
+        self.limiter.wait()
+        request = self.service.files().get_media(fileId=file_id, supportsAllDrives=True)
         with io.FileIO(file_path, 'wb') as fh:
             downloader = MediaIoBaseDownload(fh, request)
             done = False
             while not done:
-                _, done = downloader.next_chunk()
+                _, done = downloader.next_chunk(num_retries=self.num_retries)
         return file_path
\ No newline at end of file
@@ -1,8 +1,15 @@
+import json
 import time
 from pathlib import Path
 
+from agentic_rag.infrastructure.connectors.dispatcher import WorkerDispatcher
+from agentic_rag.infrastructure.connectors.job_queue import IngestionQueue
+from agentic_rag.infrastructure.connectors.paths import safe_name, safe_relative_path
+from .drive_api import FOLDER_MIME_TYPE
+
 class DriveWatcher:
-    def __init__(self, drive_api, tracker, processor, folder_id, download_dir: Path, poll_interval: int = 2):
+    def __init__(self, drive_api, tracker, processor, folder_id, download_dir: Path, poll_interval: int = 2,
+                 workers: int = 4, recursive: bool = True, max_attempts: int = 5, retry_backoff: float = 30.0):
         self.drive_api = drive_api
         self.tracker = tracker
         self.processor = processor
@@ -10,31 +17,127 @@ class DriveWatcher:
         self.download_dir = download_dir
         self.download_dir.mkdir(exist_ok=True)
         self.poll_interval = poll_interval
+        self.recursive = recursive
+        self.cursor_name = f"drive_changes:{folder_id}"
+        # Folder id -> path below the watched folder, to tell which changes are inside the tree
+        self.folders_cursor_name = f"drive_folders:{folder_id}"
+        # New files download and ingest in parallel, each file id one job at a time
+        self.dispatcher = WorkerDispatcher(workers, name="drive-worker")
+        # Changed files are queued durably and retried until they are ingested or dead-lettered
+        self.jobs = IngestionQueue(source=f"gdrive:{folder_id}", max_attempts=max_attempts, backoff=retry_backoff)
 
     def run(self):
         print("[Watcher] Started monitoring Google Drive folder...")
         while True:
             try:
-                files = self.drive_api.list_files(self.folder_id)
-                for file in files:
-                    file_id = file['id']
-                    file_name = file['name']
-                    modified_time = file.get('modifiedTime')
-
-                    if file.get('mimeType') == 'application/vnd.google-apps.folder':
-                        continue  # Skip subfolders
-
-                    if not self.tracker.has_seen(file_id, modified_time):
-                        local_path = self.download_dir / file_name
-                        try:
-                            self.drive_api.download_file(file_id, local_path)
-                            self.processor.process_file(local_path)
-                            self.tracker.mark_seen(file_id, file_name, modified_time)
-                        except Exception as e:
-                            print(f"[Watcher] Skipping {file_name} due to error \n")
-                            self.tracker.mark_seen(file_id, file_name, modified_time)
-
+                self.poll_once()
                 time.sleep(self.poll_interval)
             except Exception as e:
                 print(f"[Watcher] Fatal error in loop: {e}")
                 time.sleep(self.poll_interval)
+
+    def poll_once(self):
+        """Queue files changed since the last poll (everything on the first one) and dispatch due jobs."""
+        self.dispatcher.drain()
+        files, page_token, folders = self._list_changed()
+        for file in files:
+            file_id = file['id']
+            file_name = file['name']
+            modified_time = file.get('modifiedTime')
+
+            if file.get('mimeType') == FOLDER_MIME_TYPE:
+                continue  # Subfolders are traversed, not downloaded
+
+            if not self.tracker.has_seen(file_id, modified_time):
+                payload = {"file_id": file_id, "path": file.get('path', safe_name(file_name))}
+                self.jobs.enqueue(file_id, payload, file_name, version=modified_time)
+                self.tracker.mark_seen(file_id, file_name, modified_time)
+
+        # Everything listed is in the queue, so the cursor can move on right away
+        if folders is not None:
+            self.tracker.set_cursor(self.folders_cursor_name, json.dumps(folders))
+        self.tracker.set_cursor(self.cursor_name, page_token)
+        self.jobs.dispatch(self.dispatcher, self._run_job)
+
+    def _run_job(self, payload: dict):
+        local_path = self.download_dir / safe_relative_path(payload["path"])
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        self.drive_api.download_file(payload["file_id"], local_path)
+        self.processor.process_file(local_path)
+        print(f"[Watcher] Downloaded + processed {payload['path']}")
+
+    def _list_changed(self):
+        page_token = self.tracker.get_cursor(self.cursor_name)
+        folders = self.tracker.get_cursor(self.folders_cursor_name)
+        if page_token is not None and (folders is not None or not self.recursive):
+            try:
+                if not self.recursive:
+                    files, page_token = self.drive_api.list_changes(page_token, self.folder_id)
+                    return files, page_token, None
+                folders = json.loads(folders)
+                changed, page_token = self.drive_api.list_changes(page_token, include_removed=True)
+                return self._in_tree(changed, folders), page_token, folders
+            except Exception as e:
+                print(f"[Watcher] Change listing failed ({e}), falling back to a full listing")
+        # Take the token before listing so changes made during the listing are not lost
+        page_token = self.drive_api.get_start_page_token()
+        if not self.recursive:
+            return self.drive_api.list_files(self.folder_id), page_token, None
+        files, folders = self.drive_api.list_tree(self.folder_id)
+        return files, page_token, folders
+
+    def _in_tree(self, changed: list, folders: dict) -> list:
+        """
+        Changed files below the watched folder.
+
+        Folders are applied first: new ones are added and listed, renamed or
+        moved ones take their subfolders along, and removed ones, or ones
+        moved out of the tree, are pruned with their subfolders.
+        """
+        files = []
+        for file in changed:
+            if file['id'] == self.folder_id:
+                continue
+            if file.get('removed'):
+                if file['id'] in folders:
+                    self._prune_folder(folders, file['id'])
+                continue
+            if file.get('mimeType') != FOLDER_MIME_TYPE:
+                continue
+            parent_id = next((p for p in file.get('parents', []) if p in folders), None)
+            if parent_id is None:
+                if file['id'] in folders:
+                    self._prune_folder(folders, file['id'])  # moved out of the tree
+                continue
+            path = f"{folders[parent_id]}/{safe_name(file['name'])}".lstrip("/")
+            if file['id'] not in folders:
+                # A folder moved into the tree brings files that have no changes of their own
+                subtree, subfolders = self.drive_api.list_tree(file['id'])
+                for sub_id, sub_path in subfolders.items():
+                    folders[sub_id] = f"{path}/{sub_path}".rstrip("/")
+                for sub_file in subtree:
+                    sub_file['path'] = f"{path}/{sub_file['path']}"
+                files.extend(subtree)
+            elif folders[file['id']] != path:
+                self._move_folder(folders, folders[file['id']], path)  # renamed or moved
+
+        for file in changed:
+            if file.get('removed') or file.get('mimeType') == FOLDER_MIME_TYPE:
+                continue
+            parent_id = next((p for p in file.get('parents', []) if p in folders), None)
+            if parent_id is not None:
+                file['path'] = f"{folders[parent_id]}/{safe_name(file['name'])}".lstrip("/")
+                files.append(file)
+        return files
+
+    @staticmethod
+    def _move_folder(folders: dict, old_path: str, new_path: str):
+        for folder_id, path in folders.items():
+            if path == old_path or path.startswith(old_path + "/"):
+                folders[folder_id] = new_path + path[len(old_path):]
+
+    @staticmethod
+    def _prune_folder(folders: dict, folder_id: str):
+        old_path = folders[folder_id]
+        for sub_id in [i for i, path in folders.items() if path == old_path or path.startswith(old_path + "/")]:
+            del folders[sub_id]
@@ -3,29 +3,36 @@ from pathlib import Path
 
 from agentic_rag.domain.utils import PathConfig
 from .drive_api import DriveAPI
-from .file_tracker import FileTracker
 from .drive_watcher import DriveWatcher
-from .processor import Processor
+from agentic_rag.infrastructure.connectors.file_tracker import FileTracker
+from agentic_rag.infrastructure.connectors.processor import Processor
 
 # Use PathConfig to get project root
 BASE_DIR = PathConfig.PROJECT_ROOT
 CONFIG_PATH = BASE_DIR / "config" / "config.json"
 
-# Load config
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    config = json.load(f)
 
-# 🔑 Always resolve paths relative to BASE_DIR
-service_account_file = BASE_DIR / config["service_account_file"]
-seen_files_path = BASE_DIR / config["seen_files_path"]
-download_dir = BASE_DIR / config["download_dir"]
+def build_watcher(processor: Processor = None) -> DriveWatcher:
+    """Watcher for the configured folder; pass a shared processor to run it next to other sources."""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
 
-drive_api = DriveAPI(str(service_account_file), config["scopes"])
-tracker = FileTracker(seen_files_path)
-processor = Processor()
+    # 🔑 Always resolve paths relative to BASE_DIR
+    service_account_file = BASE_DIR / config["service_account_file"]
+    seen_files_path = BASE_DIR / config["seen_files_path"]
+    download_dir = BASE_DIR / config["download_dir"]
 
-folder_id = config["folder_id_to_watch"]
-poll_interval = config.get("poll_interval", 2)
+    drive_api = DriveAPI(str(service_account_file), config["scopes"], max_qps=config.get("max_qps", 10))
+    tracker = FileTracker(seen_files_path)
+    processor = processor or Processor.from_config(config)
 
-watcher = DriveWatcher(drive_api, tracker, processor, folder_id, download_dir, poll_interval)
-#watcher.run()
+    folder_id = config["folder_id_to_watch"]
+    poll_interval = config.get("poll_interval", 2)
+
+    return DriveWatcher(drive_api, tracker, processor, folder_id, download_dir, poll_interval,
+                        workers=config.get("download_workers", 4), recursive=config.get("recursive", True),
+                        max_attempts=config.get("max_attempts", 5), retry_backoff=config.get("retry_backoff", 30.0))
+
+
+if __name__ == "__main__":
+    build_watcher().run()
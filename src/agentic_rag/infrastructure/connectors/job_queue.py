@@ -0,0 +1,256 @@
+import argparse
+import json
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from agentic_rag.domain.utils import PathConfig
+
+
+class IngestionQueue:
+    """
+    Durable queue of ingestion jobs between a watcher and the Processor (SQLite, WAL mode).
+
+    A watcher enqueues each new or modified file before marking it seen, so
+    a file that fails to download or ingest is never lost: it is retried with
+    exponential backoff and jitter, and after max_attempts it is moved to a
+    dead-letter table from which it can be requeued. Jobs are processed at
+    least once; a job interrupted by a crash runs again after the restart,
+    which the chunk manifest makes cheap (unchanged chunks are not re-embedded).
+
+    All sources share one database file; each instance is bound to one source.
+    """
+
+    def __init__(self, db_file: Path = None, source: str = None, max_attempts: int = 5,
+                 backoff: float = 30.0, max_backoff: float = 3600.0):
+        """
+        Initialize the queue.
+
+        Args:
+            db_file: Queue database (defaults to PathConfig.INGESTION_QUEUE)
+            source: Source whose jobs this instance enqueues and runs (None for inspection only)
+            max_attempts: Attempts before a job is dead-lettered
+            backoff: Delay in seconds before the first retry, doubled on each further retry
+            max_backoff: Upper bound of a retry delay
+        """
+        self.db_file = Path(db_file or PathConfig.INGESTION_QUEUE)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.source = source
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY, source TEXT NOT NULL, file_key TEXT NOT NULL, file_name TEXT,"
+                " version TEXT, payload TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL,"
+                " next_attempt_at REAL NOT NULL, last_error TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL,"
+                " UNIQUE (source, file_key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (source, status, next_attempt_at)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letters ("
+                " id INTEGER PRIMARY KEY, source TEXT NOT NULL, file_key TEXT NOT NULL, file_name TEXT,"
+                " version TEXT, payload TEXT NOT NULL, attempts INTEGER NOT NULL, last_error TEXT,"
+                " failed_at TEXT NOT NULL)"
+            )
+            if source is not None:
+                # Jobs still running when the previous process stopped are run again
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued' WHERE source = ? AND status = 'running'", (source,)
+                )
+
+    def enqueue(self, file_key: str, payload: dict, file_name: str = None, version: str = None) -> bool:
+        """
+        Queue a file of this source, replacing a queued older version of it.
+
+        Args:
+            file_key: Identity of the file within the source (one job per file)
+            payload: What the watcher needs to download and ingest the file
+            file_name: Display name
+            version: Version of the file (etag, modified time)
+
+        Returns:
+            False if this version was already queued
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, version FROM jobs WHERE source = ? AND file_key = ?", (self.source, file_key)
+            ).fetchone()
+            if row is not None and row[1] == version:
+                return False
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO jobs (source, file_key, file_name, version, payload, status, attempts,"
+                    " next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?, ?)",
+                    (self.source, file_key, file_name, version, json.dumps(payload), time.time(), now, now)
+                )
+            else:
+                # A running job keeps running; it is requeued for this version when it finishes
+                self._conn.execute(
+                    "UPDATE jobs SET file_name = ?, version = ?, payload = ?, attempts = 0, next_attempt_at = ?,"
+                    " last_error = NULL, updated_at = ? WHERE id = ?",
+                    (file_name, version, json.dumps(payload), time.time(), now, row[0])
+                )
+            # A new version supersedes a dead-lettered one
+            self._conn.execute("DELETE FROM dead_letters WHERE source = ? AND file_key = ?", (self.source, file_key))
+        return True
+
+    def dispatch(self, dispatcher, run: Callable[[dict], None]) -> int:
+        """
+        Hand the due jobs of this source to a WorkerDispatcher.
+
+        Args:
+            dispatcher: WorkerDispatcher of the watcher; only its free capacity is filled
+            run: Downloads and ingests one job's payload, raising on failure
+
+        Returns:
+            Jobs dispatched
+        """
+        limit = dispatcher.max_pending - dispatcher.pending()
+        if limit <= 0:
+            return 0
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, file_key, version, payload FROM jobs"
+                " WHERE source = ? AND status = 'queued' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (self.source, time.time(), limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(datetime.now().isoformat(), row[0]) for row in rows]
+            )
+        for job_id, file_key, version, payload in rows:
+            dispatcher.submit(
+                file_key,
+                lambda payload=json.loads(payload): run(payload),
+                lambda error, job_id=job_id, version=version: self._finished(job_id, version, error),
+                version=version
+            )
+        return len(rows)
+
+    def _finished(self, job_id: int, version: Optional[str], error: Optional[BaseException]):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT source, file_key, file_name, version, payload, attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return
+            source, file_key, file_name, current_version, payload, attempts = row
+            now = datetime.now().isoformat()
+            if current_version != version:
+                # Modified while running: run again for the new version
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', attempts = 0, updated_at = ? WHERE id = ?", (now, job_id)
+                )
+            elif error is None:
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            elif attempts >= self.max_attempts:
+                self._conn.execute(
+                    "INSERT INTO dead_letters (source, file_key, file_name, version, payload, attempts, last_error,"
+                    " failed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (source, file_key, file_name, version, payload, attempts, str(error), now)
+                )
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                print(f"[WARN] {file_name or file_key} failed {attempts} times, moved to dead letters: {error}")
+            else:
+                delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff) * random.uniform(0.5, 1.5)
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', next_attempt_at = ?, last_error = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (time.time() + delay, str(error), now, job_id)
+                )
+                print(f"[WARN] {file_name or file_key} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+
+    def dead_letters(self, source: str = None, limit: int = 100) -> List[dict]:
+        """Most recent dead letters, of one source or all."""
+        query = "SELECT id, source, file_key, file_name, version, attempts, last_error, failed_at FROM dead_letters"
+        params = []
+        if source is not None:
+            query += " WHERE source = ?"
+            params.append(source)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        keys = ("id", "source", "file_key", "file_name", "version", "attempts", "last_error", "failed_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def requeue(self, dead_letter_id: int) -> bool:
+        """Move a dead letter back into the queue with fresh attempts; its watcher runs it on its next poll."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT source, file_key, file_name, version, payload FROM dead_letters WHERE id = ?",
+                (dead_letter_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (source, file_key, file_name, version, payload, status, attempts,"
+                " next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?, ?)",
+                row + (time.time(), now, now)
+            )
+            self._conn.execute("DELETE FROM dead_letters WHERE id = ?", (dead_letter_id,))
+        return True
+
+    def requeue_all(self, source: str = None) -> int:
+        """Requeue every dead letter, of one source or all."""
+        return sum(self.requeue(letter["id"]) for letter in self.dead_letters(source, limit=-1))
+
+    def stats(self, source: str = None) -> dict:
+        """Queued, retrying, running and dead-lettered jobs, of one source or all."""
+        source_filter, params = (" WHERE source = ?", (source,)) if source is not None else ("", ())
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, attempts > 0, COUNT(*) FROM jobs" + source_filter + " GROUP BY status, attempts > 0",
+                params
+            ).fetchall()
+            dead = self._conn.execute("SELECT COUNT(*) FROM dead_letters" + source_filter, params).fetchone()[0]
+        stats = {"queued": 0, "retrying": 0, "running": 0, "dead_letters": dead}
+        for status, retried, count in rows:
+            key = "retrying" if status == "queued" and retried else status
+            stats[key] += count
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the ingestion queue and requeue dead letters.")
+    parser.add_argument("--source", help="Only this source, e.g. 'blob:<container>/'")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Jobs per state")
+    dead = commands.add_parser("dead", help="List dead letters")
+    dead.add_argument("--limit", type=int, default=50)
+    requeue = commands.add_parser("requeue", help="Requeue dead letters by id")
+    requeue.add_argument("ids", nargs="+", type=int)
+    commands.add_parser("requeue-all", help="Requeue every dead letter")
+    args = parser.parse_args()
+
+    queue = IngestionQueue()
+    if args.command == "stats":
+        for key, value in queue.stats(args.source).items():
+            print(f"{key}: {value}")
+    elif args.command == "dead":
+        for letter in queue.dead_letters(args.source, args.limit):
+            print(f"{letter['id']}\t{letter['source']}\t{letter['file_name'] or letter['file_key']}\t"
+                  f"{letter['attempts']} attempts\t{letter['failed_at']}\t{letter['last_error']}")
+    elif args.command == "requeue":
+        for dead_letter_id in args.ids:
+            print(f"{dead_letter_id}: {'requeued' if queue.requeue(dead_letter_id) else 'not found'}")
+    else:
+        print(f"Requeued {queue.requeue_all(args.source)} dead letters")
+    queue.close()
@@ -0,0 +1 @@
+"""Local folder connector"""
\ No newline at end of file
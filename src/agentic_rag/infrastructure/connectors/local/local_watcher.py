@@ -0,0 +1,59 @@
+import os
+import time
+from pathlib import Path
+
+from agentic_rag.infrastructure.connectors.dispatcher import WorkerDispatcher
+from agentic_rag.infrastructure.connectors.job_queue import IngestionQueue
+
+class LocalFolderWatcher:
+    """Ingests files dropped into a local folder (and its subfolders)."""
+
+    def __init__(self, folder: Path, tracker, processor, poll_interval: int = 5, workers: int = 4,
+                 settle_seconds: float = 2.0, max_attempts: int = 5, retry_backoff: float = 30.0):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.tracker = tracker
+        self.processor = processor
+        self.poll_interval = poll_interval
+        # Files modified more recently may still be being copied in
+        self.settle_seconds = settle_seconds
+        self.dispatcher = WorkerDispatcher(workers, name="local-worker")
+        # New files are queued durably and retried until they are ingested or dead-lettered
+        self.jobs = IngestionQueue(source=f"local:{self.folder}", max_attempts=max_attempts, backoff=retry_backoff)
+
+    def run(self):
+        print(f"[Watcher] Monitoring local folder {self.folder}...")
+        while True:
+            try:
+                self.poll_once()
+                time.sleep(self.poll_interval)
+            except Exception as e:
+                print(f"[Watcher] Fatal loop error: {e}")
+                time.sleep(self.poll_interval)
+
+    def poll_once(self):
+        """Queue files that are new or modified since they were last ingested and dispatch due jobs."""
+        self.dispatcher.drain()
+        now = time.time()
+        for root, _, file_names in os.walk(self.folder):
+            for file_name in file_names:
+                path = Path(root) / file_name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue  # removed while listing
+                if now - stat.st_mtime < self.settle_seconds:
+                    continue
+                version = f"{stat.st_mtime_ns}:{stat.st_size}"
+                if not self.tracker.has_seen(str(path), version):
+                    self.jobs.enqueue(str(path), {"path": str(path)}, file_name, version=version)
+                    self.tracker.mark_seen(str(path), file_name, version)
+        self.tracker.flush()
+        self.jobs.dispatch(self.dispatcher, self._run_job)
+
+    def _run_job(self, payload: dict):
+        path = Path(payload["path"])
+        if not path.exists():
+            return  # removed before it was ingested
+        self.processor.process_file(str(path))
+        print(f"[Watcher] Processed {path.name}")
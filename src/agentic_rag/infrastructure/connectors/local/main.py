@@ -0,0 +1,34 @@
+import json
+
+from agentic_rag.domain.utils import PathConfig
+from .local_watcher import LocalFolderWatcher
+from agentic_rag.infrastructure.connectors.file_tracker import FileTracker
+from agentic_rag.infrastructure.connectors.processor import Processor
+
+BASE_DIR = PathConfig.PROJECT_ROOT
+CONFIG_PATH = PathConfig.CONNECTORS_CONFIG
+
+
+def build_watcher(processor: Processor = None) -> LocalFolderWatcher:
+    """Watcher for the local inbox; configured by the "local" section of connectors.json (optional)."""
+    config = {}
+    if CONFIG_PATH.exists():
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            config = json.load(f).get("sources", {}).get("local", {})
+
+    folder = BASE_DIR / config["folder"] if "folder" in config else PathConfig.LOCAL_INBOX
+    seen_files_path = BASE_DIR / config["seen_files_path"] if "seen_files_path" in config else PathConfig.LOCAL_SEEN_FILES
+
+    return LocalFolderWatcher(
+        folder,
+        FileTracker(seen_files_path),
+        processor or Processor.from_config(config),
+        poll_interval=config.get("poll_interval", 5),
+        workers=config.get("download_workers", 4),
+        max_attempts=config.get("max_attempts", 5),
+        retry_backoff=config.get("retry_backoff", 30.0)
+    )
+
+
+if __name__ == "__main__":
+    build_watcher().run()
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+
+def safe_name(name: str) -> str:
+    """A remote file or folder name usable as a single local path component."""
+    name = name.replace("/", "_").replace("\\", "_").strip()
+    return "_" if name in ("", ".", "..") else name
+
+
+def safe_relative_path(path: str) -> Path:
+    """
+    Local relative path for a remote one, which can never leave the directory it is joined to.
+
+    Args:
+        path: "/"-separated remote path (a leading "/" is ignored)
+
+    Returns:
+        Path made of the path's components, with empty, "." and ".." ones dropped
+    """
+    parts = [part.strip() for part in path.replace("\\", "/").split("/")]
+    parts = [part for part in parts if part not in ("", ".", "..")]
+    if not parts:
+        raise ValueError(f"No file name in {path!r}")
+    return Path(*parts)
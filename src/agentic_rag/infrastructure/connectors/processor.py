@@ -0,0 +1,221 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+import chromadb
+from sentence_transformers import SentenceTransformer
+
+from agentic_rag.domain.utils import PathConfig
+from agentic_rag.infrastructure.persistence.batching import EmbeddingBatcher
+from agentic_rag.infrastructure.persistence.chunking import TokenChunker
+from agentic_rag.infrastructure.persistence.embedder import EMBEDDING_MODEL
+from agentic_rag.infrastructure.persistence.embedding_cache import EmbeddingCache
+from agentic_rag.infrastructure.persistence.indexer import ChromaStorer, LangChunker
+from agentic_rag.infrastructure.persistence.manifest import ChunkManifest
+from agentic_rag.infrastructure.persistence.parents import ParentStore
+from agentic_rag.infrastructure.persistence.parsing import ParsingPool
+from agentic_rag.infrastructure.persistence.pipeline import IngestionJob, IngestionPipeline
+
+class Processor:
+    """Custom file processor that reads, chunks, and stores files in Chroma.
+
+    Shared by the SharePoint, Blob and Google Drive connectors.
+    """
+
+    def __init__(self, db_path: str = None,
+                 collection_name: str = "my_files",
+                 chunk_size: int = 1000,
+                 overlap: int = 200,
+                 parse_workers: int = 0,
+                 parse_timeout: float = 300.0,
+                 use_pipeline: bool = False,
+                 stage_workers: dict = None,
+                 queue_size: int = 8,
+                 embed_batch_size: int = 0,
+                 embed_linger: float = 0.05,
+                 embedding_cache_size: int = 200_000,
+                 stream_min_mb: float = 50.0,
+                 stream_window: int = 256,
+                 chunking: str = "tokens",
+                 token_chunk_fraction: float = 0.9,
+                 parent_chunk_size: int = 0):
+        """
+        Args:
+            db_path: Path to ChromaDB storage (defaults to PathConfig)
+            collection_name: Name of Chroma collection
+            chunk_size: Chunk size in characters (chunking="chars")
+            overlap: Chunk overlap in characters (chunking="chars")
+            parse_workers: Worker processes for document parsing (0 = parse in the caller's thread)
+            parse_timeout: Seconds a single file may take to parse in a worker
+            use_pipeline: Run parse/chunk/embed/upsert as overlapping stages (IngestionPipeline)
+            stage_workers: Worker threads per pipeline stage, e.g. {"parse": 4, "embed": 1}
+            queue_size: Capacity of the bounded queue in front of each pipeline stage
+            embed_batch_size: Chunks gathered across files per encode call (0 = encode each file separately)
+            embed_linger: Seconds to wait for more chunks before encoding a partial batch
+            embedding_cache_size: Chunk vectors kept in the on-disk embedding cache (0 = no cache)
+            stream_min_mb: Files of at least this size are ingested in bounded-memory windows (0 = never)
+            stream_window: Chunks embedded and written per window when streaming
+            chunking: "tokens" to size chunks with the embedder's tokenizer, "chars" for character counts
+            token_chunk_fraction: Share of the embedder's max_seq_length a token chunk may use
+            parent_chunk_size: Characters per parent section for small-to-big retrieval (0 = off)
+        """
+        # Use PathConfig default if not provided
+        db_path = db_path or str(PathConfig.get_db_path())
+        
+        # Setup Chroma client and collection
+        self.client = chromadb.PersistentClient(path=db_path)
+        self.collection = self.client.get_or_create_collection(collection_name)
+
+        # Setup embedder
+        self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+
+        # Re-uploads, renamed files, duplicates across sources and collection
+        # rebuilds reuse vectors instead of re-encoding the same text
+        self.embedding_cache = (
+            EmbeddingCache(EMBEDDING_MODEL, max_entries=embedding_cache_size) if embedding_cache_size else None
+        )
+
+        # Parse in worker processes so parsing uses every core and a crashing
+        # or hanging file cannot take the watcher down with it
+        self.parsing_pool = ParsingPool(workers=parse_workers, timeout=parse_timeout) if parse_workers else None
+
+        # Many small files embed far faster in shared batches than one encode call each
+        self.batcher = EmbeddingBatcher(self.embedder, embed_batch_size, embed_linger) if embed_batch_size else None
+
+        # Chunk ids indexed per file, kept next to the Chroma store so that
+        # re-ingesting a modified file only embeds and writes what changed
+        self.manifest = ChunkManifest(Path(db_path) / "chunk_manifest.sqlite3", collection_name)
+
+        # Small-to-big: Chroma indexes small chunks, the LLM gets their parent sections
+        self.parent_store = ParentStore(Path(db_path) / "parents.sqlite3", collection_name) if parent_chunk_size else None
+
+        # Setup ChromaStorer
+        self.storer = ChromaStorer(
+            collection=self.collection,
+            embedder=self.embedder,
+            chunk_size=chunk_size,
+            overlap=overlap,
+            reader=self.parsing_pool,
+            batcher=self.batcher,
+            manifest=self.manifest,
+            cache=self.embedding_cache,
+            stream_min_bytes=int(stream_min_mb * 1024 * 1024) if stream_min_mb else None,
+            stream_window=stream_window,
+            # Token-sized chunks fit the embedder's input, so no chunk tail goes unembedded
+            chunker=TokenChunker(self.embedder, token_chunk_fraction) if chunking == "tokens" else None,
+            parent_store=self.parent_store,
+            parent_chunker=LangChunker(parent_chunk_size, 0) if parent_chunk_size else None
+        )
+
+        # Roll back files whose Chroma writes were interrupted last time
+        self.storer.recover()
+
+        if use_pipeline and stage_workers is None and parse_workers:
+            stage_workers = {"parse": parse_workers}
+        self.pipeline = IngestionPipeline(self.storer, stage_workers, queue_size) if use_pipeline else None
+        self._submit_executor = None
+        self._submit_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Processor":
+        """Build a processor from the ingestion keys of a connector config file."""
+        return cls(
+            parse_workers=config.get("parse_workers", 0),
+            parse_timeout=config.get("parse_timeout", 300),
+            use_pipeline=config.get("use_pipeline", False),
+            stage_workers=config.get("stage_workers"),
+            embed_batch_size=config.get("embed_batch_size", 0),
+            embed_linger=config.get("embed_linger", 0.05),
+            embedding_cache_size=config.get("embedding_cache_size", 200000),
+            stream_min_mb=config.get("stream_min_mb", 50),
+            stream_window=config.get("stream_window", 256),
+            chunking=config.get("chunking", "tokens"),
+            parent_chunk_size=config.get("parent_chunk_size", 0)
+        )
+
+    def process_file(self, file_path: str):
+        """Process a file and store it in Chroma."""
+        if not os.path.exists(file_path):
+            print(f"[Processor] File not found: {file_path}")
+            return
+
+        print(f"[Processor] Processing file: {file_path}")
+        if self.pipeline:
+            self.pipeline.submit(file_path).result()
+        else:
+            self.storer.store_file(file_path)
+
+    def submit_file(self, file_path: str) -> IngestionJob:
+        """
+        Queue a file for ingestion without waiting for it.
+
+        The returned job completes asynchronously: in the pipeline when it is
+        enabled, otherwise on a background thread that stores files one by one.
+        """
+        if self.pipeline:
+            return self.pipeline.submit(file_path)
+
+        job = IngestionJob(file_path)
+        with self._submit_lock:
+            if self._submit_executor is None:
+                self._submit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-submit")
+        self._submit_executor.submit(self._store_job, job)
+        return job
+
+    def _store_job(self, job: IngestionJob):
+        try:
+            stored = self.storer.store_file(job.file_path, on_status=job.set_status)
+            job.finish("indexed" if stored else "skipped")
+        except Exception as e:
+            print(f"[Processor] Failed {job.file_path}: {e}")
+            job.fail(e)
+
+    def process_files(self, file_paths: Iterable[str]):
+        """Process several files, parsing them in parallel when a parsing pool is configured."""
+        existing = []
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                existing.append(file_path)
+            else:
+                print(f"[Processor] File not found: {file_path}")
+
+        print(f"[Processor] Processing {len(existing)} files")
+        if not self.pipeline:
+            self.storer.store_files(existing)
+            return
+
+        jobs = [self.pipeline.submit(file_path) for file_path in existing]
+        for job in jobs:
+            try:
+                job.result()
+            except Exception as e:
+                print(f"[Processor] Failed {job.file_path}: {e}")
+
+    def metrics(self) -> dict:
+        """Ingestion metrics: pipeline stages, embedding batches and cache, Chroma writes."""
+        metrics = {}
+        if self.pipeline:
+            metrics["ingestion"] = self.pipeline.metrics()
+        if self.batcher:
+            metrics["embedding_batches"] = self.batcher.metrics()
+        if self.embedding_cache:
+            metrics["embedding_cache"] = self.embedding_cache.stats()
+        metrics["chroma_writes"] = self.storer.writer.metrics()
+        return metrics
+
+    def close(self):
+        if self.pipeline:
+            self.pipeline.close()
+        if self._submit_executor:
+            self._submit_executor.shutdown(wait=True)
+        if self.batcher:
+            self.batcher.close()
+        self.storer.writer.close()
+        if self.parsing_pool:
+            self.parsing_pool.close()
+        self.manifest.close()
+        if self.parent_store:
+            self.parent_store.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
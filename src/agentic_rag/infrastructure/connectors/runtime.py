@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import importlib
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agentic_rag.domain.utils import PathConfig
+from agentic_rag.infrastructure.connectors.processor import Processor
+
+
+# Source name -> module providing build_watcher(processor)
+SOURCES = {
+    "sharepoint": "agentic_rag.infrastructure.connectors.sharepoint.main",
+    "blob": "agentic_rag.infrastructure.connectors.blob.main",
+    "gdrive": "agentic_rag.infrastructure.connectors.gdrive.main",
+    "local": "agentic_rag.infrastructure.connectors.local.main",
+}
+
+
+class SourceHealth:
+    """Poll outcome counters of one source."""
+
+    def __init__(self, name: str, poll_interval: float):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.status = "starting"  # starting, healthy, failing, stopped
+        self.polls = 0
+        self.events = 0
+        self.failures = 0  # consecutive
+        self.last_error: Optional[str] = None
+        self.last_poll_at: Optional[str] = None
+        self.last_success_at: Optional[str] = None
+        self.last_poll_seconds = 0.0
+
+    def record(self, seconds: float, error: Exception = None):
+        self.polls += 1
+        self.last_poll_seconds = seconds
+        self.last_poll_at = datetime.now().isoformat()
+        if error is None:
+            self.status = "healthy"
+            self.failures = 0
+            self.last_success_at = self.last_poll_at
+        else:
+            self.status = "failing"
+            self.failures += 1
+            self.last_error = str(error)
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "poll_interval": self.poll_interval,
+            "polls": self.polls,
+            "events": self.events,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+            "last_poll_at": self.last_poll_at,
+            "last_success_at": self.last_success_at,
+            "last_poll_seconds": round(self.last_poll_seconds, 3),
+        }
+
+
+class ConnectorRuntime:
+    """
+    Polls several sources as tasks on one asyncio event loop.
+
+    All sources share one Processor, i.e. one Chroma client, one embedder and
+    one ingestion pipeline. Each source polls on its own schedule. The source
+    SDKs are blocking, so a poll runs in the loop's thread pool and the
+    downloads run on the watcher's WorkerDispatcher. A failing source backs
+    off exponentially without holding up the others.
+
+    Change notifications (webhooks) reach a source through notify(): events
+    naming an item are handed to the watcher's handle_events(), other
+    notifications trigger an immediate poll. With notifications in place the
+    poll interval only needs to be a slow reconciliation.
+    """
+
+    def __init__(self, processor: Processor, max_backoff: float = 300.0):
+        """
+        Initialize the runtime.
+
+        Args:
+            processor: Ingestion shared by all sources
+            max_backoff: Upper bound in seconds of the delay after repeated failed polls
+        """
+        self.processor = processor
+        self.max_backoff = max_backoff
+        self._watchers = {}
+        self._health: Dict[str, SourceHealth] = {}
+        self._events: Dict[str, List[dict]] = {}
+        self._poll_requested = set()
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, sources: List[str] = None, config_path: Path = None,
+                    default_sources: List[str] = None) -> "ConnectorRuntime":
+        """
+        Build the runtime from connectors.json and each source's own config file.
+
+        connectors.json is optional: its "processor" section holds the ingestion
+        options (see Processor.from_config) and its "sources" section the
+        sources to run, optionally with a "poll_interval" each.
+
+        Args:
+            sources: Sources to run (overrides the config)
+            config_path: Runtime config (defaults to PathConfig.CONNECTORS_CONFIG)
+            default_sources: Sources to run when neither sources nor the config name any (default: all)
+        """
+        config_path = Path(config_path or PathConfig.CONNECTORS_CONFIG)
+        config = {}
+        if config_path.exists():
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        source_configs = config.get("sources", {})
+
+        runtime = cls(Processor.from_config(config.get("processor", {})))
+        for name in sources or list(source_configs) or default_sources or list(SOURCES):
+            if name not in SOURCES:
+                print(f"[WARN] Unknown source '{name}', expected one of {', '.join(SOURCES)}")
+                continue
+            try:
+                watcher = importlib.import_module(SOURCES[name]).build_watcher(runtime.processor)
+            except Exception as e:
+                # Usually a missing config file or credentials; the other sources still run
+                print(f"[WARN] Source '{name}' not started: {e}")
+                continue
+            runtime.add_source(name, watcher, source_configs.get(name, {}).get("poll_interval"))
+        return runtime
+
+    def add_source(self, name: str, watcher, poll_interval: float = None):
+        """Register a watcher (anything with poll_once()) under name."""
+        poll_interval = poll_interval or watcher.poll_interval
+        self._watchers[name] = watcher
+        self._health[name] = SourceHealth(name, poll_interval)
+        self._events[name] = []
+        self._wake[name] = asyncio.Event()
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._watchers)
+
+    async def run(self):
+        """Poll every source until stop() is called, then wait for in-flight files."""
+        if self._closed:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        print(f"[Runtime] Polling {', '.join(self._watchers) or 'no sources'}")
+        try:
+            await asyncio.gather(*(self._poll_source(name) for name in self._watchers))
+        finally:
+            await asyncio.to_thread(self.close)
+
+    def start_in_thread(self) -> threading.Thread:
+        """Run the event loop on a daemon thread, e.g. next to the API server."""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="connector-runtime", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """
+        Ask every source to stop after its current poll (safe to call from any thread).
+
+        A runtime whose loop never started is closed right away, since run()
+        would otherwise be the one to release the processor and the watchers.
+        """
+        if self._loop is None:
+            self.close()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._set_stop)
+
+    def notify(self, name: str, event: dict = None) -> bool:
+        """
+        Hand a change notification to a source (safe to call from any thread).
+
+        Args:
+            name: Source the notification is for
+            event: Item to ingest, passed to the watcher's handle_events(); None
+                (or a watcher without handle_events) polls the source now
+
+        Returns:
+            False if the runtime is not running or does not run the source
+        """
+        if self._loop is None or self._stop.is_set() or name not in self._watchers:
+            return False
+        self._loop.call_soon_threadsafe(self._notify, name, event)
+        return True
+
+    def _notify(self, name: str, event: Optional[dict]):
+        if event is not None and hasattr(self._watchers[name], "handle_events"):
+            self._events[name].append(event)
+        else:
+            self._poll_requested.add(name)
+        self._wake[name].set()
+
+    def _set_stop(self):
+        self._stop.set()
+        for wake in self._wake.values():
+            wake.set()
+
+    def health(self) -> dict:
+        """Status per source: last poll, consecutive failures, files in flight and the source's job queue."""
+        health = {}
+        for name, source in self._health.items():
+            watcher = self._watchers[name]
+            health[name] = dict(source.to_dict(), pending_files=watcher.dispatcher.pending(),
+                                queue=watcher.jobs.stats(watcher.jobs.source))
+        return health
+
+    def close(self):
+        """Release the watchers and the shared processor (Chroma, embedder, SQLite); later calls do nothing."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        for name, watcher in self._watchers.items():
+            watcher.dispatcher.close()
+            watcher.jobs.close()
+            watcher.tracker.close()
+            self._health[name].status = "stopped"
+        self.processor.close()
+
+    async def _poll_source(self, name: str):
+        watcher = self._watchers[name]
+        health = self._health[name]
+        wake = self._wake[name]
+        next_poll = time.monotonic()
+        while not self._stop.is_set():
+            wake.clear()
+            # Events and polls of one source run one after another, never concurrently
+            if self._events[name]:
+                events, self._events[name] = self._events[name], []
+                try:
+                    await asyncio.to_thread(watcher.handle_events, events)
+                    health.events += len(events)
+                except Exception as e:
+                    # The next poll picks the items up instead
+                    print(f"[Runtime] {name} failed to handle {len(events)} events ({e})")
+
+            if name in self._poll_requested or time.monotonic() >= next_poll:
+                self._poll_requested.discard(name)
+                started = time.monotonic()
+                try:
+                    await asyncio.to_thread(watcher.poll_once)
+                    health.record(time.monotonic() - started)
+                    delay = health.poll_interval
+                except Exception as e:
+                    health.record(time.monotonic() - started, e)
+                    delay = min(health.poll_interval * 2 ** health.failures, self.max_backoff)
+                    print(f"[Runtime] {name} poll failed ({e}), retrying in {delay:.1f}s")
+                next_poll = time.monotonic() + delay
+
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=max(0.0, next_poll - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several connector sources in one process.")
+    parser.add_argument("sources", nargs="*", help=f"Sources to run ({', '.join(SOURCES)}); default: connectors.json or all")
+    args = parser.parse_args()
+
+    runtime = ConnectorRuntime.from_config(args.sources)
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        print("[Runtime] Stopped")
@@ -1,15 +1,51 @@
+import random
+import threading
+import time
 import requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+ITEM_FIELDS = "Id,FileLeafRef,FileRef,Modified,FSObjType"
 
 
 class SharePointAPI:
-    def __init__(self, client_id: str, client_secret: str, tenant: str, realm: str, site_url: str, library_name: str):
+    # Refresh the token this many seconds before it expires
+    TOKEN_REFRESH_MARGIN = 300
+    # Statuses SharePoint uses for throttling
+    THROTTLED = (429, 503)
+
+    def __init__(self, client_id: str, client_secret: str, tenant: str, realm: str, site_url: str, library_name: str,
+                 page_size: int = 5000, pool_size: int = 10, max_retries: int = 5, backoff: float = 1.0):
+        """
+        Args:
+            client_id: App principal id
+            client_secret: App principal secret
+            tenant: Tenant name (<tenant>.sharepoint.com)
+            realm: Tenant realm id
+            site_url: Site holding the library
+            library_name: Document library title
+            page_size: Items per listing page ($top, at most 5000)
+            pool_size: Kept-alive connections (at least the watcher's download workers)
+            max_retries: Retries of a throttled (429/503) request
+            backoff: First retry delay in seconds when no Retry-After is sent, doubled on each retry
+        """
         self.client_id = client_id
         self.client_secret = client_secret
         self.tenant = tenant
         self.realm = realm
         self.site_url = site_url
         self.library_name = library_name
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._token_lock = threading.Lock()
+        self._token_expires_at = 0.0
         self.access_token = self._get_access_token()
 
     def _get_access_token(self) -> str:
@@ -23,7 +59,7 @@ class SharePointAPI:
             'resource': f'00000003-0000-0ff1-ce00-000000000000/{self.tenant}.sharepoint.com@{self.realm}'
         }
 
-        response = requests.post(token_url, data=payload)
+        response = self.session.post(token_url, data=payload)
         response.raise_for_status()
 
         token_json = response.json()
@@ -32,30 +68,132 @@ class SharePointAPI:
         if not token:
             raise Exception("Failed to obtain access token")
 
+        # ACS tokens live an hour unless the response says otherwise
+        self._token_expires_at = time.time() + int(token_json.get('expires_in', 3600))
         return token
 
+    def _refresh_token(self, stale_token: str = None):
+        """Get a new token unless another thread already replaced stale_token."""
+        with self._token_lock:
+            if stale_token is None or self.access_token == stale_token:
+                self.access_token = self._get_access_token()
+
     def _headers(self):
-        """Return authorization headers."""
+        """Return authorization headers, refreshing the token shortly before it expires."""
+        if time.time() >= self._token_expires_at - self.TOKEN_REFRESH_MARGIN:
+            self._refresh_token(self.access_token)
         return {
             'Authorization': f'Bearer {self.access_token}',
             'Accept': 'application/json;odata=verbose'
         }
 
-    def list_files(self):
-        """List files from the given SharePoint document library."""
-        url = f"{self.site_url}/_api/web/lists/GetByTitle('{self.library_name}')/items?$select=FileLeafRef,FileRef,Modified"
-        response = requests.get(url, headers=self._headers())
+    def _request(self, method: str, url: str, headers: dict = None, **kwargs) -> requests.Response:
+        """Send a request on the pooled session; retries throttling and a rejected token."""
+        delay = self.backoff
+        refreshed = False
+        for attempt in range(self.max_retries + 1):
+            request_headers = dict(self._headers(), **(headers or {}))
+            response = self.session.request(method, url, headers=request_headers, **kwargs)
+
+            if response.status_code == 401 and not refreshed:
+                # Revoked or expired early: one retry with a fresh token
+                response.close()
+                self._refresh_token(request_headers['Authorization'][len('Bearer '):])
+                refreshed = True
+                continue
+            if response.status_code in self.THROTTLED and attempt < self.max_retries:
+                response.close()
+                wait = self._retry_after(response) or delay * random.uniform(0.5, 1.5)
+                print(f"[WARN] SharePoint throttled the request ({response.status_code}), retrying in {wait:.1f}s")
+                time.sleep(wait)
+                delay *= 2
+                continue
+            break
+
         response.raise_for_status()
-        return response.json()['d']['results']
+        return response
+
+    @staticmethod
+    def _retry_after(response: requests.Response):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def _list_url(self) -> str:
+        return f"{self.site_url}/_api/web/lists/GetByTitle('{self.library_name}')"
+
+    def list_files(self):
+        """List files from the given SharePoint document library, following every result page."""
+        url = f"{self._list_url()}/items?$select={ITEM_FIELDS}&$top={self.page_size}"
+        items = []
+        while url:
+            data = self._request('GET', url).json()['d']
+            items.extend(data['results'])
+            url = data.get('__next')
+        return items
+
+    def get_root_folder(self) -> str:
+        """Server-relative URL of the library's root folder, e.g. /sites/team/Shared Documents."""
+        response = self._request('GET', f"{self._list_url()}/RootFolder?$select=ServerRelativeUrl")
+        return response.json()['d']['ServerRelativeUrl']
+
+    def get_change_token(self) -> str:
+        """Current change token of the library; list_changes returns what changes after it."""
+        response = self._request('GET', f"{self._list_url()}?$select=CurrentChangeToken")
+        return response.json()['d']['CurrentChangeToken']['StringValue']
+
+    def list_changes(self, change_token: str, row_limit: int = 1000, ids_per_request: int = 50):
+        """
+        List items added or updated since change_token (the library's change log).
+
+        Args:
+            change_token: Token from get_change_token or a previous call
+            row_limit: Changes fetched per request
+            ids_per_request: Changed items fetched per items request
+
+        Returns:
+            Tuple of (items shaped like list_files, token to pass on the next call)
+        """
+        headers = {'Content-Type': 'application/json;odata=verbose'}
+        item_ids = []
+        while True:
+            query = {
+                'query': {
+                    '__metadata': {'type': 'SP.ChangeQuery'},
+                    'Add': True,
+                    'Update': True,
+                    'Item': True,
+                    'RowLimit': row_limit,
+                    'ChangeTokenStart': {'__metadata': {'type': 'SP.ChangeToken'}, 'StringValue': change_token},
+                }
+            }
+            response = self._request('POST', f"{self._list_url()}/GetChanges", headers=headers, json=query)
+            changes = response.json()['d']['results']
+            item_ids.extend(change['ItemId'] for change in changes if change.get('ItemId'))
+            if changes:
+                change_token = changes[-1]['ChangeToken']['StringValue']
+            if len(changes) < row_limit:
+                break
+
+        # Items changed several times are fetched once; deleted ones are simply not found
+        item_ids = list(dict.fromkeys(item_ids))
+        items = []
+        for start in range(0, len(item_ids), ids_per_request):
+            id_filter = " or ".join(f"Id eq {item_id}" for item_id in item_ids[start:start + ids_per_request])
+            url = f"{self._list_url()}/items?$select={ITEM_FIELDS}&$filter={id_filter}"
+            items.extend(self._request('GET', url).json()['d']['results'])
+        return items, change_token
 
     def download_file(self, file_url: str, file_path: Path):
         """Download a file from SharePoint by its relative URL."""
         download_url = f"{self.site_url}/_api/web/getfilebyserverrelativeurl('{file_url}')/$value"
-        response = requests.get(download_url, headers=self._headers(), stream=True)
-        response.raise_for_status()
-
-        with open(file_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        with self._request('GET', download_url, stream=True) as response:
+            with open(file_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
 
         return file_path
+
+    def close(self):
+        self.session.close()
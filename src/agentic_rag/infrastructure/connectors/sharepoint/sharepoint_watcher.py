@@ -1,37 +1,92 @@
 import time
 from pathlib import Path
 
+from agentic_rag.infrastructure.connectors.dispatcher import WorkerDispatcher
+from agentic_rag.infrastructure.connectors.job_queue import IngestionQueue
+from agentic_rag.infrastructure.connectors.paths import safe_relative_path
+
 class SharePointWatcher:
-    def __init__(self, sp_api, tracker, processor, download_dir: Path, poll_interval: int = 5):
+    def __init__(self, sp_api, tracker, processor, download_dir: Path, poll_interval: int = 5, workers: int = 4,
+                 max_attempts: int = 5, retry_backoff: float = 30.0):
         self.sp_api = sp_api
         self.tracker = tracker
         self.processor = processor
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
         self.poll_interval = poll_interval
+        self.cursor_name = f"sharepoint_changes:{sp_api.site_url}/{sp_api.library_name}"
+        # New files download and ingest in parallel, each file URL one job at a time
+        self.dispatcher = WorkerDispatcher(workers, name="sharepoint-worker")
+        # Changed files are queued durably and retried until they are ingested or dead-lettered
+        self.jobs = IngestionQueue(source=f"sharepoint:{sp_api.site_url}/{sp_api.library_name}",
+                                   max_attempts=max_attempts, backoff=retry_backoff)
+        self._root_folder = None
 
     def run(self):
         print("[Watcher] Monitoring SharePoint library...")
         while True:
             try:
-                files = self.sp_api.list_files()
-                for item in files:
-                    file_name = item.get("FileLeafRef")
-                    file_url = item.get("FileRef")
-                    if not file_name or not file_url:
-                        continue
-
-                    if not self.tracker.has_seen(file_url):
-                        try:
-                            local_path = self.download_dir / file_name
-                            self.sp_api.download_file(file_url, str(local_path))
-                            self.processor.process_file(local_path)
-                            self.tracker.mark_seen(file_url, file_name)
-                        except Exception as e:
-                            print(f"[Watcher] Failed {file_name}: {e}")
-                            self.tracker.mark_seen(file_url, file_name)
-
+                self.poll_once()
                 time.sleep(self.poll_interval)
             except Exception as e:
                 print(f"[Watcher] Fatal loop error: {e}")
                 time.sleep(self.poll_interval)
+
+    def poll_once(self):
+        """Queue items changed since the last poll (everything on the first one) and dispatch due jobs."""
+        self.dispatcher.drain()
+        files, change_token = self._list_changed()
+        for item in files:
+            file_name = item.get("FileLeafRef")
+            file_url = item.get("FileRef")
+            modified = item.get("Modified")
+            if not file_name or not file_url or str(item.get("FSObjType")) == "1":
+                continue  # folders
+
+            if self._is_new(file_url, file_name, modified):
+                payload = {"file_url": file_url, "path": self._library_path(file_url)}
+                self.jobs.enqueue(file_url, payload, file_name, version=modified)
+                self.tracker.mark_seen(file_url, file_name, modified)
+
+        # Everything listed is in the queue, so the cursor can move on right away
+        self.tracker.set_cursor(self.cursor_name, change_token)
+        self.jobs.dispatch(self.dispatcher, self._run_job)
+
+    def _run_job(self, payload: dict):
+        # Folders are mirrored, so same-named files in different folders never share a local path
+        local_path = self.download_dir / safe_relative_path(payload["path"])
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        self.sp_api.download_file(payload["file_url"], str(local_path))
+        self.processor.process_file(local_path)
+        print(f"[Watcher] Downloaded + processed {payload['path']}")
+
+    def _library_path(self, file_url: str) -> str:
+        """Path of a file below the library root (just the name for files in the root)."""
+        if self._root_folder is None:
+            self._root_folder = self.sp_api.get_root_folder().rstrip("/")
+        if file_url.startswith(self._root_folder + "/"):
+            return file_url[len(self._root_folder) + 1:]
+        return file_url
+
+    def _is_new(self, file_url: str, file_name: str, modified: str) -> bool:
+        """Whether the file was never ingested or was modified since."""
+        info = self.tracker.get(file_url)
+        if info is None:
+            return True
+        if info["modified_time"] is None and modified is not None:
+            # Marked before modification times were tracked: adopt the current one
+            self.tracker.mark_seen(file_url, file_name, modified)
+            return False
+        return info["modified_time"] != modified
+
+    def _list_changed(self):
+        change_token = self.tracker.get_cursor(self.cursor_name)
+        if change_token is not None:
+            try:
+                return self.sp_api.list_changes(change_token)
+            except Exception as e:
+                # e.g. a token older than the library's change log retention
+                print(f"[Watcher] Change listing failed ({e}), falling back to a full listing")
+        # Take the token before listing so changes made during the listing are not lost
+        change_token = self.sp_api.get_change_token()
+        return self.sp_api.list_files(), change_token
@@ -1,7 +1,10 @@
 import json
+import os
+import shutil
 from pathlib import Path
 
 from agentic_rag.domain.utils import PathConfig
+from agentic_rag.infrastructure.connectors.blob.azure_blob_api import STAGING_SUFFIX
 from azure.storage.blob import BlobServiceClient
 
 # Use PathConfig to get project root
@@ -25,6 +28,11 @@ class UploadConnector:
         except Exception:
             pass  # Container already exists
 
+        # Uploads are ingested from where the Blob watcher would download them,
+        # so the watcher finds them already indexed instead of adding a second copy
+        download_dir = config.get("download_dir")
+        self.staging_dir = BASE_DIR / download_dir if download_dir else PathConfig.UPLOAD_DATA_DIR / "files"
+
     def upload_file(self, file_name: str, file_content):
         """
         Uploads a file to Azure Blob Storage.
@@ -35,3 +43,35 @@ class UploadConnector:
         blob_client.upload_blob(file_content, overwrite=True)
 
         return f"File '{file_name}' uploaded successfully."
+
+    def stage_file(self, file_name: str, file_content) -> Path:
+        """
+        Save an upload locally for ingestion and archive it in Blob Storage.
+
+        Args:
+            file_name: Name of the file; any directory part is dropped
+            file_content: File-like object
+
+        Returns:
+            Local path of the file, ready to be ingested
+        """
+        file_name = Path(file_name).name
+        if not file_name:
+            raise ValueError("Upload has no file name")
+        local_path = self.staging_dir / file_name
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # A Blob watcher downloading this path waits while the staging file exists,
+        # so it only sees the blob together with the etag sidecar and skips it
+        staging_file = local_path.with_name(local_path.name + STAGING_SUFFIX)
+        try:
+            with open(staging_file, "wb") as f:
+                shutil.copyfileobj(file_content, f, 1024 * 1024)
+            with open(staging_file, "rb") as f:
+                result = self.container_client.get_blob_client(file_name).upload_blob(f, overwrite=True)
+            # The sidecar AzureBlobAPI.download_file checks: the watcher skips downloading this version
+            local_path.with_name(local_path.name + ".etag").write_text(result["etag"])
+            os.replace(staging_file, local_path)
+        finally:
+            staging_file.unlink(missing_ok=True)
+        return local_path
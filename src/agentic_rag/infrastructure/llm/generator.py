@@ -1,7 +1,9 @@
+import time
 import yaml
 from textwrap import dedent
 from openai import AzureOpenAI
 from agentic_rag.domain.utils import PathConfig
+from agentic_rag.infrastructure.llm.router import LLMRouter
 
 
 class LanguageModel:
@@ -18,24 +20,37 @@ class LanguageModel:
             config_data = yaml.safe_load(f)
         
         self.config = config_data.get('generator', {})
-        self.client = self._init_client()
+        # Primary deployment plus optional `fallbacks`, see LLMRouter.from_config
+        self.router = LLMRouter.from_config(self.config, name="generator")
+        self.clients = {id(endpoint): self._init_client(endpoint) for endpoint in self.router.endpoints}
+        self.client = self.clients[id(self.router.endpoints[0])]
         self.model_name = self.config.get('model')
+        self.max_tokens = self.config.get('max_tokens', 512)
 
-    def _init_client(self):
+    def _init_client(self, settings: dict = None):
         """Initialize Azure OpenAI client"""
+        settings = settings or self.config
 
+        # With fallbacks configured the router handles 429/5xx itself,
+        # so the SDK should not sleep and retry on the same deployment.
         return AzureOpenAI(
-            azure_endpoint=self.config.get('endpoint'),
-            api_version=self.config.get('version'),
-            api_key=self.config.get('api_key'),
+            azure_endpoint=settings.get('endpoint'),
+            api_version=settings.get('version'),
+            api_key=settings.get('api_key'),
+            max_retries=0 if len(self.router.endpoints) > 1 else 2,
         )
     
 
-    def generate_answer(self, query: str, context: str) -> str:
+    def generate_answer(self, query: str, context: str, max_tokens: int = None, timeout: float = None) -> str:
         """
         Generate an answer strictly based on the provided context.
         If the context lacks sufficient info, respond accordingly.
+
+        max_tokens overrides the configured limit and timeout bounds the
+        whole call (TimeoutError), e.g. when the request is running out of
+        its latency budget.
         """
+        deadline = None if timeout is None else time.monotonic() + timeout
 
         messages = [
             {"role": "system", "content": dedent(
@@ -54,12 +69,20 @@ class LanguageModel:
             {"role": "user", "content": query}        
             ]
 
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=self.config.get('temperature', 0.2),
-            max_tokens=self.config.get('max_tokens', 512),
-        )
+        def complete(endpoint: dict):
+            options = {}
+            if deadline is not None:
+                # The HTTP request gives up at the deadline too instead of holding its thread
+                options["timeout"] = max(0.1, deadline - time.monotonic())
+            return self.clients[id(endpoint)].chat.completions.create(
+                model=endpoint.get('model'),
+                messages=messages,
+                temperature=self.config.get('temperature', 0.2),
+                max_tokens=max_tokens or self.max_tokens,
+                **options
+            )
+
+        response = self.router.call(complete, timeout=timeout)
 
         return response.choices[0].message.content.strip()
 
@@ -0,0 +1,302 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Return True for errors another deployment may not have:
+    throttling (429), server errors (5xx), timeouts and connection failures.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    # openai raises APITimeoutError / APIConnectionError without a status code
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+class EndpointHealth:
+    """Latency window and failure state of a single deployment."""
+
+    def __init__(self, name: str, latency_window: int = 200):
+        self.name = name
+        self.latencies = deque(maxlen=latency_window)
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.wins = 0
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def record_failure(self, failure_threshold: int, cooldown: float):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold:
+            self.unhealthy_until = time.monotonic() + cooldown
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class LLMRouter:
+    """
+    Routes LLM requests across a primary deployment and its fallbacks.
+
+    - Hedging: if the first attempt has not finished after the primary's
+      observed latency percentile, a duplicate request is sent to the next
+      deployment and whichever succeeds first is returned.
+    - Failover: on 429/5xx/timeouts the next deployment is tried.
+    - Health: deployments that fail repeatedly are skipped for a cooldown.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Dict[str, Any]],
+        name: str = "llm",
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay: float = 1.0,
+        hedge_initial_delay: float = 10.0,
+        min_latency_samples: int = 20,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        latency_window: int = 200,
+        max_concurrency: int = 8,
+        max_workers: int = None
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            endpoints: Deployment settings, primary first
+            name: Name used in metrics
+            hedge_enabled: Send hedged duplicates for slow requests
+            hedge_percentile: Latency percentile after which to hedge
+            hedge_min_delay: Never hedge earlier than this (seconds)
+            hedge_initial_delay: Hedge delay until enough latencies are observed
+            min_latency_samples: Samples needed before the percentile is trusted
+            failure_threshold: Consecutive failures before a deployment is benched
+            cooldown: Seconds a benched deployment is skipped
+            latency_window: Number of recent latencies kept per deployment
+            max_concurrency: Calls expected to run at once (e.g. concurrent API requests)
+            max_workers: Threads for attempts (default max_concurrency x (1 + hedge), so hedges
+                never queue behind the primaries they race)
+        """
+        if not endpoints:
+            raise ValueError("LLMRouter needs at least one endpoint")
+
+        self.name = name
+        self.endpoints = endpoints
+        self.hedge_enabled = hedge_enabled and len(endpoints) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_initial_delay = hedge_initial_delay
+        self.min_latency_samples = min_latency_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.health = [
+            EndpointHealth(endpoint.get("name") or endpoint.get("endpoint") or str(i), latency_window)
+            for i, endpoint in enumerate(endpoints)
+        ]
+        self.max_workers = max_workers or max_concurrency * (2 if self.hedge_enabled else 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{name}-router")
+        self._lock = threading.Lock()
+        # Attempts submitted and not yet finished, including losers still running after their call returned
+        self._active = 0
+        self._counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "hedges_skipped": 0, "fallbacks": 0,
+                          "failed": 0, "timed_out": 0}
+
+    @classmethod
+    def from_config(cls, settings: dict, name: str = "llm") -> "LLMRouter":
+        """
+        Build a router from an llm_config.yaml section.
+
+        The section itself is the primary deployment. Entries under
+        ``fallbacks`` inherit any key they do not set from the primary, and
+        ``routing`` holds the keyword arguments of this class.
+        """
+        primary = {k: v for k, v in settings.items() if k not in ("fallbacks", "routing")}
+        endpoints = [primary] + [{**primary, **fallback} for fallback in settings.get("fallbacks") or []]
+        return cls(endpoints, name=name, **(settings.get("routing") or {}))
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _candidates(self) -> List[int]:
+        """Endpoint indexes to try: healthy ones in config order, then benched ones as a last resort."""
+        healthy = [i for i, h in enumerate(self.health) if h.is_healthy()]
+        benched = [i for i, h in enumerate(self.health) if not h.is_healthy()]
+        return healthy + benched
+
+    def _hedge_delay(self, index: int) -> float:
+        health = self.health[index]
+        if len(health.latencies) < self.min_latency_samples:
+            return max(self.hedge_min_delay, self.hedge_initial_delay)
+        return max(self.hedge_min_delay, health.latency_percentile(self.hedge_percentile))
+
+    def _submit(self, index: int, request: Callable[[dict], Any]):
+        with self._lock:
+            self._active += 1
+        future = self._executor.submit(self._attempt, index, request)
+        # Also runs for an attempt cancelled before it started
+        future.add_done_callback(self._attempt_done)
+        return future
+
+    def _attempt_done(self, future):
+        with self._lock:
+            self._active -= 1
+
+    def _attempt(self, index: int, request: Callable[[dict], Any]) -> Any:
+        health = self.health[index]
+        with self._lock:
+            health.requests += 1
+        started = time.monotonic()
+        try:
+            result = request(self.endpoints[index])
+        except Exception as e:
+            if is_retryable_error(e):
+                with self._lock:
+                    health.record_failure(self.failure_threshold, self.cooldown)
+            raise
+        with self._lock:
+            health.record_success(time.monotonic() - started)
+        return result
+
+    def _can_hedge(self) -> bool:
+        """Whether a hedge would start right away rather than wait for a busy worker."""
+        with self._lock:
+            return self._active < self.max_workers
+
+    def call(self, request: Callable[[dict], Any], timeout: float = None) -> Any:
+        """
+        Run ``request(endpoint_settings)`` with hedging and failover.
+
+        Args:
+            request: Callable performing one attempt against the given deployment
+            timeout: Seconds to wait for a successful attempt (None = no limit).
+                Attempts still running then are abandoned in the background.
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            TimeoutError if no attempt succeeded within timeout, the last
+            error if every deployment failed, or the first non-retryable
+            error (e.g. a 400) as soon as it happens.
+        """
+        self._count("requests")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        candidates = self._candidates()
+        first = candidates[0]
+        next_candidate = 1
+        pending = {self._submit(first, request): first}
+        hedged = False
+        last_error = None
+
+        while pending:
+            wait_timeout = None
+            if self.hedge_enabled and not hedged and next_candidate < len(candidates):
+                wait_timeout = self._hedge_delay(first)
+            if deadline is not None:
+                left = max(0.0, deadline - time.monotonic())
+                wait_timeout = left if wait_timeout is None else min(wait_timeout, left)
+
+            done, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            if not done and deadline is not None and time.monotonic() >= deadline:
+                for other in pending:
+                    other.cancel()
+                self._count("timed_out")
+                raise TimeoutError(f"{self.name}: no response within {timeout:.2f}s")
+
+            if not done:
+                hedged = True
+                if not self._can_hedge():
+                    # Every worker is busy: a queued hedge could not beat the slow attempt
+                    self._count("hedges_skipped")
+                    continue
+                # Primary is slower than usual: race a duplicate against it
+                self._count("hedged")
+                index = candidates[next_candidate]
+                next_candidate += 1
+                pending[self._submit(index, request)] = index
+                continue
+
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    if not is_retryable_error(e):
+                        self._count("failed")
+                        raise
+                    print(f"[WARN] {self.name}: {self.health[index].name} failed ({e})")
+                    continue
+
+                # The losing attempt keeps running in the background and is discarded
+                for other in pending:
+                    other.cancel()
+                with self._lock:
+                    self.health[index].wins += 1
+                if hedged and index != first:
+                    self._count("hedge_wins")
+                return result
+
+            if not pending and next_candidate < len(candidates) and (deadline is None or time.monotonic() < deadline):
+                self._count("fallbacks")
+                index = candidates[next_candidate]
+                next_candidate += 1
+                pending[self._submit(index, request)] = index
+
+        self._count("failed")
+        raise last_error
+
+    def metrics(self) -> dict:
+        """Counters, hedge/fallback rates and per-endpoint health."""
+        with self._lock:
+            counters = dict(self._counters)
+            endpoints = [
+                {
+                    "name": h.name,
+                    "healthy": h.is_healthy(),
+                    "requests": h.requests,
+                    "failures": h.failures,
+                    "wins": h.wins,
+                    "p50_latency": h.latency_percentile(50),
+                    "p95_latency": h.latency_percentile(95),
+                }
+                for h in self.health
+            ]
+        total = counters["requests"] or 1
+        return {
+            **counters,
+            "active_attempts": self._active,
+            "hedge_rate": counters["hedged"] / total,
+            "fallback_rate": counters["fallbacks"] / total,
+            "endpoints": endpoints,
+        }
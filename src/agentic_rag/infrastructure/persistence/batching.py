@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+
+class EmbeddingBatcher:
+    """
+    Accumulates chunk texts from many files into large embedding batches.
+
+    Callers submit the chunks of one file and get a Future for their vectors.
+    A background thread waits until ``batch_size`` texts are pending or the
+    oldest request has waited ``max_linger`` seconds, encodes everything in a
+    single call with the texts sorted by length (so each mini-batch pads to
+    similar lengths), and routes the vectors back to each request.
+    """
+
+    def __init__(self, embedder, batch_size: int = 256, max_linger: float = 0.05, encode_batch_size: int = 64):
+        """
+        Initialize the batcher.
+
+        Args:
+            embedder: SentenceTransformer used for encoding
+            batch_size: Texts gathered before an encode call is made
+            max_linger: Seconds the oldest request may wait for the batch to fill
+            encode_batch_size: Mini-batch size passed to the embedder
+        """
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.max_linger = max_linger
+        self.encode_batch_size = encode_batch_size
+
+        self._pending = []  # (texts, future, arrived_at)
+        self._pending_texts = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+        self.batches = 0
+        self.texts = 0
+        self.encode_seconds = 0.0
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the future resolves to their vectors in order."""
+        future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+            self._pending.append((list(texts), future, time.monotonic()))
+            self._pending_texts += len(texts)
+            self._condition.notify()
+        return future
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Blocking variant of submit()."""
+        return self.submit(texts).result()
+
+    def close(self):
+        """Flush pending requests and stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "texts_per_s": self.texts / self.encode_seconds if self.encode_seconds else 0.0,
+        }
+
+    def _take_batch(self) -> list:
+        """Wait for a full batch (or linger timeout) and take it off the queue."""
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return []
+
+            deadline = self._pending[0][2] + self.max_linger
+            while self._pending_texts < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            # Whole requests only; a single oversized request is encoded on its own
+            batch, count = [], 0
+            while self._pending and (not batch or count + len(self._pending[0][0]) <= self.batch_size):
+                request = self._pending.pop(0)
+                batch.append(request)
+                count += len(request[0])
+            self._pending_texts -= count
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return  # closed and drained
+
+            texts = [text for request_texts, _, _ in batch for text in request_texts]
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            started = time.monotonic()
+            try:
+                encoded = self.embedder.encode(
+                    [texts[i] for i in order],
+                    batch_size=self.encode_batch_size,
+                    show_progress_bar=False,
+                ).tolist()
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.encode_seconds += time.monotonic() - started
+            self.batches += 1
+            self.texts += len(texts)
+
+            vectors = [None] * len(texts)
+            for position, index in enumerate(order):
+                vectors[index] = encoded[position]
+
+            offset = 0
+            for request_texts, future, _ in batch:
+                future.set_result(vectors[offset:offset + len(request_texts)])
+                offset += len(request_texts)
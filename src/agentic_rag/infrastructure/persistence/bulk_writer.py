@@ -0,0 +1,104 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a Chroma write failed on a lock that is likely to clear (another writer or reader)."""
+    # Chroma wraps SQLite errors in its own exception types, so the message decides
+    message = str(error).lower()
+    return (
+        "database is locked" in message
+        or "database is busy" in message
+        or "database table is locked" in message
+    )
+
+
+class ChromaBulkWriter:
+    """
+    Writes to a Chroma collection in size-limited batches.
+
+    Calls are split into batches no larger than the client's maximum batch
+    size. While one batch is committed on a background thread, the next one
+    is prepared. Transient SQLite lock errors, e.g. while the API reads from
+    the same PersistentClient store, are retried with exponential backoff.
+    """
+
+    DEFAULT_MAX_BATCH = 5000
+
+    def __init__(self, collection, batch_size: int = 1000, max_retries: int = 6, backoff: float = 0.1,
+                 max_backoff: float = 5.0):
+        """
+        Initialize the writer.
+
+        Args:
+            collection: Chroma collection to write to
+            batch_size: Preferred records per call (capped at the client's max batch size)
+            max_retries: Retries of a batch that fails with a transient lock error
+            backoff: First retry delay in seconds, doubled on each retry
+            max_backoff: Upper bound of a single retry delay
+        """
+        self.collection = collection
+        self.batch_size = max(1, min(batch_size, self._max_batch_size(collection)))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer")
+
+        self.batches = 0
+        self.retries = 0
+
+    @classmethod
+    def _max_batch_size(cls, collection) -> int:
+        client = getattr(collection, "_client", None)
+        try:
+            return int(client.get_max_batch_size())
+        except Exception:
+            return cls.DEFAULT_MAX_BATCH
+
+    def upsert(self, ids: List[str], documents: List[str], embeddings: List, metadatas: List[dict]):
+        self._write(self.collection.upsert, len(ids), lambda s: {
+            "ids": ids[s],
+            "documents": documents[s],
+            "embeddings": [list(vector) for vector in embeddings[s]],
+            "metadatas": metadatas[s],
+        })
+
+    def update(self, ids: List[str], metadatas: List[dict]):
+        self._write(self.collection.update, len(ids), lambda s: {"ids": ids[s], "metadatas": metadatas[s]})
+
+    def delete(self, ids: List[str]):
+        self._write(self.collection.delete, len(ids), lambda s: {"ids": ids[s]})
+
+    def metrics(self) -> dict:
+        return {"batch_size": self.batch_size, "batches": self.batches, "retries": self.retries}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _write(self, operation: Callable, count: int, prepare: Callable[[slice], dict]):
+        """Run operation over count records in batches, preparing batch n+1 while batch n commits."""
+        in_flight = None
+        for start in range(0, count, self.batch_size):
+            batch = prepare(slice(start, start + self.batch_size))
+            if in_flight is not None:
+                in_flight.result()
+            in_flight = self._executor.submit(self._with_retry, operation, batch)
+        if in_flight is not None:
+            in_flight.result()
+
+    def _with_retry(self, operation: Callable, batch: dict):
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                operation(**batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient_error(e):
+                    raise
+                self.retries += 1
+                print(f"[WARN] Chroma write hit a lock ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, self.max_backoff)
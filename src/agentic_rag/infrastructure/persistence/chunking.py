@@ -0,0 +1,100 @@
+import os
+from typing import List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from agentic_rag.domain.utils import PathConfig
+
+
+# Tried in order: headings, paragraphs, lines, sentences, clauses, words
+SEPARATORS = ["\n#", "\n\n", "\n", ". ", "? ", "! ", "; ", ", ", " ", ""]
+
+
+class TokenChunker:
+    """
+    Splits LangChain Document objects into chunks measured in embedder tokens.
+
+    Chunks target a fraction of the embedder's ``max_seq_length`` so that
+    nothing is truncated when they are encoded, and split on headings,
+    paragraphs and sentences before falling back to words.
+    """
+
+    def __init__(self, embedder, fraction: float = 0.9, overlap_fraction: float = 0.15):
+        """
+        Initialize the chunker.
+
+        Args:
+            embedder: SentenceTransformer whose tokenizer and max_seq_length are used
+            fraction: Share of max_seq_length a chunk may use
+            overlap_fraction: Share of the chunk size repeated between neighbouring chunks
+        """
+        # [CLS] and [SEP] count against max_seq_length but not against the text
+        self.max_tokens = max(16, int(embedder.max_seq_length * fraction) - 2)
+        self.overlap_tokens = int(self.max_tokens * overlap_fraction)
+        self.splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            embedder.tokenizer,
+            chunk_size=self.max_tokens,
+            chunk_overlap=self.overlap_tokens,
+            separators=SEPARATORS,
+        )
+
+    def chunk_docs(self, docs: List) -> List:
+        return self.splitter.split_documents(docs)
+
+
+def truncation_report(collection, embedder, page_size: int = 1000) -> dict:
+    """
+    Measure how much of a collection's chunk text the embedder truncates.
+
+    Args:
+        collection: Chroma collection to scan
+        embedder: SentenceTransformer used to embed the collection
+        page_size: Chunks fetched per request
+
+    Returns:
+        Dict with chunk counts, truncated share, token percentiles and the share of tokens never embedded
+    """
+    tokenizer = embedder.tokenizer
+    max_length = embedder.max_seq_length
+    lengths = []
+    offset = 0
+    while True:
+        page = collection.get(include=["documents"], limit=page_size, offset=offset)
+        documents = page.get("documents") or []
+        if not documents:
+            break
+        encoded = tokenizer(documents, add_special_tokens=True)["input_ids"]
+        lengths.extend(len(ids) for ids in encoded)
+        offset += len(documents)
+
+    if not lengths:
+        return {"chunks": 0}
+
+    lengths.sort()
+    total = sum(lengths)
+    lost = sum(length - max_length for length in lengths if length > max_length)
+    truncated = sum(1 for length in lengths if length > max_length)
+    return {
+        "chunks": len(lengths),
+        "max_seq_length": max_length,
+        "truncated_chunks": truncated,
+        "truncated_share": truncated / len(lengths),
+        "tokens_lost_share": lost / total,
+        "mean_tokens": total / len(lengths),
+        "p50_tokens": lengths[len(lengths) // 2],
+        "p95_tokens": lengths[min(len(lengths) - 1, int(0.95 * len(lengths)))],
+        "max_tokens": lengths[-1],
+    }
+
+
+if __name__ == "__main__":
+    import chromadb
+    from sentence_transformers import SentenceTransformer
+
+    from agentic_rag.infrastructure.persistence.embedder import EMBEDDING_MODEL
+
+    client = chromadb.PersistentClient(path=str(PathConfig.get_db_path()))
+    collection = client.get_or_create_collection(os.getenv("CHROMA_COLLECTION", "my_files"))
+    report = truncation_report(collection, SentenceTransformer(EMBEDDING_MODEL))
+    for key, value in report.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
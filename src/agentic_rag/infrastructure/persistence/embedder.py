@@ -4,12 +4,15 @@ import chromadb
 from agentic_rag.domain.utils import PathConfig
 
 
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
 def setup_chroma(db_path=None, collection_name="my_files"):
     """Setup Chroma persistent client and SentenceTransformer embedder."""
     # Use PathConfig default if not provided
     db_path = db_path or str(PathConfig.get_db_path())
     client = chromadb.PersistentClient(path=db_path)
     collection = client.get_or_create_collection(collection_name)
-    embedder = SentenceTransformer("all-MiniLM-L6-v2")
+    embedder = SentenceTransformer(EMBEDDING_MODEL)
     return collection, embedder
 
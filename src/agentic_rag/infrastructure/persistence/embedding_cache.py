@@ -0,0 +1,298 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from agentic_rag.domain.utils import PathConfig
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of chunk embeddings keyed by the hash of the chunk text.
+
+    Vectors live in a float32 memory-mapped array file (one row per slot) and
+    a SQLite index maps content hashes to slots. Each embedder model gets its
+    own directory, so switching models never serves stale vectors. When the
+    cache holds ``max_entries`` vectors, the least recently used
+    ``evict_fraction`` of them are dropped to make room.
+
+    Several processes (the API, connector mains) may share a cache: slots are
+    reserved in a SQLite write transaction before their vectors are written,
+    and a vector read is only used if the index still points at its slot.
+
+    Lookups do not write: the access times of hits are kept in memory and
+    written in one batch every ``TOUCH_BATCH`` hits or ``TOUCH_INTERVAL``
+    seconds, before an eviction picks its victims, and on close.
+    """
+
+    INITIAL_CAPACITY = 1024
+    TOUCH_BATCH = 5000
+    TOUCH_INTERVAL = 30.0
+
+    def __init__(self, model_name: str, cache_dir: Path = None, max_entries: int = 200_000,
+                 evict_fraction: float = 0.1):
+        """
+        Initialize the cache.
+
+        Args:
+            model_name: Embedder model the vectors belong to
+            cache_dir: Base directory (defaults to PathConfig); a subdirectory per model is used
+            max_entries: Maximum number of cached vectors
+            evict_fraction: Share of entries evicted at once when the cache is full
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.evict_fraction = evict_fraction
+        self.directory = Path(cache_dir or PathConfig.EMBEDDING_CACHE_DIR) / re.sub(r"[^\w.-]+", "_", model_name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_file = self.directory / "vectors.f32"
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite3"), check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (hash TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self.capacity = 0
+        self._vectors = None
+        if self.dim:
+            self._open()
+
+        self.hits = 0
+        self.misses = 0
+        # Access times of hits not written to the index yet
+        self._touched = {}
+        self._touched_at = time.monotonic()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for the texts, with None for every miss."""
+        hashes = [content_hash(text) for text in texts]
+        found = {}
+        vectors = {}
+        with self._lock:
+            if self._vectors is not None:
+                found = self._lookup(hashes)
+                if found:
+                    self._map(max(found.values()))
+                    vectors = {h: self._vectors[slot].tolist() for h, slot in found.items()}
+                    # Another process may have evicted and rewritten a slot meanwhile; evictions are
+                    # committed before the slot is rewritten, so a second look at the index catches it
+                    current = self._lookup(list(found))
+                    found = {h: slot for h, slot in found.items() if current.get(h) == slot}
+                if found:
+                    self._touch(found)
+
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return [vectors[h] if h in found else None for h in hashes]
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """Store vectors for the texts, evicting old entries if the cache is full."""
+        if not texts:
+            return
+        entries = dict(zip((content_hash(text) for text in texts), vectors))
+        with self._lock:
+            if self.dim is None:
+                self._initialise(len(vectors[0]))
+
+            new, slots = self._reserve(list(entries))
+            if not new:
+                return
+            self._map(max(slots))
+            for h, slot in zip(new, slots):
+                self._vectors[slot] = np.asarray(entries[h], dtype=np.float32)
+            # Vectors reach disk before the index points at them
+            self._vectors.flush()
+            now = time.time()
+            with self._conn:
+                unused = []
+                for h, slot in zip(new, slots):
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO entries (hash, slot, last_used) VALUES (?, ?, ?)", (h, slot, now)
+                    )
+                    if cursor.rowcount == 0:
+                        unused.append((slot,))  # another process cached the same text meanwhile
+                self._conn.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", unused)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._touched:
+                with self._conn:
+                    self._write_touched()
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            self._conn.close()
+
+    def _lookup(self, hashes: List[str]) -> dict:
+        found = {}
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._conn.execute(
+                f"SELECT hash, slot FROM entries WHERE hash IN ({placeholders})", batch
+            ).fetchall())
+        return found
+
+    def _touch(self, hashes):
+        """Remember that hashes were just used; writes the batch once it is due."""
+        now = time.time()
+        self._touched.update((h, now) for h in hashes)
+        if len(self._touched) >= self.TOUCH_BATCH or time.monotonic() - self._touched_at >= self.TOUCH_INTERVAL:
+            with self._conn:
+                self._write_touched()
+
+    def _write_touched(self):
+        """Write the remembered access times to the index (call inside a write transaction)."""
+        self._conn.executemany(
+            "UPDATE entries SET last_used = MAX(last_used, ?) WHERE hash = ?",
+            [(used, h) for h, used in self._touched.items()]
+        )
+        self._touched = {}
+        self._touched_at = time.monotonic()
+
+    def _set_meta(self, key: str, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _initialise(self, dim: int):
+        """First write: record the vector size and start from an empty vectors file."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            if row:
+                dim = int(row[0])  # another process initialised the cache first
+            else:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM free_slots")
+                self._set_meta("dim", dim)
+                self._set_meta("model", self.model_name)
+                self._set_meta("next_slot", 0)
+                self.vectors_file.unlink(missing_ok=True)
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self.dim = dim
+        self._open()
+
+    def _open(self):
+        if not self.vectors_file.exists():
+            self.vectors_file.touch()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.vectors_file.stat().st_size // (self.dim * 4)
+            last = self._conn.execute("SELECT MAX(slot) FROM entries").fetchone()[0]
+            if last is not None and last >= rows:
+                # The vectors file is shorter than the index expects: start over
+                print(f"[WARN] Embedding cache at {self.directory} is inconsistent, clearing it")
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM free_slots")
+                self._set_meta("next_slot", 0)
+            elif self._conn.execute("SELECT 1 FROM meta WHERE key = 'next_slot'").fetchone() is None:
+                # Written before slot allocation was kept in the index: derive it from the entries
+                next_slot = last + 1 if last is not None else 0
+                used = {slot for slot, in self._conn.execute("SELECT slot FROM entries")}
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO free_slots (slot) VALUES (?)",
+                    [(slot,) for slot in range(next_slot) if slot not in used]
+                )
+                self._set_meta("next_slot", next_slot)
+            self._grow_file(min(self.INITIAL_CAPACITY, self.max_entries))
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._map()
+
+    def _grow_file(self, rows: int):
+        """Make the vectors file hold at least rows vectors (call inside a write transaction)."""
+        row_bytes = self.dim * 4
+        current = self.vectors_file.stat().st_size // row_bytes
+        if current < rows:
+            with open(self.vectors_file, "r+b") as f:
+                f.truncate(min(self.max_entries, max(rows, current * 2)) * row_bytes)
+
+    def _map(self, slot: int = None):
+        """(Re)map the vectors file unless slot is already mapped; other processes may have grown it."""
+        if slot is not None and slot < self.capacity:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        self.capacity = self.vectors_file.stat().st_size // (self.dim * 4)
+        self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+
+    def _reserve(self, hashes: List[str]):
+        """
+        Reserve slots for the hashes not cached yet, in one write transaction.
+
+        A reserved slot is neither free nor referenced by an entry, so no other
+        process can hand it out until put_many inserts its entry.
+
+        Returns:
+            Tuple of (new hashes, their slots)
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            known = self._lookup(hashes)
+            new = [h for h in hashes if h not in known][:self.max_entries]
+            slots = [slot for slot, in self._conn.execute("SELECT slot FROM free_slots LIMIT ?", (len(new),))]
+            self._conn.executemany("DELETE FROM free_slots WHERE slot = ?", [(slot,) for slot in slots])
+
+            needed = len(new) - len(slots)
+            next_slot = int(self._conn.execute("SELECT value FROM meta WHERE key = 'next_slot'").fetchone()[0])
+            if needed and next_slot < self.max_entries:
+                grow = min(needed, self.max_entries - next_slot)
+                self._grow_file(next_slot + grow)
+                slots.extend(range(next_slot, next_slot + grow))
+                self._set_meta("next_slot", next_slot + grow)
+                needed -= grow
+
+            if needed:
+                # Eviction must see the hits this process has not written yet
+                self._write_touched()
+                slots.extend(self._evict(needed))
+            self._conn.commit()
+            new = new[:len(slots)]
+        except BaseException:
+            self._conn.rollback()
+            raise
+        return new, slots
+
+    def _evict(self, needed: int) -> List[int]:
+        """Drop the least recently used entries and return their slots (call inside a write transaction)."""
+        count = max(needed, int(self.max_entries * self.evict_fraction))
+        rows = self._conn.execute(
+            "SELECT hash, slot FROM entries ORDER BY last_used LIMIT ?", (count,)
+        ).fetchall()
+        self._conn.executemany("DELETE FROM entries WHERE hash = ?", [(h,) for h, _ in rows])
+        slots = [slot for _, slot in rows]
+        self._conn.executemany("INSERT INTO free_slots (slot) VALUES (?)", [(slot,) for slot in slots[needed:]])
+        return slots[:needed]
@@ -0,0 +1,233 @@
+import fcntl
+import hashlib
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def chunk_ids(file_path: str, chunk_texts: List[str], seen: Dict[str, int] = None) -> List[str]:
+    """
+    Content-addressed ids for the chunks of a file.
+
+    The id hashes the file path and the chunk text, so an unchanged paragraph
+    keeps its id when text around it is edited. Repeated chunks within a file
+    are told apart by their occurrence number; pass the same ``seen`` dict
+    when a file's chunks are processed in several windows.
+    """
+    ids = []
+    seen = {} if seen is None else seen
+    for text in chunk_texts:
+        digest = hashlib.sha256(f"{file_path}\0{text}".encode("utf-8")).hexdigest()[:32]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return ids
+
+
+class ChunkChanges:
+    """
+    Difference between the indexed chunks of a file and its current chunks.
+
+    A partial change covers one window of a streamed file, starting at chunk
+    position ``start``; it never removes chunks, since the rest of the file
+    is not known yet. With parent-child indexing every chunk carries the id
+    of its parent section, and ``parents`` maps those ids to their text.
+    """
+
+    def __init__(self, file_path: str, chunk_texts: List[str], ids: List[str], previous: Optional[Dict[str, int]],
+                 start: int = 0, partial: bool = False, parent_ids: List[str] = None,
+                 parents: Dict[str, str] = None):
+        self.file_path = str(file_path)
+        self.chunk_texts = chunk_texts
+        self.ids = ids
+        self.parent_ids = parent_ids
+        self.parents = parents or {}
+        # None when nothing is indexed for the file yet
+        self.previous = previous
+        self.start = start
+        self.partial = partial
+
+        old = previous or {}
+        self.added = [i for i, chunk_id in enumerate(ids) if chunk_id not in old]
+        # Kept chunks whose position in the file changed only need new metadata
+        self.moved = [i for i, chunk_id in enumerate(ids) if chunk_id in old and old[chunk_id] != start + i]
+        current = set(ids)
+        self.removed = [] if partial else [chunk_id for chunk_id in old if chunk_id not in current]
+
+    @property
+    def added_texts(self) -> List[str]:
+        return [self.chunk_texts[i] for i in self.added]
+
+    def metadata(self, i: int) -> dict:
+        """Chroma metadata of the i-th chunk."""
+        meta = {"file": self.file_path, "chunk": self.start + i}
+        if self.parent_ids:
+            meta["parent"] = self.parent_ids[i]
+        return meta
+
+    @property
+    def unchanged(self) -> bool:
+        return self.previous is not None and not (self.added or self.moved or self.removed)
+
+
+class ChunkManifest:
+    """
+    Records which chunk ids are indexed for each file (SQLite).
+
+    Used to diff a re-ingested file against what is already in Chroma, so
+    only new chunks are embedded and vanished ones are deleted.
+
+    It also makes a file's Chroma writes all-or-nothing: before writing,
+    ``begin`` records every chunk id the write adds or removes as pending.
+    Pending ids that are not in the committed chunk set must not exist in
+    Chroma, so after a failure or crash deleting them restores the last
+    committed state (see ChromaStorer.recover).
+
+    Several processes may share a manifest. Pending ids are tagged with the
+    owner (manifest instance) that wrote them, and every owner holds a lock
+    on a file under ``manifest-owners/`` for as long as it is open. Only ids
+    of owners whose lock is free, i.e. whose process has exited, are
+    abandoned and safe to roll back.
+    """
+
+    def __init__(self, db_file: Path, collection_name: str = "my_files"):
+        """
+        Initialize the manifest.
+
+        Args:
+            db_file: SQLite file holding the manifest
+            collection_name: Chroma collection the manifest describes
+        """
+        self.db_file = Path(db_file)
+        self.collection_name = collection_name
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False, timeout=30)
+
+        self.owners_dir = self.db_file.parent / "manifest-owners"
+        self.owners_dir.mkdir(exist_ok=True)
+        self.owner = uuid.uuid4().hex
+        self._owner_lock = open(self.owners_dir / f"{self.owner}.lock", "w")
+        fcntl.flock(self._owner_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " collection TEXT NOT NULL, file TEXT NOT NULL, chunk_id TEXT NOT NULL, position INTEGER NOT NULL,"
+                " PRIMARY KEY (collection, file, chunk_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " collection TEXT NOT NULL, file TEXT NOT NULL, chunks INTEGER NOT NULL, indexed_at TEXT NOT NULL,"
+                " PRIMARY KEY (collection, file))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " collection TEXT NOT NULL, file TEXT NOT NULL, chunk_id TEXT NOT NULL,"
+                " owner TEXT NOT NULL DEFAULT '',"
+                " PRIMARY KEY (collection, file, chunk_id))"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pending)")]
+            if "owner" not in columns:
+                # Rows written before owners were recorded count as abandoned
+                self._conn.execute("ALTER TABLE pending ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+
+    def get(self, file_path: str) -> Optional[Dict[str, int]]:
+        """Indexed chunk ids of a file mapped to their position, or None if the file is unknown."""
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM files WHERE collection = ? AND file = ?", (self.collection_name, str(file_path))
+            ).fetchone()
+            if not known:
+                return None
+            rows = self._conn.execute(
+                "SELECT chunk_id, position FROM chunks WHERE collection = ? AND file = ?",
+                (self.collection_name, str(file_path))
+            ).fetchall()
+        return dict(rows)
+
+    def commit(self, file_path: str, ids: List[str]):
+        """Record the file's current chunk ids (in order) in a single transaction."""
+        file_path = str(file_path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ? AND file = ?", (self.collection_name, file_path)
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks (collection, file, chunk_id, position) VALUES (?, ?, ?, ?)",
+                [(self.collection_name, file_path, chunk_id, i) for i, chunk_id in enumerate(ids)]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (collection, file, chunks, indexed_at) VALUES (?, ?, ?, ?)",
+                (self.collection_name, file_path, len(ids), datetime.now().isoformat())
+            )
+
+    def begin(self, file_path: str, ids: List[str]):
+        """Mark chunk ids about to be added or removed for a file as pending (owned by this manifest)."""
+        if not ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending (collection, file, chunk_id, owner) VALUES (?, ?, ?, ?)",
+                [(self.collection_name, str(file_path), chunk_id, self.owner) for chunk_id in ids]
+            )
+
+    def pending(self, file_path: str, owner: str = None) -> List[str]:
+        """Pending ids of a file written by owner (default: this manifest)."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT chunk_id FROM pending WHERE collection = ? AND file = ? AND owner = ?",
+                (self.collection_name, str(file_path), self.owner if owner is None else owner)
+            )]
+
+    def abandoned(self) -> List[Tuple[str, str]]:
+        """(file, owner) pairs with pending ids whose owner has exited."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT file, owner FROM pending WHERE collection = ?", (self.collection_name,)
+            ).fetchall()
+        alive = {}
+        for _, owner in rows:
+            if owner not in alive:
+                alive[owner] = self._is_alive(owner)
+        return [(file_path, owner) for file_path, owner in rows if not alive[owner]]
+
+    def clear_pending(self, file_path: str, owner: str = None):
+        """Forget the pending ids of a file written by owner (default: this manifest)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM pending WHERE collection = ? AND file = ? AND owner = ?",
+                (self.collection_name, str(file_path), self.owner if owner is None else owner)
+            )
+
+    def _is_alive(self, owner: str) -> bool:
+        if not owner:
+            return False
+        if owner == self.owner:
+            return True
+        lock_file = self.owners_dir / f"{owner}.lock"
+        try:
+            with open(lock_file, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        lock_file.unlink(missing_ok=True)
+        return False
+
+    def remove(self, file_path: str):
+        """Forget a file (e.g. after it was deleted at the source)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ? AND file = ?", (self.collection_name, str(file_path))
+            )
+            self._conn.execute(
+                "DELETE FROM files WHERE collection = ? AND file = ?", (self.collection_name, str(file_path))
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+            self._owner_lock.close()
+            (self.owners_dir / f"{self.owner}.lock").unlink(missing_ok=True)
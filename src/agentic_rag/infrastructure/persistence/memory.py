@@ -0,0 +1,80 @@
+import os
+import resource
+import sys
+import threading
+from typing import Optional
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakMemory:
+    """
+    Samples the process RSS in the background while a block runs.
+
+    Usage::
+
+        with PeakMemory() as memory:
+            ingest(file)
+        print(memory.peak_mb)
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "PeakMemory":
+        rss = current_rss()
+        if rss is None:
+            # No /proc: only the lifetime peak is available
+            self.start = self.peak = max_rss()
+            return self
+        self.start = self.peak = rss
+        self._thread = threading.Thread(target=self._sample, name="peak-memory", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample_once()
+        else:
+            self.peak = max(self.peak, max_rss())
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / (1024 * 1024)
+
+    @property
+    def growth_mb(self) -> float:
+        return (self.peak - self.start) / (1024 * 1024)
+
+    def _sample_once(self):
+        rss = current_rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._sample_once()
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+class ParentStore:
+    """
+    Side store for the parent sections of small-to-big retrieval (SQLite).
+
+    Chroma holds small child chunks for vector search and reranking; each
+    child's metadata names its parent section, whose text is kept here
+    (zlib-compressed) and handed to the LLM as context.
+    """
+
+    def __init__(self, db_file: Path, collection_name: str = "my_files"):
+        """
+        Initialize the parent store.
+
+        Args:
+            db_file: SQLite file holding the parent sections
+            collection_name: Chroma collection the parents belong to
+        """
+        self.db_file = Path(db_file)
+        self.collection_name = collection_name
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS parents ("
+                " collection TEXT NOT NULL, id TEXT NOT NULL, file TEXT NOT NULL, text BLOB NOT NULL,"
+                " PRIMARY KEY (collection, id))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS parents_file ON parents (collection, file)")
+
+    def put_many(self, file_path: str, parents: Dict[str, str]):
+        """Store parent sections of a file (id -> text); existing ids are left as they are."""
+        if not parents:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO parents (collection, id, file, text) VALUES (?, ?, ?, ?)",
+                [(self.collection_name, parent_id, str(file_path), zlib.compress(text.encode("utf-8")))
+                 for parent_id, text in parents.items()]
+            )
+
+    def get_many(self, parent_ids: Iterable[str]) -> Dict[str, str]:
+        """Texts of the given parents; unknown ids are missing from the result."""
+        parent_ids = list(dict.fromkeys(parent_ids))
+        found = {}
+        with self._lock:
+            for start in range(0, len(parent_ids), 500):
+                batch = parent_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT id, text FROM parents WHERE collection = ? AND id IN ({placeholders})",
+                    [self.collection_name] + batch
+                ).fetchall()
+                found.update((parent_id, zlib.decompress(text).decode("utf-8")) for parent_id, text in rows)
+        return found
+
+    def retain(self, file_path: str, parent_ids: Iterable[str]):
+        """Delete the parents of a file that are no longer among parent_ids."""
+        keep = set(parent_ids)
+        with self._lock, self._conn:
+            stored = [row[0] for row in self._conn.execute(
+                "SELECT id FROM parents WHERE collection = ? AND file = ?", (self.collection_name, str(file_path))
+            )]
+            stale: List[str] = [parent_id for parent_id in stored if parent_id not in keep]
+            self._conn.executemany(
+                "DELETE FROM parents WHERE collection = ? AND id = ?",
+                [(self.collection_name, parent_id) for parent_id in stale]
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
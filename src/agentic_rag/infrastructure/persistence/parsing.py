@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from agentic_rag.infrastructure.persistence.indexer import FileReader
+
+
+def _parse_file(path: str) -> List:
+    """Worker entry point: parse one file with FileReader."""
+    return FileReader.load(path)
+
+
+def _register_worker(pids):
+    """Worker initializer: report the process id, so a worker stuck on a file can be killed."""
+    pids.put(os.getpid())
+
+
+class ParsingPool:
+    """
+    Parses documents in a pool of worker processes.
+
+    Exposes the same ``load(path)`` interface as FileReader, so it can be
+    passed to ChromaStorer as its reader. Each file gets a timeout; a file
+    that hangs or crashes its worker fails on its own, and the pool is
+    rebuilt for the files that follow.
+    """
+
+    def __init__(self, workers: int = None, timeout: float = 300.0, max_tasks_per_child: int = 50):
+        """
+        Initialize the parsing pool.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+            timeout: Seconds a single file may take before it is abandoned
+            max_tasks_per_child: Files parsed before a worker is replaced (caps leaks)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor = None
+        # spawn: forking a process that already runs threads (API, watchers) is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._worker_pids = self._context.SimpleQueue()
+        self._pids = set()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_register_worker,
+                initargs=(self._worker_pids,),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._executor
+
+    def _submit(self, path: str):
+        """Submit a file to the pool, replacing the pool if a crashed worker broke it."""
+        try:
+            return self._pool().submit(_parse_file, path)
+        except BrokenProcessPool:
+            self._recycle()
+            return self._pool().submit(_parse_file, path)
+
+    def _recycle(self):
+        """Kill all workers (e.g. one is stuck on a file) and start over on next use."""
+        if self._executor is None:
+            return
+        while not self._worker_pids.empty():
+            self._pids.add(self._worker_pids.get())
+        # Workers replaced after max_tasks_per_child have exited and are no longer children
+        for process in multiprocessing.active_children():
+            if process.pid in self._pids:
+                process.kill()
+        self._pids.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def load(self, path: str) -> List:
+        """Parse a single file in a worker process; raises if it fails, times out or crashes its worker."""
+        for _, docs in self.load_many([path]):
+            if isinstance(docs, Exception):
+                raise docs
+            return docs
+        return []
+
+    def load_many(self, paths: Iterable[str]) -> Iterator[Tuple[str, Union[List, Exception]]]:
+        """
+        Parse files in parallel, yielding (path, documents) as each finishes.
+
+        Files that fail, time out or crash their worker yield their exception
+        instead of documents, so the caller can retry them.
+        """
+        queue = [(str(p), 0) for p in paths]
+        queue.reverse()
+        in_flight = {}  # future -> (path, deadline, attempts, executor)
+
+        def submit(path: str, attempts: int):
+            future = self._submit(path)
+            in_flight[future] = (path, time.monotonic() + self.timeout, attempts, self._executor)
+
+        while queue or in_flight:
+            # Keep at most one file per worker in flight so deadlines measure parse time
+            while queue and len(in_flight) < self.workers:
+                submit(*queue.pop())
+
+            next_deadline = min(deadline for _, deadline, _, _ in in_flight.values())
+            done, _ = wait(in_flight, timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+
+            if not done:
+                now = time.monotonic()
+                expired = []
+                for future, (path, deadline, attempts, _) in list(in_flight.items()):
+                    if deadline <= now:
+                        print(f"[WARN] Parsing {path} exceeded {self.timeout}s, abandoning it")
+                        expired.append(path)
+                    else:
+                        # Shared the pool with the stuck file: parse it again on a fresh pool
+                        queue.append((path, attempts))
+                in_flight.clear()
+                # Before yielding: a caller that raises on the timeout never resumes this generator
+                self._recycle()
+                for path in expired:
+                    yield path, TimeoutError(f"Parsing {path} exceeded {self.timeout}s")
+                continue
+
+            for future in done:
+                path, _, attempts, executor = in_flight.pop(future)
+                try:
+                    docs = future.result()
+                except BrokenProcessPool:
+                    # A worker died and the pool takes no more work. The culprit is unknown,
+                    # so every affected file is retried once and fails if it breaks a pool again
+                    if executor is self._executor:
+                        self._recycle()
+                    if attempts == 0:
+                        queue.append((path, attempts + 1))
+                        continue
+                    print(f"[WARN] Parsing {path} crashed its worker")
+                    docs = BrokenProcessPool(f"Parsing {path} crashed its worker")
+                except Exception as e:
+                    print(f"[WARN] Could not load {path}: {e}")
+                    docs = e
+                yield path, docs
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
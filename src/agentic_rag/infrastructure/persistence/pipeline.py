@@ -0,0 +1,280 @@
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from agentic_rag.infrastructure.persistence.indexer import ChromaStorer
+
+
+_STOP = object()
+
+
+class IngestionJob:
+    """A file travelling through the ingestion pipeline."""
+
+    def __init__(self, file_path: str):
+        self.id = uuid.uuid4().hex
+        self.file_path = str(file_path)
+        self.status = "queued"  # queued, parsing, chunking, embedding, upserting, indexed, skipped, failed
+        self.error: Optional[str] = None
+        self.chunks = 0
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+        self.future = Future()
+
+    def set_status(self, status: str):
+        self.status = status
+        self.updated_at = datetime.now().isoformat()
+
+    def finish(self, status: str = "indexed"):
+        self.set_status(status)
+        self.future.set_result(self)
+
+    def fail(self, error: Exception):
+        self.error = str(error)
+        self.set_status("failed")
+        self.future.set_exception(error)
+
+    def result(self, timeout: float = None) -> "IngestionJob":
+        """Wait for the job to leave the pipeline; re-raises its error if it failed."""
+        return self.future.result(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "file": self.file_path,
+            "status": self.status,
+            "chunks": self.chunks,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class StageMetrics:
+    """Throughput and utilisation counters for one pipeline stage."""
+
+    def __init__(self, name: str, workers: int, input_queue: queue.Queue):
+        self.name = name
+        self.workers = workers
+        self.input_queue = input_queue
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, failed: bool = False):
+        with self._lock:
+            self.busy_seconds += seconds
+            if failed:
+                self.failed += 1
+            else:
+                self.processed += 1
+
+    def snapshot(self) -> dict:
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "processed": self.processed,
+                "failed": self.failed,
+                "throughput_per_s": self.processed / uptime,
+                "utilization": self.busy_seconds / (uptime * self.workers),
+                "queue_depth": self.input_queue.qsize(),
+                "queue_capacity": self.input_queue.maxsize,
+            }
+
+
+class IngestionPipeline:
+    """
+    Streams files through parse -> chunk -> embed -> upsert stages.
+
+    Each stage runs its own worker threads and hands work to the next stage
+    through a bounded queue, so parsing, embedding and Chroma writes overlap
+    instead of running back to back per file. When a downstream stage falls
+    behind its queue fills up and ``submit`` blocks (backpressure).
+
+    Jobs for the same file path run one after another: a job diffs the file
+    against the manifest in the embed stage, so a second version may only
+    start once the first has committed, or its diff would miss (or keep)
+    the chunks the first one writes.
+    """
+
+    STAGES = ("parse", "chunk", "embed", "upsert")
+    STATUSES = {"parse": "parsing", "chunk": "chunking", "embed": "embedding", "upsert": "upserting"}
+
+    def __init__(self, storer: ChromaStorer, stage_workers: Dict[str, int] = None, queue_size: int = 8):
+        """
+        Initialize the pipeline.
+
+        Args:
+            storer: ChromaStorer providing the load/chunk/embed/upsert steps
+            stage_workers: Worker threads per stage, e.g. {"parse": 4}; unspecified stages get 1.
+                Parse workers only add real parallelism when the storer reads via a ParsingPool.
+            queue_size: Capacity of the queue in front of each stage
+        """
+        self.storer = storer
+        self.stage_workers = {stage: 1 for stage in self.STAGES}
+        self.stage_workers.update(stage_workers or {})
+        self.queues = {stage: queue.Queue(maxsize=queue_size) for stage in self.STAGES}
+        self.metrics_by_stage = {
+            stage: StageMetrics(stage, self.stage_workers[stage], self.queues[stage]) for stage in self.STAGES
+        }
+        self.handlers = {
+            "parse": self._parse,
+            "chunk": self._chunk,
+            "embed": self._embed,
+            "upsert": self._upsert,
+        }
+        self._threads: List[threading.Thread] = []
+        self._running = {stage: 0 for stage in self.STAGES}
+        self._lock = threading.Lock()
+        # File path -> jobs for it waiting for the one in the pipeline to finish
+        self._in_flight: Dict[str, deque] = {}
+        self._drained = threading.Condition(self._lock)
+        self._started = False
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        for stage in self.STAGES:
+            for i in range(self.stage_workers[stage]):
+                thread = threading.Thread(target=self._work, args=(stage,), name=f"ingest-{stage}-{i}", daemon=True)
+                self._running[stage] += 1
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, file_path: str, job: IngestionJob = None) -> IngestionJob:
+        """
+        Queue a file for ingestion; blocks while the parse queue is full.
+
+        While an earlier job for the same path is still in the pipeline the
+        new job stays queued without blocking, and enters once it finishes.
+        """
+        self.start()
+        job = job or IngestionJob(file_path)
+        with self._lock:
+            waiting = self._in_flight.get(job.file_path)
+            if waiting is not None:
+                waiting.append(job)
+                return job
+            self._in_flight[job.file_path] = deque()
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: IngestionJob):
+        job.future.add_done_callback(lambda _: self._release(job.file_path))
+        self.queues["parse"].put((job, None))
+
+    def _release(self, file_path: str):
+        """Let the next waiting job for file_path in once the current one has finished."""
+        with self._lock:
+            waiting = self._in_flight[file_path]
+            if not waiting:
+                del self._in_flight[file_path]
+                self._drained.notify_all()
+                return
+            job = waiting.popleft()
+        # Runs on a stage worker, which must not block on a full parse queue
+        threading.Thread(target=self._enqueue, args=(job,), name="ingest-release", daemon=True).start()
+
+    def close(self):
+        """Let queued work drain, then stop all workers."""
+        if not self._started:
+            return
+        with self._drained:
+            # Jobs waiting behind an earlier version of their file still have to enter
+            self._drained.wait_for(lambda: not self._in_flight)
+        for _ in range(self.stage_workers["parse"]):
+            self.queues["parse"].put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._started = False
+        self._threads = []
+
+    def metrics(self) -> dict:
+        return {stage: self.metrics_by_stage[stage].snapshot() for stage in self.STAGES}
+
+    def _work(self, stage: str):
+        index = self.STAGES.index(stage)
+        next_stage = self.STAGES[index + 1] if index + 1 < len(self.STAGES) else None
+        handler = self.handlers[stage]
+        metrics = self.metrics_by_stage[stage]
+
+        while True:
+            item = self.queues[stage].get()
+            if item is _STOP:
+                break
+            job, payload = item
+            job.set_status(self.STATUSES[stage])
+            started = time.monotonic()
+            try:
+                output = handler(job, payload)
+            except Exception as e:
+                metrics.record(time.monotonic() - started, failed=True)
+                print(f"[Pipeline] {stage} failed for {job.file_path}: {e}")
+                job.fail(e)
+                continue
+            metrics.record(time.monotonic() - started)
+
+            if output is None:
+                continue  # job finished early (nothing to index)
+            if next_stage:
+                self.queues[next_stage].put((job, output))
+
+        # The last worker of a stage passes the shutdown on to the next stage
+        with self._lock:
+            self._running[stage] -= 1
+            last = self._running[stage] == 0
+        if last and next_stage:
+            for _ in range(self.stage_workers[next_stage]):
+                self.queues[next_stage].put(_STOP)
+
+    def _parse(self, job: IngestionJob, _):
+        if self.storer.should_stream(job.file_path):
+            # Too large to hand between stages whole: stream it in windows right here
+            self.storer.store_file(job.file_path)
+            job.finish("indexed")
+            return None
+        docs = self.storer.load(job.file_path)
+        if not docs:
+            print(f"[SKIP] No documents extracted from {job.file_path}")
+            job.finish("skipped")
+            return None
+        return docs
+
+    def _chunk(self, job: IngestionJob, docs):
+        chunks = self.storer.chunk(docs, job.file_path)
+        if not chunks:
+            print(f"[SKIP] No chunks created from {job.file_path}")
+            job.finish("skipped")
+            return None
+        job.chunks = len(chunks)
+        return chunks
+
+    def _embed(self, job: IngestionJob, chunks):
+        changes = self.storer.diff(job.file_path, chunks)
+        if changes.unchanged:
+            print(f"[SKIP] {job.file_path} is unchanged")
+            job.finish("skipped")
+            return None
+        if not changes.added:
+            return changes, []
+        if self.storer.batcher:
+            # Don't wait for the vectors: the next file's chunks can join the same batch
+            return changes, self.storer.submit_embed(changes.added_texts)
+        return changes, self.storer.embed(changes.added_texts, show_progress_bar=False)
+
+    def _upsert(self, job: IngestionJob, payload):
+        changes, embeddings = payload
+        if isinstance(embeddings, Future):
+            embeddings = embeddings.result()
+        self.storer.upsert(changes, embeddings)
+        job.finish("indexed")
+        return job
@@ -15,3 +15,53 @@ def test_config_dir(project_root):
     """Return the test config directory"""
     return project_root / "config"
 
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection (get/upsert/update/delete)."""
+
+    def __init__(self):
+        self.records = {}
+
+    def get(self, ids=None, where=None, include=None):
+        matches = [
+            chunk_id for chunk_id, record in self.records.items()
+            if (ids is None or chunk_id in ids)
+            and all(record["metadata"].get(key) == value for key, value in (where or {}).items())
+        ]
+        return {"ids": matches, "metadatas": [self.records[chunk_id]["metadata"] for chunk_id in matches]}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        for chunk_id, document, embedding, metadata in zip(ids, documents, embeddings, metadatas):
+            self.records[chunk_id] = {"document": document, "embedding": embedding, "metadata": dict(metadata)}
+
+    def update(self, ids, metadatas):
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.records[chunk_id]["metadata"] = dict(metadata)
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.records.pop(chunk_id, None)
+
+
+class FakeEmbedder:
+    """Deterministic embedder: one small vector per text, counting the texts it encodes."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, show_progress_bar=False):
+        import numpy as np
+
+        self.encoded += len(texts)
+        return np.array([[float(len(text)), float(sum(map(ord, text)) % 997)] for text in texts])
+
+
+@pytest.fixture
+def collection():
+    return FakeCollection()
+
+
+@pytest.fixture
+def embedder():
+    return FakeEmbedder()
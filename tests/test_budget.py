@@ -0,0 +1,56 @@
+"""Tests for the per-request latency budget"""
+
+import time
+
+from agentic_rag.domain.budget import DEFAULT_STAGE_RESERVES, LatencyBudget
+
+
+def test_unlimited_budget_allows_everything():
+    budget = LatencyBudget()
+
+    assert not budget.is_limited
+    assert budget.remaining() == float("inf")
+    assert budget.timeout() is None
+    assert budget.allows("expansion", "retrieval", "rerank", "verification", "generation")
+    assert budget.fraction_of("generation") == 1.0
+
+
+def test_allows_checks_stage_and_following_reserves():
+    budget = LatencyBudget(5.0, {"verification": 2.0, "generation": 2.0})
+
+    assert budget.allows("verification", "generation")
+    assert not budget.allows("expansion", "verification", "generation")
+
+
+def test_stage_reserves_override_defaults():
+    budget = LatencyBudget(1.0, {"generation": 0.5})
+
+    assert budget.reserve("generation") == 0.5
+    assert budget.reserve("verification") == DEFAULT_STAGE_RESERVES["verification"]
+
+
+def test_remaining_and_timeout_shrink_and_stop_at_zero():
+    budget = LatencyBudget(0.05)
+    assert 0 < budget.timeout() <= 0.05
+
+    time.sleep(0.06)
+    assert budget.remaining() == 0.0
+    assert budget.timeout() == 0.0
+    assert not budget.allows("generation")
+
+
+def test_fraction_of_is_capped():
+    budget = LatencyBudget(1.5, {"generation": 3.0})
+    assert 0.4 < budget.fraction_of("generation") <= 0.5
+
+    assert LatencyBudget(10.0, {"generation": 3.0}).fraction_of("generation") == 1.0
+    assert LatencyBudget(1.0, {"generation": 0.0}).fraction_of("generation") == 1.0
+
+
+def test_degradations_are_recorded_once_in_order():
+    budget = LatencyBudget(1.0)
+    budget.degrade("skipped_expansion")
+    budget.degrade("reduced_max_tokens")
+    budget.degrade("skipped_expansion")
+
+    assert budget.degradations == ["skipped_expansion", "reduced_max_tokens"]
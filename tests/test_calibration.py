@@ -0,0 +1,88 @@
+"""Tests for the isotonic fit and the online verification-threshold calibrator"""
+
+import pytest
+
+from agentic_rag.application.calibration import ThresholdCalibrator, isotonic_fit
+
+
+def test_isotonic_fit_pools_violators():
+    samples = [(0.1, False), (0.2, True), (0.3, False), (0.4, True)]
+
+    assert isotonic_fit(samples) == [(0.1, 0.0), (0.3, 0.5), (0.4, 1.0)]
+
+
+def test_isotonic_fit_is_non_decreasing():
+    samples = [(score / 20, (score * 7) % 3 == 0) for score in range(20)]
+    probabilities = [probability for _, probability in isotonic_fit(samples)]
+
+    assert probabilities == sorted(probabilities)
+    assert all(0.0 <= p <= 1.0 for p in probabilities)
+
+
+def test_isotonic_fit_of_ordered_labels_keeps_every_sample():
+    samples = [(0.9, True), (0.1, False), (0.8, True), (0.2, False)]
+
+    assert isotonic_fit(samples) == [(0.1, 0.0), (0.2, 0.0), (0.8, 1.0), (0.9, 1.0)]
+
+
+def test_isotonic_fit_of_no_samples():
+    assert isotonic_fit([]) == []
+
+
+@pytest.fixture
+def make_calibrator(tmp_path):
+    def make(**kwargs):
+        options = dict(storage_file=tmp_path / "calibration.json", min_samples=10, min_outcomes=10,
+                       refit_every=1000, exploration_rate=0.0)
+        options.update(kwargs)
+        return ThresholdCalibrator(**options)
+
+    return make
+
+
+def test_threshold_follows_target_invocation_rate(make_calibrator):
+    calibrator = make_calibrator(target_invocation_rate=0.3)
+    for i in range(100):
+        calibrator.record_score(i / 100)
+    calibrator.fit()
+
+    assert calibrator.threshold == pytest.approx(0.3)
+    assert calibrator.stats()["invocation_rate"] == pytest.approx(0.3)
+
+
+def test_threshold_meets_target_precision(make_calibrator):
+    calibrator = make_calibrator(target_invocation_rate=None, target_precision=0.9)
+    for i in range(100):
+        score = i / 100
+        calibrator.record_score(score)
+        calibrator.record_outcome(score, score >= 0.5)
+    calibrator.fit()
+
+    # The precision target is met on average over the unverified tail:
+    # 50 relevant of the 55 queries scoring 0.45 or more
+    assert calibrator.threshold == pytest.approx(0.45)
+    assert calibrator.probability(0.7) == 1.0
+    assert calibrator.probability(0.2) == 0.0
+
+
+def test_too_few_samples_keep_initial_threshold(make_calibrator):
+    calibrator = make_calibrator(initial_threshold=0.4)
+    for i in range(5):
+        calibrator.record_score(i / 10)
+    calibrator.fit()
+
+    assert calibrator.threshold == 0.4
+    assert calibrator.probability(0.5) is None
+
+
+def test_state_is_reloaded(make_calibrator):
+    calibrator = make_calibrator(target_invocation_rate=0.5)
+    for i in range(20):
+        calibrator.record_score(i / 20)
+        calibrator.record_outcome(i / 20, i >= 10)
+    calibrator.fit()
+
+    reloaded = make_calibrator(target_invocation_rate=0.5)
+    assert reloaded.threshold == calibrator.threshold
+    assert reloaded.calibration == calibrator.calibration
+    assert len(reloaded.scores) == 20
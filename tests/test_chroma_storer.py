@@ -0,0 +1,66 @@
+"""Tests for ChromaStorer: incremental re-ingestion and step reporting"""
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from agentic_rag.infrastructure.persistence.indexer import ChromaStorer
+from agentic_rag.infrastructure.persistence.manifest import ChunkManifest
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    chunk_manifest = ChunkManifest(tmp_path / "manifest.sqlite3")
+    yield chunk_manifest
+    chunk_manifest.close()
+
+
+@pytest.fixture
+def storer(collection, embedder, manifest):
+    chunk_storer = ChromaStorer(collection, embedder, chunk_size=50, overlap=0, manifest=manifest)
+    yield chunk_storer
+    chunk_storer.writer.close()
+
+
+def write_paragraphs(path, *paragraphs):
+    path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+
+def test_store_file_reports_each_step(tmp_path, storer):
+    path = tmp_path / "notes.txt"
+    write_paragraphs(path, "first paragraph of text", "second paragraph of text")
+    statuses = []
+
+    assert storer.store_file(str(path), on_status=statuses.append)
+    assert statuses == ["parsing", "chunking", "embedding", "upserting"]
+
+
+def test_unchanged_file_is_skipped_before_upserting(tmp_path, storer):
+    path = tmp_path / "notes.txt"
+    write_paragraphs(path, "first paragraph of text", "second paragraph of text")
+    storer.store_file(str(path))
+    statuses = []
+
+    assert not storer.store_file(str(path), on_status=statuses.append)
+    assert statuses == ["parsing", "chunking", "embedding"]
+
+
+def test_edited_file_only_embeds_new_chunks(tmp_path, storer, collection, embedder, manifest):
+    path = tmp_path / "notes.txt"
+    paragraphs = [f"paragraph number {i} with some words in it" for i in range(3)]
+    write_paragraphs(path, *paragraphs)
+    storer.store_file(str(path))
+    assert embedder.encoded == 3
+    first_ids = set(manifest.get(str(path)))
+
+    write_paragraphs(path, paragraphs[0], "a brand new paragraph with other words", paragraphs[2])
+    storer.store_file(str(path))
+
+    # One chunk is embedded, the vanished one is deleted, the rest keep their ids
+    assert embedder.encoded == 4
+    current = manifest.get(str(path))
+    assert len(current) == 3
+    assert len(first_ids & set(current)) == 2
+    assert set(collection.records) == set(current)
+    positions = sorted(collection.records[chunk_id]["metadata"]["chunk"] for chunk_id in current)
+    assert positions == [0, 1, 2]
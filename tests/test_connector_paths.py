@@ -0,0 +1,43 @@
+"""Tests for mapping remote file names and paths to local ones"""
+
+from pathlib import Path
+
+import pytest
+
+from agentic_rag.infrastructure.connectors.paths import safe_name, safe_relative_path
+
+
+@pytest.mark.parametrize("remote, local", [
+    ("Reports/2024/q1.pdf", Path("Reports", "2024", "q1.pdf")),
+    ("/sites/team/Shared Documents/a.docx", Path("sites", "team", "Shared Documents", "a.docx")),
+    ("folder\\sub\\b.txt", Path("folder", "sub", "b.txt")),
+    ("a//./b.txt", Path("a", "b.txt")),
+    (" padded / name.txt ", Path("padded", "name.txt")),
+])
+def test_remote_paths_map_to_relative_paths(remote, local):
+    assert safe_relative_path(remote) == local
+
+
+@pytest.mark.parametrize("remote", ["../../etc/passwd", "/../secret.txt", "a/../../b.txt", "..\\..\\c.txt"])
+def test_paths_never_leave_the_download_directory(tmp_path, remote):
+    local = (tmp_path / safe_relative_path(remote)).resolve()
+
+    assert not safe_relative_path(remote).is_absolute()
+    assert local.is_relative_to(tmp_path.resolve())
+
+
+@pytest.mark.parametrize("remote", ["", "/", "..", "./..", " / "])
+def test_path_without_file_name_is_rejected(remote):
+    with pytest.raises(ValueError):
+        safe_relative_path(remote)
+
+
+@pytest.mark.parametrize("name, local", [
+    ("report.pdf", "report.pdf"),
+    ("a/b\\c.txt", "a_b_c.txt"),
+    ("..", "_"),
+    (".", "_"),
+    ("  ", "_"),
+])
+def test_safe_name_is_a_single_component(name, local):
+    assert safe_name(name) == local
@@ -0,0 +1,41 @@
+"""Tests for ConnectorRuntime start-up and shutdown"""
+
+import asyncio
+
+import pytest
+
+for module in ("chromadb", "sentence_transformers"):
+    pytest.importorskip(module)
+
+from agentic_rag.infrastructure.connectors.runtime import ConnectorRuntime
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+def test_stop_closes_a_runtime_that_never_ran():
+    processor = FakeProcessor()
+    runtime = ConnectorRuntime(processor)
+
+    runtime.stop()
+    runtime.stop()
+
+    assert processor.closed == 1
+    # A closed runtime does not start polling
+    asyncio.run(runtime.run())
+    assert processor.closed == 1
+
+
+def test_run_closes_on_exit_and_later_stop_is_harmless():
+    processor = FakeProcessor()
+    runtime = ConnectorRuntime(processor)
+
+    asyncio.run(runtime.run())
+    runtime.stop()
+
+    assert processor.closed == 1
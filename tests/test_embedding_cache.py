@@ -0,0 +1,79 @@
+"""Tests for the on-disk embedding cache: lookups, LRU eviction and read-only hits"""
+
+import time
+
+import pytest
+
+from agentic_rag.infrastructure.persistence.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = EmbeddingCache("test-model", cache_dir=tmp_path, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_hits_and_misses(make_cache):
+    cache = make_cache()
+    cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    assert cache.get_many(["a", "c", "b"]) == [[1.0, 2.0], None, [3.0, 4.0]]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_lookups_do_not_write_the_index(make_cache):
+    cache = make_cache()
+    cache.put_many(["a"], [[1.0, 2.0]])
+    changes = cache._conn.total_changes
+
+    for _ in range(10):
+        cache.get_many(["a"])
+
+    assert cache._conn.total_changes == changes
+
+
+def test_access_times_are_written_in_batches(make_cache):
+    cache = make_cache()
+    cache.TOUCH_BATCH = 2
+    cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    changes = cache._conn.total_changes
+
+    cache.get_many(["a"])
+    assert cache._conn.total_changes == changes
+    cache.get_many(["b"])
+    assert cache._conn.total_changes == changes + 2
+
+
+def test_eviction_sees_deferred_hits(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.put_many(["a"], [[1.0, 2.0]])
+    time.sleep(0.01)
+    cache.put_many(["b"], [[3.0, 4.0]])
+    time.sleep(0.01)
+    # "a" is now the most recently used, though only in memory so far
+    cache.get_many(["a"])
+
+    cache.put_many(["c"], [[5.0, 6.0]])
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0, 2.0], None, [5.0, 6.0]]
+
+
+def test_access_times_survive_close(tmp_path, make_cache):
+    cache = make_cache()
+    cache.put_many(["a"], [[1.0, 2.0]])
+    stored = cache._conn.execute("SELECT last_used FROM entries").fetchone()[0]
+    time.sleep(0.01)
+    cache.get_many(["a"])
+    cache.close()
+
+    reopened = make_cache()
+    assert reopened._conn.execute("SELECT last_used FROM entries").fetchone()[0] > stored
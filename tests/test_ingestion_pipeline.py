@@ -0,0 +1,95 @@
+"""Tests for IngestionPipeline: stage hand-over and per-file ordering"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from agentic_rag.infrastructure.persistence.pipeline import IngestionPipeline
+
+
+class FakeChanges:
+    unchanged = False
+    added_texts = ["text"]
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.added = [0]
+
+
+class RecordingStorer:
+    """Storer steps that log when each file is diffed and committed."""
+
+    batcher = None
+
+    def __init__(self, upsert_delay=0.0):
+        self.upsert_delay = upsert_delay
+        self.events = []
+        self._lock = threading.Lock()
+
+    def log(self, event, file_path):
+        with self._lock:
+            self.events.append((event, file_path))
+
+    def should_stream(self, file_path):
+        return False
+
+    def load(self, file_path):
+        return ["doc"]
+
+    def chunk(self, docs, file_path=""):
+        return ["chunk"]
+
+    def diff(self, file_path, chunks):
+        self.log("diff", file_path)
+        return FakeChanges(file_path)
+
+    def embed(self, texts, show_progress_bar=True):
+        return [[0.0] for _ in texts]
+
+    def upsert(self, changes, embeddings):
+        time.sleep(self.upsert_delay)
+        self.log("commit", changes.file_path)
+
+
+def test_versions_of_one_file_run_one_after_another():
+    storer = RecordingStorer(upsert_delay=0.1)
+    pipeline = IngestionPipeline(storer, {"parse": 2, "embed": 2}, queue_size=4)
+    try:
+        jobs = [pipeline.submit("a.txt") for _ in range(3)]
+        for job in jobs:
+            job.result(5)
+    finally:
+        pipeline.close()
+
+    # Every diff sees the manifest of the previous version
+    assert storer.events == [("diff", "a.txt"), ("commit", "a.txt")] * 3
+    assert [job.status for job in jobs] == ["indexed"] * 3
+
+
+def test_other_files_are_not_held_up():
+    storer = RecordingStorer(upsert_delay=0.2)
+    pipeline = IngestionPipeline(storer, {"parse": 2, "embed": 2, "upsert": 2}, queue_size=4)
+    try:
+        first = pipeline.submit("a.txt")
+        second = pipeline.submit("b.txt")
+        started = time.monotonic()
+        first.result(5)
+        second.result(5)
+        elapsed = time.monotonic() - started
+    finally:
+        pipeline.close()
+
+    assert elapsed < 0.35
+
+
+def test_close_waits_for_waiting_versions():
+    storer = RecordingStorer(upsert_delay=0.05)
+    pipeline = IngestionPipeline(storer, queue_size=4)
+    jobs = [pipeline.submit("a.txt") for _ in range(2)]
+    pipeline.close()
+
+    assert all(job.future.done() for job in jobs)
+    assert storer.events.count(("commit", "a.txt")) == 2
@@ -0,0 +1,169 @@
+"""Tests for the durable ingestion queue: retries, dead letters and requeueing"""
+
+import pytest
+
+from agentic_rag.infrastructure.connectors.dispatcher import WorkerDispatcher
+from agentic_rag.infrastructure.connectors.job_queue import IngestionQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    jobs = IngestionQueue(tmp_path / "queue.sqlite3", source="test", max_attempts=3, backoff=0.0)
+    yield jobs
+    jobs.close()
+
+
+@pytest.fixture
+def dispatcher():
+    workers = WorkerDispatcher(workers=2)
+    yield workers
+    workers.close()
+
+
+def run_until_idle(queue, dispatcher, run, rounds=10):
+    """Dispatch due jobs and report them until nothing is left to run."""
+    for _ in range(rounds):
+        if not queue.dispatch(dispatcher, run):
+            return
+        dispatcher.wait()
+
+
+def test_successful_job_leaves_the_queue(queue, dispatcher):
+    processed = []
+    queue.enqueue("a.txt", {"path": "a.txt"}, version="1")
+
+    run_until_idle(queue, dispatcher, lambda payload: processed.append(payload["path"]))
+
+    assert processed == ["a.txt"]
+    assert queue.stats() == {"queued": 0, "retrying": 0, "running": 0, "dead_letters": 0}
+
+
+def test_failing_job_is_retried_then_dead_lettered(queue, dispatcher):
+    attempts = []
+
+    def run(payload):
+        attempts.append(payload["path"])
+        raise RuntimeError("parser unavailable")
+
+    queue.enqueue("a.txt", {"path": "a.txt"}, file_name="a.txt", version="1")
+    run_until_idle(queue, dispatcher, run)
+
+    assert attempts == ["a.txt"] * 3
+    assert queue.stats()["dead_letters"] == 1
+    [letter] = queue.dead_letters()
+    assert letter["file_key"] == "a.txt"
+    assert letter["attempts"] == 3
+    assert "parser unavailable" in letter["last_error"]
+
+
+def test_transient_failure_succeeds_on_retry(queue, dispatcher):
+    attempts = []
+
+    def run(payload):
+        attempts.append(payload["path"])
+        if len(attempts) == 1:
+            raise RuntimeError("temporarily unavailable")
+
+    queue.enqueue("a.txt", {"path": "a.txt"}, version="1")
+    run_until_idle(queue, dispatcher, run)
+
+    assert len(attempts) == 2
+    assert queue.stats() == {"queued": 0, "retrying": 0, "running": 0, "dead_letters": 0}
+
+
+def test_retry_is_delayed_by_backoff(tmp_path, dispatcher):
+    queue = IngestionQueue(tmp_path / "queue.sqlite3", source="test", max_attempts=3, backoff=60.0)
+    attempts = []
+
+    def run(payload):
+        attempts.append(payload["path"])
+        raise RuntimeError("down")
+
+    queue.enqueue("a.txt", {"path": "a.txt"}, version="1")
+    run_until_idle(queue, dispatcher, run)
+
+    assert len(attempts) == 1
+    assert queue.stats()["retrying"] == 1
+    queue.close()
+
+
+def test_requeue_gives_dead_letter_fresh_attempts(queue, dispatcher):
+    failing = [True]
+
+    def run(payload):
+        if failing[0]:
+            raise RuntimeError("down")
+
+    queue.enqueue("a.txt", {"path": "a.txt"}, version="1")
+    run_until_idle(queue, dispatcher, run)
+    [letter] = queue.dead_letters()
+
+    failing[0] = False
+    assert queue.requeue(letter["id"])
+    assert queue.stats()["queued"] == 1
+    run_until_idle(queue, dispatcher, run)
+
+    assert queue.stats() == {"queued": 0, "retrying": 0, "running": 0, "dead_letters": 0}
+    assert not queue.requeue(letter["id"])
+
+
+def test_new_version_replaces_dead_letter(queue, dispatcher):
+    def run(payload):
+        raise RuntimeError("down")
+
+    queue.enqueue("a.txt", {"path": "a.txt"}, version="1")
+    run_until_idle(queue, dispatcher, run)
+    assert queue.stats()["dead_letters"] == 1
+
+    assert queue.enqueue("a.txt", {"path": "a.txt"}, version="2")
+    assert not queue.enqueue("a.txt", {"path": "a.txt"}, version="2")
+    assert queue.stats()["dead_letters"] == 0
+    assert queue.stats()["queued"] == 1
+
+
+def test_running_jobs_are_requeued_on_restart(tmp_path):
+    queue = IngestionQueue(tmp_path / "queue.sqlite3", source="test")
+    queue.enqueue("a.txt", {"path": "a.txt"}, version="1")
+    queue._conn.execute("UPDATE jobs SET status = 'running'")
+    queue._conn.commit()
+    queue.close()
+
+    restarted = IngestionQueue(tmp_path / "queue.sqlite3", source="test")
+    assert restarted.stats()["queued"] == 1
+    restarted.close()
+
+
+def test_failing_parse_is_retried_then_dead_lettered(tmp_path, queue, dispatcher):
+    pytest.importorskip("langchain_community")
+    from agentic_rag.infrastructure.persistence.indexer import ChromaStorer
+
+    # Not valid UTF-8, so the text loader fails
+    broken = tmp_path / "broken.txt"
+    broken.write_bytes(b"\xff\xfe\xfa not text")
+    storer = ChromaStorer(collection=None, embedder=None)
+
+    queue.enqueue(str(broken), {"path": str(broken)}, version="1")
+    run_until_idle(queue, dispatcher, lambda payload: storer.store_file(payload["path"]))
+
+    [letter] = queue.dead_letters()
+    assert letter["attempts"] == 3
+    assert queue.stats()["queued"] == 0
+
+
+def test_parsing_pool_raises_on_failed_parse(tmp_path):
+    pytest.importorskip("langchain_community")
+    from agentic_rag.infrastructure.persistence.parsing import ParsingPool
+
+    broken = tmp_path / "broken.txt"
+    broken.write_bytes(b"\xff\xfe\xfa not text")
+    unsupported = tmp_path / "data.bin"
+    unsupported.write_bytes(b"\x00")
+
+    pool = ParsingPool(workers=1, timeout=120)
+    try:
+        with pytest.raises(Exception):
+            pool.load(str(broken))
+        # Unsupported types are still skipped rather than failed
+        assert pool.load(str(unsupported)) == []
+    finally:
+        pool.close()
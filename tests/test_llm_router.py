@@ -0,0 +1,188 @@
+"""Tests for LLMRouter hedging, failover and attempt accounting"""
+
+import threading
+import time
+
+import pytest
+
+from agentic_rag.infrastructure.llm.router import LLMRouter
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+ENDPOINTS = [{"name": "primary"}, {"name": "fallback"}]
+
+
+def wait_for_idle(router, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while router.metrics()["active_attempts"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return router.metrics()["active_attempts"]
+
+
+def test_single_endpoint_success():
+    router = LLMRouter([{"name": "primary"}])
+    assert router.call(lambda endpoint: endpoint["name"]) == "primary"
+
+    metrics = router.metrics()
+    assert metrics["requests"] == 1
+    assert metrics["hedged"] == 0
+    assert metrics["endpoints"][0]["wins"] == 1
+    assert wait_for_idle(router) == 0
+
+
+def test_retryable_error_fails_over():
+    def request(endpoint):
+        if endpoint["name"] == "primary":
+            raise StatusError(503)
+        return endpoint["name"]
+
+    router = LLMRouter(ENDPOINTS, hedge_enabled=False)
+    assert router.call(request) == "fallback"
+
+    metrics = router.metrics()
+    assert metrics["fallbacks"] == 1
+    assert metrics["failed"] == 0
+    assert metrics["endpoints"][0]["failures"] == 1
+    assert metrics["endpoints"][1]["wins"] == 1
+
+
+def test_non_retryable_error_is_raised_without_failover():
+    calls = []
+
+    def request(endpoint):
+        calls.append(endpoint["name"])
+        raise StatusError(400)
+
+    router = LLMRouter(ENDPOINTS, hedge_enabled=False)
+    with pytest.raises(StatusError):
+        router.call(request)
+
+    assert calls == ["primary"]
+    assert router.metrics()["failed"] == 1
+    assert router.metrics()["fallbacks"] == 0
+
+
+def test_all_endpoints_failing_raises_last_error():
+    def request(endpoint):
+        raise StatusError(429)
+
+    router = LLMRouter(ENDPOINTS, hedge_enabled=False)
+    with pytest.raises(StatusError):
+        router.call(request)
+    assert router.metrics()["failed"] == 1
+
+
+def test_failing_endpoint_is_benched():
+    def request(endpoint):
+        if endpoint["name"] == "primary":
+            raise StatusError(500)
+        return endpoint["name"]
+
+    router = LLMRouter(ENDPOINTS, hedge_enabled=False, failure_threshold=2, cooldown=60)
+    router.call(request)
+    router.call(request)
+    assert not router.metrics()["endpoints"][0]["healthy"]
+
+    # The benched primary is tried last, so the fallback answers straight away
+    assert router.call(request) == "fallback"
+    assert router.metrics()["endpoints"][0]["requests"] == 2
+
+
+def test_slow_primary_is_hedged():
+    release = threading.Event()
+
+    def request(endpoint):
+        if endpoint["name"] == "primary":
+            release.wait(2)
+        return endpoint["name"]
+
+    router = LLMRouter(ENDPOINTS, hedge_initial_delay=0.05, hedge_min_delay=0.01)
+    try:
+        assert router.call(request) == "fallback"
+        metrics = router.metrics()
+        assert metrics["hedged"] == 1
+        assert metrics["hedge_wins"] == 1
+        assert metrics["hedge_rate"] == 1.0
+    finally:
+        release.set()
+    # The losing primary is discarded once it finishes
+    assert wait_for_idle(router) == 0
+
+
+def test_hedge_skipped_while_workers_are_busy():
+    release = threading.Event()
+
+    def request(endpoint):
+        release.wait(2)
+        return endpoint["name"]
+
+    router = LLMRouter(ENDPOINTS, hedge_initial_delay=0.05, hedge_min_delay=0.01, max_workers=1)
+    result = {}
+    caller = threading.Thread(target=lambda: result.setdefault("value", router.call(request)))
+    caller.start()
+    time.sleep(0.2)
+    release.set()
+    caller.join(2)
+
+    assert result["value"] == "primary"
+    assert router.metrics()["hedged"] == 0
+    assert router.metrics()["hedges_skipped"] >= 1
+    assert wait_for_idle(router) == 0
+
+
+def test_cancelled_attempt_is_not_counted_as_active():
+    release = threading.Event()
+    router = LLMRouter(ENDPOINTS, max_workers=1)
+
+    running = router._submit(0, lambda endpoint: release.wait(2))
+    queued = router._submit(1, lambda endpoint: endpoint["name"])
+    assert router.metrics()["active_attempts"] == 2
+
+    # A queued attempt cancelled before it starts must not leak into the count
+    assert queued.cancel()
+    release.set()
+    running.result(2)
+
+    assert wait_for_idle(router) == 0
+    assert router._can_hedge()
+
+
+def test_call_times_out_and_abandons_attempts():
+    release = threading.Event()
+
+    def request(endpoint):
+        release.wait(2)
+        return endpoint["name"]
+
+    router = LLMRouter(ENDPOINTS, hedge_initial_delay=0.05, hedge_min_delay=0.01)
+    started = time.monotonic()
+    try:
+        with pytest.raises(TimeoutError):
+            router.call(request, timeout=0.2)
+        assert time.monotonic() - started < 0.5
+        metrics = router.metrics()
+        assert metrics["timed_out"] == 1
+        assert metrics["hedged"] == 1
+    finally:
+        release.set()
+    assert wait_for_idle(router) == 0
+
+
+def test_no_fallback_after_timeout():
+    calls = []
+
+    def request(endpoint):
+        calls.append(endpoint["name"])
+        time.sleep(0.2)
+        raise StatusError(503)
+
+    router = LLMRouter(ENDPOINTS, hedge_enabled=False)
+    with pytest.raises(TimeoutError):
+        router.call(request, timeout=0.1)
+    assert calls == ["primary"]
+    assert router.metrics()["fallbacks"] == 0
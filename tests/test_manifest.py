@@ -0,0 +1,115 @@
+"""Tests for content-addressed chunk ids, chunk diffs and the chunk manifest"""
+
+import pytest
+
+from agentic_rag.infrastructure.persistence.manifest import ChunkChanges, ChunkManifest, chunk_ids
+
+
+def test_chunk_ids_are_stable_and_depend_on_path():
+    ids = chunk_ids("a.txt", ["one", "two"])
+
+    assert ids == chunk_ids("a.txt", ["one", "two"])
+    assert ids != chunk_ids("b.txt", ["one", "two"])
+    # An edit elsewhere in the file leaves the other chunks' ids alone
+    assert chunk_ids("a.txt", ["zero", "one", "two"])[1:] == ids
+
+
+def test_repeated_chunks_get_occurrence_suffixes():
+    first, second, third = chunk_ids("a.txt", ["same", "same", "same"])
+
+    assert second == f"{first}-1"
+    assert third == f"{first}-2"
+
+
+def test_windows_sharing_seen_match_a_single_pass():
+    seen = {}
+    windowed = chunk_ids("a.txt", ["x", "y"], seen) + chunk_ids("a.txt", ["x", "z"], seen)
+
+    assert windowed == chunk_ids("a.txt", ["x", "y", "x", "z"])
+
+
+def changes(previous_texts, texts, **kwargs):
+    previous = None
+    if previous_texts is not None:
+        previous = {chunk_id: i for i, chunk_id in enumerate(chunk_ids("a.txt", previous_texts))}
+    return ChunkChanges("a.txt", texts, chunk_ids("a.txt", texts), previous, **kwargs)
+
+
+def test_diff_of_new_file_adds_everything():
+    diff = changes(None, ["one", "two"])
+
+    assert diff.added == [0, 1]
+    assert diff.moved == [] and diff.removed == []
+    assert not diff.unchanged
+
+
+def test_diff_finds_added_moved_and_removed_chunks():
+    diff = changes(["one", "two", "three"], ["zero", "one", "three"])
+
+    assert diff.added_texts == ["zero"]
+    # "one" moved from 0 to 1, "three" stayed at 2
+    assert diff.moved == [1]
+    assert diff.removed == chunk_ids("a.txt", ["one", "two", "three"])[1:2]
+    assert diff.metadata(1) == {"file": "a.txt", "chunk": 1}
+
+
+def test_identical_file_is_unchanged():
+    assert changes(["one", "two"], ["one", "two"]).unchanged
+
+
+def test_partial_diff_never_removes():
+    diff = changes(["one", "two", "three"], ["three"], start=2, partial=True)
+
+    assert diff.removed == []
+    assert diff.added == [] and diff.moved == []
+    assert diff.metadata(0)["chunk"] == 2
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    chunk_manifest = ChunkManifest(tmp_path / "manifest.sqlite3")
+    yield chunk_manifest
+    chunk_manifest.close()
+
+
+def test_manifest_records_committed_chunks(manifest):
+    assert manifest.get("a.txt") is None
+
+    manifest.commit("a.txt", ["id1", "id2"])
+    assert manifest.get("a.txt") == {"id1": 0, "id2": 1}
+
+    manifest.commit("a.txt", ["id2"])
+    assert manifest.get("a.txt") == {"id2": 0}
+
+    manifest.remove("a.txt")
+    assert manifest.get("a.txt") is None
+
+
+def test_empty_commit_is_known_but_empty(manifest):
+    manifest.commit("a.txt", [])
+
+    assert manifest.get("a.txt") == {}
+
+
+def test_collections_are_kept_apart(tmp_path, manifest):
+    other = ChunkManifest(tmp_path / "manifest.sqlite3", collection_name="other")
+    try:
+        manifest.commit("a.txt", ["id1"])
+        assert other.get("a.txt") is None
+    finally:
+        other.close()
+
+
+def test_pending_ids_are_owned_by_their_manifest(tmp_path, manifest):
+    manifest.begin("a.txt", ["id1", "id2"])
+    assert sorted(manifest.pending("a.txt")) == ["id1", "id2"]
+
+    other = ChunkManifest(tmp_path / "manifest.sqlite3")
+    try:
+        assert other.pending("a.txt") == []
+        assert other.abandoned() == []
+    finally:
+        other.close()
+
+    manifest.clear_pending("a.txt")
+    assert manifest.pending("a.txt") == []
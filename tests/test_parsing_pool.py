@@ -0,0 +1,58 @@
+"""Tests for ParsingPool: timeouts and crashed workers"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from agentic_rag.infrastructure.persistence.parsing import ParsingPool
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("some text", encoding="utf-8")
+    return str(path)
+
+
+def wait_for_no_children(timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    return multiprocessing.active_children()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a named pipe")
+def test_stuck_file_times_out_and_its_worker_is_killed(tmp_path, text_file):
+    # Opening a FIFO without a writer blocks the worker for good
+    stuck = tmp_path / "stuck.txt"
+    os.mkfifo(stuck)
+
+    pool = ParsingPool(workers=1, timeout=10)
+    try:
+        with pytest.raises(TimeoutError):
+            pool.load(str(stuck))
+        assert wait_for_no_children() == []
+
+        # The next file gets a fresh pool
+        [doc] = pool.load(text_file)
+        assert doc.page_content == "some text"
+    finally:
+        pool.close()
+
+
+def test_crashed_worker_is_replaced(text_file):
+    pool = ParsingPool(workers=1, timeout=60)
+    try:
+        pool.load(text_file)
+        for process in multiprocessing.active_children():
+            process.kill()
+
+        [doc] = pool.load(text_file)
+        assert doc.page_content == "some text"
+    finally:
+        pool.close()
@@ -0,0 +1,190 @@
+"""Tests for RAGWithReranker.query: speculative verification and the latency budget"""
+
+import time
+
+import numpy as np
+import pytest
+
+for module in ("chromadb", "sentence_transformers", "crewai", "openai"):
+    pytest.importorskip(module)
+
+from agentic_rag.application import rag_pipeline
+from agentic_rag.application.rag_pipeline import RAGWithReranker
+
+NO_INFORMATION = "No information available. I couldn't find relevant resolution for this query."
+# Only the stages a test is about need time, so no other degradation kicks in
+NO_RESERVES = {"expansion": 0.0, "retrieval": 0.0, "rerank": 0.0, "verification": 0.0, "generation": 0.0}
+
+
+class FakeChroma:
+    def __init__(self, path=None):
+        pass
+
+    def get_or_create_collection(self, name):
+        return self
+
+    def query(self, query_embeddings, n_results):
+        return {
+            "documents": [[f"document {i}" for i in range(n_results)]],
+            "metadatas": [[{"file": f"file{i}.txt", "chunk": i} for i in range(n_results)]],
+        }
+
+
+class FakeEmbedder:
+    def __init__(self, model_name=None):
+        pass
+
+    def encode(self, texts):
+        return np.zeros((len(texts), 2))
+
+
+class FakeReranker:
+    score = 0.9
+
+    def __init__(self, model_name=None):
+        pass
+
+    def rerank(self, query, documents, top_k=None):
+        return [(i, self.score - 0.01 * i) for i in range(len(documents))]
+
+
+class FakeLanguageModel:
+    max_tokens = 512
+    delay = 0.0
+
+    def __init__(self, config_path=None):
+        self.calls = []
+
+    def generate_answer(self, query, context, max_tokens=None, timeout=None):
+        self.calls.append({"max_tokens": max_tokens, "timeout": timeout})
+        if timeout is not None and self.delay > timeout:
+            # Like LLMRouter.call, give up at the deadline
+            time.sleep(timeout)
+            raise TimeoutError("generator: no response")
+        time.sleep(self.delay)
+        return "generated answer"
+
+
+class FakeVerifier:
+    delay = 0.0
+    relevant = True
+
+    def __init__(self, llm_config_path=None):
+        self.verdicts = 0
+        self.verifications = 0
+
+    def verify_context(self, question, context, timeout=None):
+        self.verdicts += 1
+        time.sleep(self.delay)
+        return {"is_relevant_context": self.relevant, "reasoning": "fake"}
+
+    def verify_context_and_answer(self, question, context, timeout=None):
+        self.verifications += 1
+        if timeout is not None and self.delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("verifier: out of time")
+        time.sleep(self.delay)
+        return {"is_relevant_context": self.relevant, "reasoning": "fake", "answer": "verifier answer"}
+
+
+@pytest.fixture
+def make_rag(monkeypatch):
+    monkeypatch.setattr(rag_pipeline, "chromadb", type("chromadb", (), {"PersistentClient": FakeChroma}))
+    monkeypatch.setattr(rag_pipeline, "SentenceTransformer", FakeEmbedder)
+    monkeypatch.setattr(rag_pipeline, "BGEReranker", FakeReranker)
+    monkeypatch.setattr(rag_pipeline, "LanguageModel", FakeLanguageModel)
+    monkeypatch.setattr(rag_pipeline, "AnswerVerificationAgent", FakeVerifier)
+
+    def make(score=0.9, generation_delay=0.0, verification_delay=0.0, relevant=True, **kwargs):
+        monkeypatch.setattr(FakeReranker, "score", score)
+        monkeypatch.setattr(FakeLanguageModel, "delay", generation_delay)
+        monkeypatch.setattr(FakeVerifier, "delay", verification_delay)
+        monkeypatch.setattr(FakeVerifier, "relevant", relevant)
+        options = dict(config_path="unused", db_path="unused", llm_config_path="unused",
+                       use_query_expansion=False, verification_threshold=0.5)
+        options.update(kwargs)
+        return RAGWithReranker(**options)
+
+    return make
+
+
+def test_confident_query_is_answered_without_verification(make_rag):
+    rag = make_rag(score=0.9)
+    result = rag.query("question", verbose=False)
+
+    assert result["answer"] == "generated answer"
+    assert rag.verifier.verifications == 0
+    assert rag.verifier.verdicts == 0
+    assert result["degradations"] == []
+
+
+def test_low_score_is_answered_by_the_verifier(make_rag):
+    rag = make_rag(score=0.1, speculative_band=0.1)
+    result = rag.query("question", verbose=False)
+
+    assert result["answer"] == "verifier answer"
+    assert rag.verifier.verifications == 1
+    assert rag.llm.calls == []
+
+
+def test_speculation_overlaps_generation_and_verdict(make_rag):
+    rag = make_rag(score=0.45, speculative_band=0.1, generation_delay=0.4, verification_delay=0.4)
+
+    started = time.monotonic()
+    result = rag.query("question", verbose=False)
+    elapsed = time.monotonic() - started
+
+    assert result["answer"] == "generated answer"
+    assert rag.verifier.verdicts == 1
+    # The answering verifier is not run at all, and both calls ran side by side
+    assert rag.verifier.verifications == 0
+    assert elapsed < 0.7
+
+
+def test_speculative_answer_is_discarded_when_context_is_rejected(make_rag):
+    rag = make_rag(score=0.45, speculative_band=0.1, relevant=False)
+    result = rag.query("question", verbose=False)
+
+    assert result["answer"] == NO_INFORMATION
+    assert result["context"] == ""
+
+
+def test_short_budget_skips_verification_and_limits_tokens(make_rag):
+    rag = make_rag(score=0.1, stage_reserves=dict(NO_RESERVES, verification=8.0, generation=3.0))
+    result = rag.query("question", verbose=False, time_budget=2.0)
+
+    assert result["answer"] == "generated answer"
+    assert rag.verifier.verifications == 0
+    assert result["degradations"] == ["reduced_initial_k", "skipped_verification", "reduced_max_tokens"]
+    [call] = rag.llm.calls
+    assert rag.min_max_tokens <= call["max_tokens"] < FakeLanguageModel.max_tokens
+    assert 0 < call["timeout"] <= 2.0
+
+
+def test_generation_gets_remaining_budget_as_timeout(make_rag):
+    rag = make_rag(score=0.9, generation_delay=5.0, stage_reserves=NO_RESERVES)
+
+    started = time.monotonic()
+    result = rag.query("question", verbose=False, time_budget=0.3)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.0
+    assert result["degradations"] == ["generation_timed_out"]
+    assert result["answer"] == "No answer could be generated within the time budget."
+
+
+def test_verification_gets_remaining_budget_as_timeout(make_rag):
+    rag = make_rag(score=0.1, verification_delay=5.0, stage_reserves=NO_RESERVES)
+
+    started = time.monotonic()
+    result = rag.query("question", verbose=False, time_budget=0.3)
+
+    assert time.monotonic() - started < 1.0
+    assert result["degradations"] == ["verification_timed_out"]
+
+
+def test_unlimited_budget_passes_no_timeout(make_rag):
+    rag = make_rag(score=0.9)
+    rag.query("question", verbose=False)
+
+    assert rag.llm.calls == [{"max_tokens": None, "timeout": None}]
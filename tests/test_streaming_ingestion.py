@@ -0,0 +1,97 @@
+"""Tests for memory-bounded streaming ingestion of large files"""
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from langchain_core.documents import Document
+
+from agentic_rag.infrastructure.persistence.indexer import ChromaStorer, FileReader
+from agentic_rag.infrastructure.persistence.manifest import ChunkManifest
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    chunk_manifest = ChunkManifest(tmp_path / "manifest.sqlite3")
+    yield chunk_manifest
+    chunk_manifest.close()
+
+
+@pytest.fixture
+def storer(collection, embedder, manifest):
+    # Every file is streamed, two chunks per window
+    chunk_storer = ChromaStorer(collection, embedder, chunk_size=50, overlap=0, manifest=manifest,
+                                stream_min_bytes=1, stream_window=2)
+    yield chunk_storer
+    chunk_storer.writer.close()
+
+
+def pages(count, prefix="page"):
+    return [Document(page_content=f"{prefix} {i} " + "text " * 8, metadata={}) for i in range(count)]
+
+
+def test_streams_file_in_windows(tmp_path, monkeypatch, storer, collection, manifest):
+    path = tmp_path / "big.txt"
+    path.write_text("x")
+    monkeypatch.setattr(FileReader, "lazy_load", staticmethod(lambda p: iter(pages(5))))
+
+    storer.store_file(str(path))
+
+    assert len(manifest.get(str(path))) == 5
+    assert len(collection.records) == 5
+    assert not manifest.pending(str(path))
+
+
+def test_read_error_keeps_last_committed_state(tmp_path, monkeypatch, storer, collection, manifest):
+    path = tmp_path / "big.txt"
+    path.write_text("x")
+    monkeypatch.setattr(FileReader, "lazy_load", staticmethod(lambda p: iter(pages(5))))
+    storer.store_file(str(path))
+    committed = manifest.get(str(path))
+    records = dict(collection.records)
+
+    def truncated(p):
+        yield from pages(3, prefix="edited")
+        raise OSError("read error")
+
+    monkeypatch.setattr(FileReader, "lazy_load", staticmethod(truncated))
+    with pytest.raises(OSError):
+        storer.store_file(str(path))
+
+    # Neither the chunks that were not reached nor the manifest are touched,
+    # and the windows written before the error are rolled back
+    assert manifest.get(str(path)) == committed
+    assert collection.records.keys() == records.keys()
+    assert not manifest.pending(str(path))
+
+
+def test_lazy_load_raises_on_read_error(tmp_path):
+    path = tmp_path / "broken.txt"
+    path.write_bytes(b"\xff\xfe\xfa not text")
+
+    with pytest.raises(Exception):
+        list(FileReader.lazy_load(str(path)))
+
+
+def test_streamed_pdf_ocrs_scanned_pages_in_batches(tmp_path, monkeypatch):
+    from pypdf import PdfWriter
+
+    path = tmp_path / "scan.pdf"
+    writer = PdfWriter()
+    for _ in range(11):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    batches = []
+
+    def ocr_pages(p, reader, indices):
+        batches.append(list(indices))
+        return {i: Document(page_content=f"ocr {i}", metadata={"page": i + 1}) for i in indices}
+
+    monkeypatch.setattr(FileReader, "OCR_BATCH_PAGES", 4)
+    monkeypatch.setattr(FileReader, "_ocr_pages", staticmethod(ocr_pages))
+    docs = list(FileReader.lazy_load(str(path)))
+
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10]]
+    assert [d.page_content for d in docs] == [f"ocr {i}" for i in range(11)]
@@ -0,0 +1,110 @@
+"""Tests for the change-notification webhooks and their shared secret"""
+
+import importlib
+import json
+
+import pytest
+
+for module in ("fastapi", "httpx", "uvicorn", "azure.storage.blob", "chromadb", "sentence_transformers",
+               "crewai", "openai"):
+    pytest.importorskip(module)
+
+from fastapi.testclient import TestClient
+
+from agentic_rag.domain.utils import PathConfig
+
+SECRET = "s3cret"
+BLOB_CREATED = {
+    "eventType": "Microsoft.Storage.BlobCreated",
+    "data": {"url": "https://account.blob.core.windows.net/docs/a.pdf", "eTag": "0x1"},
+}
+VALIDATION = {
+    "eventType": "Microsoft.EventGrid.SubscriptionValidationEvent",
+    "data": {"validationCode": "code-123"},
+}
+
+
+class FakeRuntime:
+    def __init__(self, sources=("blob", "sharepoint")):
+        self.sources = list(sources)
+        self.notifications = []
+
+    def notify(self, name, event=None):
+        if name not in self.sources:
+            return False
+        self.notifications.append((name, event))
+        return True
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    # The upload connector reads its config when the API module is imported
+    config_dir = tmp_path_factory.mktemp("config")
+    (config_dir / "blob-config.json").write_text(json.dumps({"connection_string": "", "container_name": "docs"}))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(PathConfig, "CONFIG_DIR", config_dir)
+        yield importlib.import_module("agentic_rag.infrastructure.api.main")
+
+
+@pytest.fixture
+def runtime(api, monkeypatch):
+    fake = FakeRuntime()
+    monkeypatch.setattr(api, "connector_runtime", fake)
+    return fake
+
+
+@pytest.fixture
+def client(api):
+    # Not used as a context manager, so the startup event (connector runtime) does not run
+    return TestClient(api.app)
+
+
+def test_notifications_are_refused_without_a_secret(api, client, runtime, monkeypatch):
+    monkeypatch.setattr(api, "WEBHOOK_SECRET", None)
+
+    assert client.post("/webhooks/eventgrid", json=[BLOB_CREATED]).status_code == 403
+    assert client.post("/webhooks/sharepoint", json={"value": [{"clientState": ""}]}).status_code == 403
+    assert runtime.notifications == []
+
+
+def test_handshakes_are_answered_without_a_secret(api, client, monkeypatch):
+    monkeypatch.setattr(api, "WEBHOOK_SECRET", None)
+
+    response = client.post("/webhooks/eventgrid", json=[VALIDATION])
+    assert response.json() == {"validationResponse": "code-123"}
+
+    response = client.post("/webhooks/sharepoint?validationtoken=token-456")
+    assert response.status_code == 200
+    assert response.text == "token-456"
+
+
+def test_eventgrid_requires_the_key(api, client, runtime, monkeypatch):
+    monkeypatch.setattr(api, "WEBHOOK_SECRET", SECRET)
+
+    assert client.post("/webhooks/eventgrid", json=[BLOB_CREATED]).status_code == 401
+    assert client.post("/webhooks/eventgrid?key=wrong", json=[BLOB_CREATED]).status_code == 401
+    assert client.post("/webhooks/eventgrid?key=wrong", json=[VALIDATION]).status_code == 401
+    assert runtime.notifications == []
+
+    response = client.post(f"/webhooks/eventgrid?key={SECRET}", json=[BLOB_CREATED])
+    assert response.json() == {"queued": 1}
+    assert runtime.notifications == [("blob", {"url": BLOB_CREATED["data"]["url"], "etag": "0x1"})]
+
+
+def test_sharepoint_requires_the_client_state(api, client, runtime, monkeypatch):
+    monkeypatch.setattr(api, "WEBHOOK_SECRET", SECRET)
+
+    body = {"value": [{"clientState": SECRET}, {"clientState": "wrong"}]}
+    assert client.post("/webhooks/sharepoint", json=body).status_code == 401
+    assert runtime.notifications == []
+
+    body = {"value": [{"clientState": SECRET}, {"clientState": SECRET}]}
+    assert client.post("/webhooks/sharepoint", json=body).json() == {"queued": 1}
+    assert runtime.notifications == [("sharepoint", None)]
+
+
+def test_source_not_running_answers_503(api, client, monkeypatch):
+    monkeypatch.setattr(api, "WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(api, "connector_runtime", FakeRuntime(sources=["sharepoint"]))
+
+    assert client.post(f"/webhooks/eventgrid?key={SECRET}", json=[BLOB_CREATED]).status_code == 503